@@ -18,7 +18,8 @@ class CinematicController:
     # place, and it improves testability (e.g. tests can set bb_filter_gamma to whatever value
     # they want).
     def __init__(self, waypoint_generator=FixedBBWaypointGenerator(), bb_filter_gamma=0.9,
-                 bb_match_dimension_importance=0.5, margin=0.25, person_predictor=None):
+                 bb_match_dimension_importance=0.5, margin=0.25, person_predictor=None, tracker=None,
+                 target_track_id=None):
         self.latest_bounding_box = None
         self.smoothed_bounding_box = None
         self.bb_filter_gamma = bb_filter_gamma
@@ -31,6 +32,12 @@ class CinematicController:
         # the WaypointGenerator interface.
         self.waypoint_generator = waypoint_generator
         self.person_predictor = person_predictor
+        # Optional MultiPersonTracker. If set, every person in view is tracked, and the controller follows a
+        # single track (target_track_id if given, otherwise the largest person it sees) instead of matching
+        # boxes to the smoothed bounding box itself. See update_latest_bbs_with_tracker.
+        self.tracker = tracker
+        self.target_track_id = target_track_id
+        self.followed_track_id = None
 
     def set_waypoint_generator(self, waypoint_generator):
         print("Why would you update the waypoint generator? Only call this from a test.")
@@ -45,6 +52,9 @@ class CinematicController:
     # If the input is degenerate (None or empty), updates the latest and smooth bounding box to None,
     # and rely on the waypoint generator to do something intelligent as a result.
     def update_latest_bbs(self, all_bounding_boxes):
+        if self.tracker is not None:
+            self.update_latest_bbs_with_tracker(all_bounding_boxes)
+            return
         if all_bounding_boxes is None or len(all_bounding_boxes) == 0:
             print("Error, no bounding boxes provided. This case is not handled.")
             print("For now, assume that the bounding box just disappeared, so don't change the tracked"
@@ -66,6 +76,40 @@ class CinematicController:
             person_state = PersonState.get_person_state_from_bb(self.latest_drone_state, self.smoothed_bounding_box)
             self.person_predictor.add_person_state(person_state)
 
+    # Feeds the bounding boxes to the tracker and follows one of its tracks. The smoothed bounding box is the
+    # track's Kalman-filtered box, so it keeps following the same person (with a predicted box) through a
+    # few frames without a detection, and isn't thrown off by other people walking nearby.
+    def update_latest_bbs_with_tracker(self, all_bounding_boxes):
+        tracks = self.tracker.update(all_bounding_boxes)
+        track = self.choose_track(tracks)
+        if track is None:
+            self.followed_track_id = None
+            self.latest_bounding_box = None
+            self.smoothed_bounding_box = None
+            return
+        self.followed_track_id = track.track_id
+        self.latest_bounding_box = track.latest_bounding_box if track.misses == 0 else None
+        self.smoothed_bounding_box = track.get_bounding_box()
+        if self.person_predictor is not None:
+            person_state = PersonState.get_person_state_from_bb(self.latest_drone_state, self.smoothed_bounding_box)
+            self.person_predictor.add_person_state(person_state)
+
+    # Picks the track to follow: the one with target_track_id if it's set, otherwise the track we were
+    # already following, otherwise the one with the largest box. Returns None if there's nothing to follow.
+    def choose_track(self, tracks):
+        if len(tracks) == 0:
+            return None
+        tracks_by_id = {track.track_id: track for track in tracks}
+        if self.target_track_id is not None:
+            return tracks_by_id.get(self.target_track_id)
+        if self.followed_track_id in tracks_by_id:
+            return tracks_by_id[self.followed_track_id]
+        return max(tracks, key=lambda track: track.get_bounding_box().get_area())
+
+    # Chooses which tracked person to follow, by track id. None goes back to following the largest person.
+    def set_target_track_id(self, track_id):
+        self.target_track_id = track_id
+
     # Given a list of bounding boxes, returns the one that best matches the currently-tracked
     # bounding box.
     # If no bounding box is currently tracked, returns the largest bounding box in the list.
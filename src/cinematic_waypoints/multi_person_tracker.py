@@ -0,0 +1,145 @@
+from scipy.optimize import linear_sum_assignment
+from utils.bounding_box import BoundingBox
+import numpy as np
+
+
+# A single tracked person. The box is smoothed by a constant-velocity Kalman filter over
+# [center x, center y, width, height] and their rates of change, with one frame as the time step.
+class Track:
+    def __init__(self, track_id, bounding_box, process_noise, measurement_noise):
+        self.track_id = track_id
+        self.state = np.zeros(8)
+        self.state[:4] = Track.bb_to_measurement(bounding_box)
+        # Start out fairly sure of the box, but not at all sure of how it's moving.
+        self.covariance = np.diag([measurement_noise] * 4 + [100.0 * measurement_noise] * 4)
+        self.transition = np.eye(8)
+        self.transition[:4, 4:] = np.eye(4)
+        self.observation = np.eye(4, 8)
+        self.process_covariance = np.diag([process_noise] * 4 + [process_noise / 10.0] * 4)
+        self.measurement_covariance = np.eye(4) * measurement_noise
+
+        self.latest_bounding_box = bounding_box
+        self.age = 1  # Frames since the track was created.
+        self.hits = 1  # Frames in which the track was matched to a detection.
+        self.misses = 0  # Frames in a row in which the track wasn't matched.
+
+    @staticmethod
+    def bb_to_measurement(bounding_box):
+        return np.array(list(bounding_box.get_centroid()) + list(bounding_box.get_dimensions()), dtype=np.float64)
+
+    def predict(self):
+        self.state = self.transition.dot(self.state)
+        # Don't let the box shrink to nothing while coasting.
+        self.state[2:4] = np.maximum(self.state[2:4], 1.0)
+        self.covariance = self.transition.dot(self.covariance).dot(self.transition.T) + self.process_covariance
+        self.age += 1
+        self.misses += 1
+
+    def update(self, bounding_box):
+        innovation = Track.bb_to_measurement(bounding_box) - self.observation.dot(self.state)
+        innovation_covariance = self.observation.dot(self.covariance).dot(self.observation.T) + \
+            self.measurement_covariance
+        gain = self.covariance.dot(self.observation.T).dot(np.linalg.inv(innovation_covariance))
+        self.state = self.state + gain.dot(innovation)
+        self.covariance = (np.eye(8) - gain.dot(self.observation)).dot(self.covariance)
+        self.latest_bounding_box = bounding_box
+        self.hits += 1
+        self.misses = 0
+
+    # Returns the Kalman-smoothed box, with the score of the latest detection.
+    def get_bounding_box(self):
+        x, y, width, height = self.state[:4]
+        return BoundingBox((float(width), float(height)), (float(x), float(y)),
+                           score=self.latest_bounding_box.get_score())
+
+    # Returns the smoothed box as pixel [xmin, ymin, xmax, ymax] corners.
+    def get_corners(self):
+        x, y, width, height = self.state[:4]
+        return np.array([x - width / 2, y - height / 2, x + width / 2, y + height / 2])
+
+
+# Keeps a Track (with a persistent id) for every person in view, rather than just the one being filmed.
+# Every frame, the tracks are moved forward by their Kalman filters and then matched to the new detections
+# by solving the assignment problem on a cost matrix that mixes overlap (1 - IoU) and centroid distance.
+# Detections that don't match any track start new tracks. Tracks that go unmatched for more than max_misses
+# frames in a row are dropped.
+class MultiPersonTracker:
+    # iou_importance weighs overlap against centroid distance (normalized by the size of the track's box) in
+    # the matching cost. Pairs costing more than max_cost are never matched.
+    # Tracks only count as confirmed once they've been matched in min_hits frames.
+    def __init__(self, iou_importance=0.5, max_cost=0.8, max_misses=5, min_hits=1, process_noise=1.0,
+                 measurement_noise=10.0):
+        self.iou_importance = iou_importance
+        self.max_cost = max_cost
+        self.max_misses = max_misses
+        self.min_hits = min_hits
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.tracks = []
+        self.next_track_id = 0
+
+    # Updates the tracks with the bounding boxes detected in a new frame (None or empty if nobody was
+    # detected), and returns the confirmed tracks.
+    def update(self, bounding_boxes):
+        bounding_boxes = [] if bounding_boxes is None else list(bounding_boxes)
+        for track in self.tracks:
+            track.predict()
+
+        track_indices, detection_indices = self.match(bounding_boxes)
+        for track_index, detection_index in zip(track_indices, detection_indices):
+            self.tracks[track_index].update(bounding_boxes[detection_index])
+        matched_detections = set(detection_indices)
+        for detection_index, bb in enumerate(bounding_boxes):
+            if detection_index not in matched_detections:
+                self.tracks.append(Track(self.next_track_id, bb, self.process_noise, self.measurement_noise))
+                self.next_track_id += 1
+
+        self.tracks = [track for track in self.tracks if track.misses <= self.max_misses]
+        return self.get_confirmed_tracks()
+
+    def get_confirmed_tracks(self):
+        return [track for track in self.tracks if track.hits >= self.min_hits]
+
+    # Returns the track with the given id, or None if there's no such track (any more).
+    def get_track(self, track_id):
+        for track in self.tracks:
+            if track.track_id == track_id:
+                return track
+        return None
+
+    # Returns the indices of the matched tracks and of the detections they're matched to.
+    def match(self, bounding_boxes):
+        if len(self.tracks) == 0 or len(bounding_boxes) == 0:
+            return [], []
+        track_corners = np.array([track.get_corners() for track in self.tracks])
+        detection_corners = np.array([[x - w / 2.0, y - h / 2.0, x + w / 2.0, y + h / 2.0]
+                                      for (w, h), (x, y) in ((bb.get_dimensions(), bb.get_centroid())
+                                                             for bb in bounding_boxes)])
+        cost = MultiPersonTracker.compute_cost_matrix(track_corners, detection_corners, self.iou_importance)
+        track_indices, detection_indices = linear_sum_assignment(cost)
+        valid = cost[track_indices, detection_indices] <= self.max_cost
+        return list(track_indices[valid]), list(detection_indices[valid])
+
+    # Given pixel [xmin, ymin, xmax, ymax] corners of T tracks and D detections, returns the TxD matching
+    # cost matrix, computed for all pairs at once.
+    @staticmethod
+    def compute_cost_matrix(track_corners, detection_corners, iou_importance):
+        tracks = track_corners[:, np.newaxis, :]
+        detections = detection_corners[np.newaxis, :, :]
+        inter_width = np.maximum(np.minimum(tracks[..., 2], detections[..., 2]) -
+                                 np.maximum(tracks[..., 0], detections[..., 0]), 0)
+        inter_height = np.maximum(np.minimum(tracks[..., 3], detections[..., 3]) -
+                                  np.maximum(tracks[..., 1], detections[..., 1]), 0)
+        intersection = inter_width * inter_height
+        track_areas = (tracks[..., 2] - tracks[..., 0]) * (tracks[..., 3] - tracks[..., 1])
+        detection_areas = (detections[..., 2] - detections[..., 0]) * (detections[..., 3] - detections[..., 1])
+        union = track_areas + detection_areas - intersection
+        iou = np.where(union > 0, intersection / np.maximum(union, 1e-12), 0)
+
+        # Centroid distance, relative to the diagonal of the track's box, capped at 1.
+        track_centers = (tracks[..., :2] + tracks[..., 2:]) / 2
+        detection_centers = (detections[..., :2] + detections[..., 2:]) / 2
+        distance = np.linalg.norm(track_centers - detection_centers, axis=2)
+        track_diagonals = np.linalg.norm(tracks[..., 2:] - tracks[..., :2], axis=2)
+        normalized_distance = np.minimum(distance / np.maximum(track_diagonals, 1e-12), 1)
+        return iou_importance * (1 - iou) + (1 - iou_importance) * normalized_distance
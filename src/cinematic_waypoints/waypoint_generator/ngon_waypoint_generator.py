@@ -1,16 +1,31 @@
 from cinematic_waypoints.waypoint_generator.waypoint_generator_abc import WaypointGenerator
-from utils.drone_state import DroneState
-from utils.person_state import PersonState
-import math
+from utils.drone_state import NUM_STATE_COLUMNS, STATE_COLUMNS, drone_states_from_array
+import numpy as np
+
+# Column indices into the waypoint array (see STATE_COLUMNS in utils/drone_state.py).
+X, Y, Z, ROLL, PITCH, YAW = (STATE_COLUMNS.index(name) for name in ('x', 'y', 'z', 'roll', 'pitch', 'yaw'))
+
 
 # WaypointGenerator object that makes the drone fly in an NGon facing the middle, completely
 # ignoring the bounding-box information it gets.
+# All n vertices are computed at once as an n x NUM_STATE_COLUMNS array (see generate_waypoint_array), so
+# large n can be used for smooth orbits. The array behind the latest waypoints is kept in waypoint_array.
+# Like the state estimators and the controllers, yaw is in degrees, both in the current DroneState and in the
+# waypoints' headings.
 class NGonWaypointGenerator(WaypointGenerator):
     # Accept as arguments the number of waypoints and the desired "radius" of the n-gon, which
     # is the distance from all vertices to the center of the waypoint.
-    def __init__(self, n=8, radius=1):
+    # If there's a person predictor, the n-gon follows where the person is predicted to be over the next
+    # time_to_project seconds, with one vertex every time_to_project / n seconds.
+    # If the predictor also says how uncertain each prediction is (a PersonState covariance), each vertex is
+    # pushed further out by uncertainty_margin standard deviations of the prediction (taken along its most
+    # uncertain direction), so the drone keeps its distance from wherever the person might actually be.
+    def __init__(self, n=8, radius=1, time_to_project=10, uncertainty_margin=1.0):
         self.n = n
         self.radius = radius
+        self.time_to_project = time_to_project
+        self.uncertainty_margin = uncertainty_margin
+        self.waypoint_array = None
 
     # Ignores the bounding_box argument.
     # The only logic here is to try to make the drone fly in an n-gon by generating waypoints
@@ -18,33 +33,58 @@ class NGonWaypointGenerator(WaypointGenerator):
     # This could be extended to estimate the distance to the person (from the bounding box) and
     # then try to make the drone fly in an n-gon with the person at the center.
     def generate_waypoints(self, bounding_box, drone_state, person_predictor=None):
+        self.waypoint_array = self.generate_waypoint_array(bounding_box, drone_state, person_predictor)
+        return drone_states_from_array(self.waypoint_array)
+
+    # Same as generate_waypoints, but returns the waypoints as an n x NUM_STATE_COLUMNS array, one row per
+    # vertex, without creating any DroneStates.
+    def generate_waypoint_array(self, bounding_box, drone_state, person_predictor=None):
         current_x, current_y, current_z = drone_state.get_position()
         current_roll, current_pitch, current_yaw = drone_state.get_attitude()
         # Compute the desired center of the n-gon.
         # Note how we could easily adapt this code to use the person as the center if we can
         # somehow get a person's position from the bounding box.
-        center_x = current_x + math.cos(current_yaw) * self.radius
-        center_y = current_y + math.sin(current_yaw) * self.radius
-
-        time_to_project = 10
-        timesteps = [i * time_to_project / self.n for i in range(self.n + 1)]
-        current_person_state = PersonState(center_x, center_y)
-        predicted_person_states = [current_person_state for _ in range(self.n + 1)]
-        if person_predictor is not None:
-            predicted_person_states = person_predictor.predict_next_person_state(timesteps)
-
-        target_waypoints = []
-        angle_per_segment = 2.0 * math.pi / self.n
-        for i in range(1, self.n + 1):  # Don't include current state as a starting waypoint
-            predicted_person_state = predicted_person_states[i]
-            # new_x = math.cos(angle_per_segment * i + math.pi + current_yaw) * self.radius + center_x
-            # new_y = math.sin(angle_per_segment * i + math.pi + current_yaw) * self.radius + center_y
-            new_x = math.cos(angle_per_segment * i + math.pi + current_yaw) * self.radius + predicted_person_state.x
-            new_y = math.sin(angle_per_segment * i + math.pi + current_yaw) * self.radius + predicted_person_state.y
-            new_theta = current_yaw + i * angle_per_segment  # Check if need to crop to be within [-2pi, 2pi]
-
-            target_waypoints.append(DroneState(new_x, new_y, current_z,
-                                               current_roll, current_pitch, new_theta,
-                                               0, 0, 0, 0, 0, 0))  # All velocities are 0
-        # target_waypoints.append(drone_state)  # end up back where you started.
-        return target_waypoints
+        current_yaw_radians = np.deg2rad(current_yaw)
+        center_x = current_x + np.cos(current_yaw_radians) * self.radius
+        center_y = current_y + np.sin(current_yaw_radians) * self.radius
+
+        # Don't include current state as a starting waypoint.
+        vertex_indices = np.arange(1, self.n + 1)
+        center_xs, center_ys, center_stds = self.get_centers(center_x, center_y, vertex_indices, person_predictor)
+        radii = self.radius + self.uncertainty_margin * center_stds
+
+        # The drone turns by one segment's angle per vertex, so it keeps facing the middle. The headings keep
+        # increasing past 360 degrees rather than wrapping, so the drone never turns the long way round between
+        # vertices.
+        headings = current_yaw_radians + vertex_indices * (2.0 * np.pi / self.n)
+        waypoint_array = np.zeros((self.n, NUM_STATE_COLUMNS))  # All velocities are 0
+        # Each vertex is radius away from the center, on the opposite side of it from where the drone faces.
+        waypoint_array[:, X] = center_xs - np.cos(headings) * radii
+        waypoint_array[:, Y] = center_ys - np.sin(headings) * radii
+        waypoint_array[:, Z] = current_z
+        waypoint_array[:, ROLL] = current_roll
+        waypoint_array[:, PITCH] = current_pitch
+        waypoint_array[:, YAW] = np.rad2deg(headings)
+        return waypoint_array
+
+    # Returns the x and y coordinates of the n-gon's center at each vertex, and the standard deviation of the
+    # center's position along its most uncertain direction. Without a person predictor (or if it has nothing to
+    # go on yet), the center stays at (center_x, center_y). The standard deviation is 0 wherever the predictor
+    # gave no covariance.
+    def get_centers(self, center_x, center_y, vertex_indices, person_predictor):
+        if person_predictor is None:
+            return center_x, center_y, 0.0
+        timesteps = (vertex_indices * (self.time_to_project / self.n)).tolist()
+        predicted_person_states = person_predictor.predict_next_person_state(timesteps)
+        if predicted_person_states is None:
+            return center_x, center_y, 0.0
+        num_states = len(predicted_person_states)
+        center_xs = np.fromiter((state.x for state in predicted_person_states), dtype=np.float64, count=num_states)
+        center_ys = np.fromiter((state.y for state in predicted_person_states), dtype=np.float64, count=num_states)
+        covariances = np.zeros((num_states, 2, 2))
+        for i, state in enumerate(predicted_person_states):
+            if state.covariance is not None:
+                covariances[i] = state.covariance
+        # The largest eigenvalue of a covariance is the variance along its most uncertain direction.
+        center_stds = np.sqrt(np.maximum(np.linalg.eigvalsh(covariances)[:, -1], 0.0))
+        return center_xs, center_ys, center_stds
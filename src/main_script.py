@@ -1,11 +1,16 @@
 from cinematic_waypoints.cinematic_controller import CinematicController
 from cinematic_waypoints.waypoint_generator.ngon_waypoint_generator import NGonWaypointGenerator
 from cinematic_waypoints.waypoint_generator.yaw_waypoint_generator import YawWaypointGenerator
+from person_detection.detection_annotator import DetectionAnnotator
 from person_detection.image_saver import ImageSaver
-from person_detection.tf_detector import TFDetector
+from person_detection.roi_detector import ROIDetector
+from person_detection.tracking_detector import TrackingDetector
+from person_detection.detector_factory import create_detector, get_model_filepaths
+from replay.sensor_log_recorder import SensorLogRecorder
 from state_estimation.new_state_estimator import NewStateEstimator
 from smooth_control.smooth_controller import SmoothController
 from utils.im2vid import im2vid
+from utils.video_writer import VideoWriter
 from pyparrot.Minidrone import Mambo
 from pyparrot.DroneVision import DroneVision
 import numpy as np 
@@ -20,6 +25,17 @@ import cv2
 # 4) Create a smooth trajectory through the waypoints.
 # 5) Command the drone to follow the trajectory.
 
+detector_backend = 'tf'  # 'tf', 'opencv', 'onnx' or 'hog'. See person_detection/detector_factory.py.
+# Only search a window around the tracked person (see ROIDetector). Set to False to always use full frames.
+use_roi_detection = True
+# Run the detector every detect_interval frames and track people with optical flow in between (see
+# TrackingDetector). 1 runs the detector on every frame.
+detect_interval = 5
+# Frames are saved here during the flight, and the sensor log is saved next to them on landing, so the
+# flight can be replayed offline with replay_script.py.
+image_directory = './images/'
+sensor_log_filepath = image_directory + 'sensor_log.csv'
+
 # waypoint_generator = NGonWaypointGenerator(n=4)
 waypoint_generator = YawWaypointGenerator()
 cinematic_controller = CinematicController(waypoint_generator=waypoint_generator)
@@ -32,6 +48,8 @@ print("Connected to mambo.")
 mambo.smart_sleep(1)
 mambo.ask_for_state_update()
 mambo.smart_sleep(1)
+sensor_log_recorder = SensorLogRecorder(mambo)
+sensor_log_recorder.start()
 
 print("taking off!")
 mambo.safe_takeoff(5)
@@ -39,14 +57,24 @@ mambo.safe_takeoff(5)
 # latest_image = cv2.imread('images/test_image.png') #Test image to debug, 1 bounding box
 
 image_saver = ImageSaver(mambo)
+# Open the video stream once; it stays open in the background for the whole flight.
+image_saver.start()
 # Update paths as needed based on working directory.
-tf_detector = TFDetector(model_filepath='person_detection/ssdlite_mobilenet_v2_coco_2018_05_09/frozen_inference_graph.pb',
-                         label_filepath='person_detection/mscoco_label_map.pbtxt')
+detector = create_detector(detector_backend, **get_model_filepaths(detector_backend))
+if use_roi_detection:
+    roi_detector = ROIDetector(detector)
+    detector = roi_detector
+if detect_interval > 1:
+    detector = TrackingDetector(detector, detect_interval=detect_interval)
+# Draws the detections on a copy of each frame in the background and encodes them into a video, so
+# rendering doesn't slow down the loop.
+annotated_video_writer = VideoWriter('droneVideoAnnotated.avi')
+detection_annotator = DetectionAnnotator(video_writer=annotated_video_writer)
+detection_annotator.start()
 
 
 state_estimator = NewStateEstimator(mambo)
 smooth_controller = SmoothController(mambo,state_estimator)
-firstrun = True
 itercounter = 0
 max_num_iterations = 10
 done = False
@@ -54,13 +82,12 @@ while not done:
     # try:
     print("Starting loop, iteration number ", itercounter)
     # 1) Read an image from the drone camera and create a bounding box of the humans.
-    latest_image = image_saver.get_latest_image()  # FIXME: this is not returning the latest image.
+    latest_image = image_saver.get_latest_image()
 
-    if firstrun: #super hacky way to not init the tf session everytime 
-    	bounding_boxes = tf_detector.detect_bounding_box(latest_image,itercounter, visualize=True,firstrun=True)
-    	firstrun = False
-    else:
-    	bounding_boxes = tf_detector.detect_bounding_box(latest_image,itercounter, visualize=True)
+    # The detector keeps its session open between iterations, so there's no per-frame setup cost here.
+    bounding_boxes = None
+    if latest_image is not None:
+        bounding_boxes = detector.detect(latest_image)
 
     print(bounding_boxes)
     if bounding_boxes is not None:
@@ -76,6 +103,11 @@ while not done:
     cinematic_controller.update_latest_bbs(bounding_boxes) 
     cinematic_controller.update_latest_drone_state(drone_state)
     cinematic_waypoints = cinematic_controller.generate_waypoints()
+    if use_roi_detection:
+        roi_detector.update_tracked_bb(cinematic_controller.smoothed_bounding_box)
+    if latest_image is not None:
+        detection_annotator.submit(latest_image, bounding_boxes, cinematic_controller.smoothed_bounding_box,
+                                   itercounter)
 
     # 4) Create a smooth trajectory through the waypoints and make the drone fly through it.
     smooth_controller.smooth_gen(cinematic_waypoints)
@@ -92,8 +124,13 @@ while not done:
 
 # Exited the loop, so we're done and want to land
 print("landing now. Flying state is %s" % mambo.sensors.flying_state)
+image_saver.stop()
+detection_annotator.stop()
+annotated_video_writer.close()
 mambo.safe_land(5)
 mambo.smart_sleep(5)
+sensor_log_recorder.save(sensor_log_filepath)
 print("disconnect")
 mambo.disconnect()
+detector.close()
 im2vid.convert_frames_to_video()
\ No newline at end of file
@@ -0,0 +1,90 @@
+from pipeline.drop_oldest_queue import DropOldestQueue
+import cv2
+import numpy as np
+import os
+import threading
+
+DETECTION_COLOR = (0, 255, 0)
+TARGET_COLOR = (0, 0, 255)
+LABEL_TEXT_COLOR = (0, 0, 0)
+
+
+# Draws a bounding box on image, in place, with label_text in a filled box above it.
+def draw_bounding_box(image, bb, color, label_text):
+    center_x, center_y = bb.get_centroid()
+    width, height = bb.get_dimensions()
+
+    min_x = int(center_x - width / 2)
+    min_y = int(center_y - height / 2)
+    max_x = int(center_x + width / 2)
+    max_y = int(center_y + height / 2)
+    cv2.rectangle(image, (min_x, min_y), (max_x, max_y), color, 2)
+
+    label_size = cv2.getTextSize(label_text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0]
+    label_left = min_x
+    label_top = max(1, min_y - label_size[1])
+    label_right = label_left + label_size[0]
+    label_bottom = label_top + label_size[1]
+    cv2.rectangle(image, (label_left - 1, label_top - 1), (label_right + 1, label_bottom + 1), color, -1)
+    cv2.putText(image, label_text, (label_left, label_bottom), cv2.FONT_HERSHEY_SIMPLEX, 0.5, LABEL_TEXT_COLOR, 1,
+                cv2.LINE_AA)
+
+
+# Draws every detected bounding box (labeled with its score, if it has one) and the tracked target on image,
+# in place.
+def draw_detections(image, bounding_boxes, target_bb=None):
+    for bb in bounding_boxes if bounding_boxes is not None else []:
+        score = bb.get_score()
+        draw_bounding_box(image, bb, DETECTION_COLOR, "person" if score is None else "person %.2f" % score)
+    if target_bb is not None:
+        draw_bounding_box(image, target_bb, TARGET_COLOR, "target")
+    return image
+
+
+# Renders detection overlays on a worker thread, so drawing and saving them never adds to inference latency.
+# submit() takes a copy of the frame, so the caller's image is never modified and the caller can reuse its
+# buffer straight away. Annotated frames go to a VideoWriter (e.g. from utils.video_writer), and/or are saved
+# as bbimage%06d.png files in image_directory. If rendering falls behind, the oldest pending frames are
+# dropped rather than stalling the caller.
+class DetectionAnnotator:
+    def __init__(self, video_writer=None, image_directory=None, max_pending=2):
+        self.video_writer = video_writer
+        self.image_directory = image_directory
+        self.pending_frames = DropOldestQueue(max_pending)
+        self.stop_event = threading.Event()
+        self.worker_thread = None
+        self.num_annotated = 0
+
+    def start(self):
+        if self.image_directory is not None:
+            os.makedirs(self.image_directory, exist_ok=True)
+        self.stop_event.clear()
+        self.worker_thread = threading.Thread(target=self.annotate_frames, daemon=True)
+        self.worker_thread.start()
+
+    # Finishes annotating the frames that are still pending, then stops the worker. Doesn't close the
+    # video writer, since it may be shared.
+    def stop(self):
+        self.stop_event.set()
+        if self.worker_thread is not None:
+            self.worker_thread.join()
+
+    # Queues image to be annotated with bounding_boxes and the tracked target_bb (either can be None).
+    # frame_index is used to name the saved image, and defaults to the number of frames submitted so far.
+    def submit(self, image, bounding_boxes, target_bb=None, frame_index=None):
+        if frame_index is None:
+            frame_index = self.num_annotated + len(self.pending_frames) + self.pending_frames.num_dropped
+        self.pending_frames.put((np.copy(image), list(bounding_boxes or []), target_bb, frame_index))
+
+    def annotate_frames(self):
+        while not self.stop_event.is_set() or len(self.pending_frames) > 0:
+            pending_frame = self.pending_frames.get(timeout=0.1)
+            if pending_frame is None:
+                continue
+            image, bounding_boxes, target_bb, frame_index = pending_frame
+            draw_detections(image, bounding_boxes, target_bb)
+            if self.video_writer is not None:
+                self.video_writer.write(image)
+            if self.image_directory is not None:
+                cv2.imwrite(os.path.join(self.image_directory, "bbimage%06d.png" % frame_index), image)
+            self.num_annotated += 1
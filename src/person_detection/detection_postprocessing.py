@@ -0,0 +1,89 @@
+import numpy as np
+from utils.bounding_box import BoundingBox
+
+# Helpers for turning raw detector outputs into BoundingBoxes. Everything here works on whole arrays of
+# detections at once instead of looping over them in Python, so it stays cheap even when the model
+# returns a hundred candidate boxes per frame.
+
+# Class id that the COCO-trained models use for people.
+PERSON_CLASS_ID = 1
+
+
+# Given normalized [ymin, xmin, ymax, xmax] boxes (the format used by the TF object detection API),
+# returns the same boxes as pixel [xmin, ymin, xmax, ymax] corners for an image of the given shape.
+def normalized_boxes_to_pixel_corners(normalized_boxes, image_shape):
+    imheight, imwidth = image_shape[:2]
+    normalized_boxes = np.asarray(normalized_boxes, dtype=np.float64).reshape(-1, 4)
+    scale = np.array([imwidth, imheight, imwidth, imheight], dtype=np.float64)
+    return normalized_boxes[:, [1, 0, 3, 2]] * scale
+
+
+# Given pixel [xmin, ymin, xmax, ymax] corners and their scores, returns a list of BoundingBoxes.
+def corners_to_bounding_boxes(corners, scores=None):
+    corners = np.asarray(corners, dtype=np.float64).reshape(-1, 4)
+    dimensions = corners[:, 2:] - corners[:, :2]
+    centroids = (corners[:, 2:] + corners[:, :2]) / 2
+    if scores is None:
+        scores = [None] * len(corners)
+    bounding_boxes = []
+    for (width, height), (x, y), score in zip(dimensions, centroids, scores):
+        score = None if score is None else float(score)
+        bounding_boxes.append(BoundingBox((float(width), float(height)), (float(x), float(y)), score=score))
+    return bounding_boxes
+
+
+# Greedy non-maximum suppression. Given pixel [xmin, ymin, xmax, ymax] corners and their scores,
+# returns the indices of the boxes to keep, ordered by decreasing score.
+# If class_ids is given, boxes only suppress other boxes of the same class. This is done by shifting
+# each class into its own disjoint region of the plane so that boxes of different classes never overlap.
+def non_max_suppression(corners, scores, iou_thresh=0.5, class_ids=None):
+    corners = np.asarray(corners, dtype=np.float64).reshape(-1, 4)
+    scores = np.asarray(scores, dtype=np.float64)
+    if len(corners) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if class_ids is not None:
+        offsets = np.asarray(class_ids, dtype=np.float64) * (corners.max() + 1)
+        corners = corners + offsets[:, np.newaxis]
+
+    areas = np.maximum(corners[:, 2] - corners[:, 0], 0) * np.maximum(corners[:, 3] - corners[:, 1], 0)
+    order = np.argsort(-scores, kind='stable')
+    keep = []
+    while len(order) > 0:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+        # Overlap of the best remaining box with every other remaining box, all at once.
+        inter_width = np.maximum(np.minimum(corners[best, 2], corners[rest, 2]) -
+                                 np.maximum(corners[best, 0], corners[rest, 0]), 0)
+        inter_height = np.maximum(np.minimum(corners[best, 3], corners[rest, 3]) -
+                                  np.maximum(corners[best, 1], corners[rest, 1]), 0)
+        intersection = inter_width * inter_height
+        union = areas[best] + areas[rest] - intersection
+        iou = np.where(union > 0, intersection / np.maximum(union, 1e-12), 0)
+        order = rest[iou <= iou_thresh]
+    return np.asarray(keep, dtype=np.int64)
+
+
+# Turns the outputs of an SSD-style detector for one frame into a list of BoundingBoxes.
+# Keeps every detection whose score is above detect_thresh and whose class is in class_ids, optionally
+# applies class-aware non-maximum suppression (if nms_thresh is not None), and caps the result at the
+# max_detections highest-scoring boxes (if max_detections is not None).
+# Returned boxes are sorted by decreasing score.
+def create_bbs_from_detections(normalized_boxes, scores, classes, image_shape, detect_thresh=0.5,
+                               class_ids=(PERSON_CLASS_ID,), nms_thresh=None, max_detections=None):
+    scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+    classes = np.asarray(classes).reshape(-1)
+    mask = (scores > detect_thresh) & np.isin(classes, class_ids)
+    if not np.any(mask):
+        return []
+    corners = normalized_boxes_to_pixel_corners(np.asarray(normalized_boxes).reshape(-1, 4)[mask], image_shape)
+    scores = scores[mask]
+    classes = classes[mask]
+
+    if nms_thresh is not None:
+        keep = non_max_suppression(corners, scores, nms_thresh, classes)
+    else:
+        keep = np.argsort(-scores, kind='stable')
+    if max_detections is not None:
+        keep = keep[:max_detections]
+    return corners_to_bounding_boxes(corners[keep], scores[keep])
@@ -0,0 +1,21 @@
+import abc
+
+
+# Abstract Base Class (abc) for enforcing that all person detectors implement the same interface:
+# detect() takes an image (a HxWx3 uint8 BGR array, as returned by cv2.imread or the drone camera) and
+# returns a list of BoundingBoxes of the people in it, with scores, sorted by decreasing score. The list is
+# empty if nobody was detected. Detectors that hold on to resources (sessions, networks) release them in
+# close(), and can be used as context managers.
+class Detector(abc.ABC):
+    @abc.abstractmethod
+    def detect(self, image):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
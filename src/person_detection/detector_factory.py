@@ -0,0 +1,38 @@
+import importlib
+
+# Maps each detector backend name to the module and class that implement it. Modules are only imported
+# when their backend is asked for, so e.g. choosing 'opencv' never pays for importing TensorFlow, and a
+# backend's dependencies only need to be installed if it's used.
+DETECTOR_BACKENDS = {
+    'tf': ('person_detection.tf_detector', 'TFDetector'),
+    'opencv': ('person_detection.opencv_dnn_detector', 'OpenCVDNNDetector'),
+    'onnx': ('person_detection.onnx_detector', 'ONNXDetector'),
+    'hog': ('person_detection.person_detector', 'PersonDetector'),
+}
+
+
+# Creates a Detector for the given backend (one of DETECTOR_BACKENDS), passing any other arguments on to its
+# constructor.
+def create_detector(backend='tf', **kwargs):
+    if backend not in DETECTOR_BACKENDS:
+        raise ValueError("Unknown detector backend " + str(backend) + ", expected one of " +
+                         str(sorted(DETECTOR_BACKENDS)))
+    module_name, class_name = DETECTOR_BACKENDS[backend]
+    detector_class = getattr(importlib.import_module(module_name), class_name)
+    return detector_class(**kwargs)
+
+
+# Returns the model file arguments for a backend's constructor, with the paths prefixed by directory. The
+# constructors' defaults are relative to person_detection/, so the flight scripts, which run from src/, use
+# this to find the models.
+def get_model_filepaths(backend, directory='person_detection/'):
+    model_directory = directory + 'ssdlite_mobilenet_v2_coco_2018_05_09/'
+    if backend == 'tf':
+        return {'model_filepath': model_directory + 'frozen_inference_graph.pb',
+                'label_filepath': directory + 'mscoco_label_map.pbtxt'}
+    elif backend == 'opencv':
+        return {'model_filepath': model_directory + 'frozen_inference_graph.pb',
+                'config_filepath': model_directory + 'ssdlite_mobilenet_v2_coco.pbtxt'}
+    elif backend == 'onnx':
+        return {'model_filepath': model_directory + 'model.onnx'}
+    return {}
@@ -0,0 +1,114 @@
+from collections import deque
+import cv2
+import numpy as np
+import os
+import threading
+
+
+# Saves frames from a FrameRingBuffer to disk from a background thread, so that encoding and writing images
+# never happens on the control path.
+# Callers just submit the sequence number of a frame that's already in the ring buffer. The worker copies
+# the frame out of the buffer when it gets to it. If the frame has been overwritten by then, it's skipped
+# (and counted in num_lost), since the disk is clearly too slow to keep up anyway.
+class FrameDiskSink:
+    # Image formats.
+    RAW = "raw"  # Uncompressed .npy file. Fastest to write, but large.
+    JPEG = "jpeg"  # Lossy. Quality set by jpeg_quality (0-100).
+    PNG = "png"  # Lossless. Compression level set by png_compression (0-9, 0 being fastest).
+
+    # What to do when more than max_pending frames are waiting to be written.
+    DROP_OLDEST = "drop_oldest"  # Forget the oldest pending frame, to keep the saved frames fresh.
+    DROP_NEWEST = "drop_newest"  # Ignore the frame being submitted, to keep the saved frames contiguous.
+    BLOCK = "block"  # Wait for the disk to catch up. Never loses a frame, but can stall the caller.
+
+    def __init__(self, ring_buffer, directory='./images/', image_format=PNG, jpeg_quality=90, png_compression=1,
+                 max_pending=4, drop_policy=DROP_OLDEST, filename_pattern="test_image_%06d"):
+        if image_format not in (FrameDiskSink.RAW, FrameDiskSink.JPEG, FrameDiskSink.PNG):
+            raise ValueError("Unknown image format " + str(image_format))
+        if drop_policy not in (FrameDiskSink.DROP_OLDEST, FrameDiskSink.DROP_NEWEST, FrameDiskSink.BLOCK):
+            raise ValueError("Unknown drop policy " + str(drop_policy))
+        self.ring_buffer = ring_buffer
+        self.directory = directory
+        self.image_format = image_format
+        self.jpeg_quality = jpeg_quality
+        self.png_compression = png_compression
+        self.max_pending = max_pending
+        self.drop_policy = drop_policy
+        # Filename (without extension) of each frame, formatted with the index of the frame in the saved
+        # sequence. Indices count saved frames, so they're contiguous even if frames are dropped.
+        self.filename_pattern = filename_pattern
+
+        self.pending = deque()
+        self.changed = threading.Condition()
+        self.running = False
+        self.worker_thread = None
+        self.index = 0
+        # Counters for how well the disk is keeping up.
+        self.num_saved = 0
+        self.num_dropped = 0  # Thrown away by the drop policy.
+        self.num_lost = 0  # Overwritten in the ring buffer before the worker could save them.
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.running = True
+        self.worker_thread = threading.Thread(target=self.save_frames, daemon=True)
+        self.worker_thread.start()
+
+    # Saves whatever is still pending and stops the worker.
+    def stop(self):
+        with self.changed:
+            self.running = False
+            self.changed.notify_all()
+        if self.worker_thread is not None:
+            self.worker_thread.join()
+
+    # Queues the frame with the given sequence number to be saved. Returns whether it was queued.
+    def submit(self, sequence_number):
+        with self.changed:
+            if len(self.pending) >= self.max_pending:
+                if self.drop_policy == FrameDiskSink.DROP_NEWEST:
+                    self.num_dropped += 1
+                    return False
+                elif self.drop_policy == FrameDiskSink.DROP_OLDEST:
+                    self.pending.popleft()
+                    self.num_dropped += 1
+                else:
+                    self.changed.wait_for(lambda: len(self.pending) < self.max_pending or not self.running)
+                    if not self.running:
+                        return False
+            self.pending.append(sequence_number)
+            self.changed.notify_all()
+            return True
+
+    # Returns the path (with extension) that the frame with the given index is saved to.
+    def get_filepath(self, index):
+        extension = {FrameDiskSink.RAW: ".npy", FrameDiskSink.JPEG: ".jpg", FrameDiskSink.PNG: ".png"}
+        return os.path.join(self.directory, self.filename_pattern % index + extension[self.image_format])
+
+    def write_image(self, filepath, image):
+        if self.image_format == FrameDiskSink.RAW:
+            np.save(filepath, image)
+        elif self.image_format == FrameDiskSink.JPEG:
+            cv2.imwrite(filepath, image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        else:
+            cv2.imwrite(filepath, image, [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression])
+
+    def save_frames(self):
+        # Reused for every frame, so the worker doesn't allocate either.
+        image = None
+        while True:
+            with self.changed:
+                self.changed.wait_for(lambda: len(self.pending) > 0 or not self.running)
+                if len(self.pending) == 0:
+                    return
+                sequence_number = self.pending.popleft()
+                self.changed.notify_all()
+            if image is None and self.ring_buffer.frame_shape is not None:
+                image = np.zeros(self.ring_buffer.frame_shape, dtype=np.uint8)
+            copied_image, _ = self.ring_buffer.copy_frame(sequence_number, out=image)
+            if copied_image is None:
+                self.num_lost += 1
+                continue
+            self.write_image(self.get_filepath(self.index), copied_image)
+            self.index += 1
+            self.num_saved += 1
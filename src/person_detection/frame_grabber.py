@@ -0,0 +1,85 @@
+# Background capture service for the mambo camera.
+# Keeps a single video stream open for the whole flight and holds on to only the newest frame, so
+# consumers always see the most recent image without paying to open and close ffmpeg every time.
+
+from pyparrot.DroneVision import DroneVision
+from utils.clock import RealClock
+import threading
+
+
+# A single frame from the camera, along with when it arrived and its position in the stream.
+# Sequence numbers start at 1 and increase by one for every frame the grabber receives.
+class CapturedFrame:
+    def __init__(self, image, sequence_number, timestamp):
+        self.image = image
+        self.sequence_number = sequence_number
+        self.timestamp = timestamp
+
+
+class FrameGrabber:
+    # drone_vision can be passed in to use something other than a real DroneVision (e.g. for replaying
+    # a recorded flight). Otherwise one is created for the mambo when the grabber is started.
+    # Frames are timestamped with clock (see utils/clock.py), which defaults to the wall clock.
+    def __init__(self, mambo, drone_vision=None, buffer_size=30, clock=None):
+        self.mambo = mambo
+        self.clock = clock if clock is not None else RealClock()
+        self.drone_vision = drone_vision
+        self.buffer_size = buffer_size
+        self.running = False
+        # Single-slot buffer holding the newest frame. Guarded by the condition's lock, and the condition
+        # is notified every time a new frame lands in the slot.
+        self.frame_available = threading.Condition()
+        self.latest_frame = None
+        self.sequence_number = 0
+
+    # Opens the video stream and starts receiving frames in the background.
+    # Returns whether the stream was opened successfully.
+    def start(self):
+        if self.running:
+            return True
+        if self.drone_vision is None:
+            self.drone_vision = DroneVision(self.mambo, is_bebop=False, buffer_size=self.buffer_size)
+        # DroneVision calls back on its own thread every time it buffers a new frame. The callback has to
+        # be registered before the video is opened.
+        self.drone_vision.set_user_callback_function(self.on_new_frame, user_callback_args=None)
+        self.running = self.drone_vision.open_video()
+        print("Success in opening vision is %s" % self.running)
+        return self.running
+
+    # Closes the video stream. Any threads blocked in next_frame are woken up and get None.
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        with self.frame_available:
+            self.frame_available.notify_all()
+        self.drone_vision.close_video()
+
+    # Callback for DroneVision. Stores the newest frame, replacing whatever was in the slot before.
+    def on_new_frame(self, args):
+        image = self.drone_vision.get_latest_valid_picture()
+        if image is None:
+            return
+        timestamp = self.clock.time()
+        with self.frame_available:
+            self.sequence_number += 1
+            self.latest_frame = CapturedFrame(image, self.sequence_number, timestamp)
+            self.frame_available.notify_all()
+
+    # Returns the newest CapturedFrame without waiting, or None if no frame has arrived yet.
+    def latest(self):
+        with self.frame_available:
+            return self.latest_frame
+
+    # Waits for a frame newer than after_sequence_number and returns it. If after_sequence_number is None,
+    # waits for a frame newer than whatever is in the slot right now.
+    # Returns None if no such frame arrives within timeout seconds (or if the grabber is stopped).
+    def next_frame(self, timeout=None, after_sequence_number=None):
+        with self.frame_available:
+            if after_sequence_number is None:
+                after_sequence_number = self.sequence_number
+            got_frame = self.frame_available.wait_for(
+                lambda: self.sequence_number > after_sequence_number or not self.running, timeout)
+            if not got_frame or self.sequence_number <= after_sequence_number:
+                return None
+            return self.latest_frame
@@ -0,0 +1,66 @@
+import numpy as np
+import threading
+
+
+# Fixed pool of frame slots that's allocated once and then reused, so keeping the last few camera frames
+# around doesn't allocate a new array for every frame.
+# Frames are identified by their sequence number (e.g. CapturedFrame.sequence_number). The frame with
+# sequence number n lives in slot n % capacity until a frame with a later sequence number lands in the
+# same slot, so the last capacity frames are always available.
+class FrameRingBuffer:
+    # frame_shape is the (height, width, 3) shape of every frame. If None, it's taken from the first frame.
+    def __init__(self, capacity=8, frame_shape=None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1, got " + str(capacity))
+        self.capacity = capacity
+        self.frames = None
+        self.frame_shape = None
+        # Sequence number and timestamp of the frame in each slot. A sequence number of -1 means the slot
+        # is empty.
+        self.sequence_numbers = np.full(capacity, -1, dtype=np.int64)
+        self.timestamps = np.zeros(capacity)
+        self.lock = threading.Lock()
+        if frame_shape is not None:
+            self.allocate(frame_shape)
+
+    def allocate(self, frame_shape):
+        self.frame_shape = tuple(frame_shape)
+        self.frames = np.zeros((self.capacity,) + self.frame_shape, dtype=np.uint8)
+
+    # Copies image into the slot for sequence_number, overwriting whatever frame was there, and returns the
+    # slot (a view into the buffer, not a new array).
+    def put(self, image, sequence_number, timestamp=0.0):
+        with self.lock:
+            if self.frames is None:
+                self.allocate(image.shape)
+            elif image.shape != self.frame_shape:
+                raise ValueError("Expected a frame of shape " + str(self.frame_shape) + " but got " +
+                                 str(image.shape))
+            slot = sequence_number % self.capacity
+            np.copyto(self.frames[slot], image)
+            self.sequence_numbers[slot] = sequence_number
+            self.timestamps[slot] = timestamp
+            return self.frames[slot]
+
+    # Returns the frame with the given sequence number as a view into the buffer, or None if it has already
+    # been overwritten (or never arrived). The view is only valid until capacity more frames have been put,
+    # so use copy_frame to hold on to a frame for longer.
+    def get(self, sequence_number):
+        with self.lock:
+            slot = sequence_number % self.capacity
+            if self.sequence_numbers[slot] != sequence_number:
+                return None
+            return self.frames[slot]
+
+    # Copies the frame with the given sequence number into out (or a new array if out is None) and returns
+    # it along with its timestamp. Returns None, None if the frame has already been overwritten.
+    def copy_frame(self, sequence_number, out=None):
+        with self.lock:
+            slot = sequence_number % self.capacity
+            if self.sequence_numbers[slot] != sequence_number:
+                return None, None
+            if out is None:
+                out = self.frames[slot].copy()
+            else:
+                np.copyto(out, self.frames[slot])
+            return out, self.timestamps[slot]
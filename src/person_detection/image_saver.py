@@ -1,56 +1,58 @@
 # Object-oriented approach to grabbing images from the mambo drone and
 # saving them to a file and (maybe) returning the image in memory.
 
-from pyparrot.Minidrone import Mambo
-from pyparrot.DroneVision import DroneVision
-import cv2
+from person_detection.frame_disk_sink import FrameDiskSink
+from person_detection.frame_grabber import FrameGrabber
+from person_detection.frame_ring_buffer import FrameRingBuffer
 
-class UserVision:  # FIXME: I don't like this setup.
-    def __init__(self, vision):
-        self.vision = vision
-
- 
 
 class ImageSaver:
-    def __init__(self, mambo):
+    # frame_grabber can be passed in to share one video stream with other components. Otherwise, the
+    # image saver makes its own, which is opened on start() (or on the first call to get_latest_image).
+    # Frames are kept in a FrameRingBuffer of ring_buffer_size slots. If save_images is set, they're also
+    # saved to ./images/ by a FrameDiskSink in the background; pass disk_sink to choose its format and drop
+    # policy instead.
+    def __init__(self, mambo, frame_grabber=None, frame_timeout=5, ring_buffer_size=8, save_images=True,
+                 disk_sink=None):
         self.mambo = mambo
         self.index = 0
+        self.frame_grabber = frame_grabber if frame_grabber is not None else FrameGrabber(mambo)
+        # How long to wait for a new frame from the stream before giving up, in seconds.
+        self.frame_timeout = frame_timeout
+        self.ring_buffer = disk_sink.ring_buffer if disk_sink is not None else FrameRingBuffer(ring_buffer_size)
+        if disk_sink is None and save_images:
+            disk_sink = FrameDiskSink(self.ring_buffer, directory='./images/')
+        self.disk_sink = disk_sink
         print("Creating image saver.")
 
-    # When called, opens a video connection, saves images, and returns the latest image in memory.
+    # Opens the video stream, which then stays open for the whole flight.
+    def start(self):
+        if self.disk_sink is not None and not self.disk_sink.running:
+            self.disk_sink.start()
+        return self.frame_grabber.start()
+
+    # Closes the video stream and finishes saving any frames still waiting to be written. Call once at the
+    # end of the flight.
+    def stop(self):
+        self.frame_grabber.stop()
+        if self.disk_sink is not None:
+            self.disk_sink.stop()
+
+    # When called, waits for the next frame from the video stream, queues it to be saved, and returns it in
+    # memory. The returned image is a slot in the ring buffer, so it stays valid until ring_buffer_size more
+    # frames have been grabbed; copy it to keep it longer.
+    # Returns None if no frame arrives in time.
     def get_latest_image(self):
-        print("Called get latest image.")
-        # Note: it is necessary to create new objects in this method instead of creating instance variables
-        # in the constructor because of weird video threading issues.
-        mambo_vision = DroneVision(self.mambo, is_bebop=False, buffer_size=30)
-        user_vision = UserVision(mambo_vision)
-        success = mambo_vision.open_video()  # Open the video stream using ffmpeg for capturing and processing
-        print("Success in opening vision is %s" % success)
-
-        print("Vision successfully started!")
-        # FIXME: investigate if these sleeps are needed.
-        self.mambo.smart_sleep(5)
-        frame = mambo_vision.get_latest_valid_picture()
+        if not self.frame_grabber.running:
+            self.start()
+        captured_frame = self.frame_grabber.next_frame(timeout=self.frame_timeout)
+        if captured_frame is None:
+            print("No new frame from the video stream.")
+            return None
 
         print("in save pictures on image %d " % self.index)
-
-        if frame is not None:
-            filename = "test_image_%06d.png" % self.index
-            cv2.imwrite('./images/' + filename, frame)
-            self.index += 1
-            # Save another copy of the same image to a hardcoded filename, which
-            # we'll use as the latest image
-            magic_filename = "latest_image.png"
-            cv2.imwrite('./images/' + magic_filename, frame)
-            #print(self.index)
-
-
-        self.mambo.smart_sleep(5)
-
-        print("Ending the sleep and vision")
-        mambo_vision.close_video()
-
+        frame = self.ring_buffer.put(captured_frame.image, captured_frame.sequence_number, captured_frame.timestamp)
+        if self.disk_sink is not None:
+            self.disk_sink.submit(captured_frame.sequence_number)
+        self.index += 1
         return frame
-
-
-
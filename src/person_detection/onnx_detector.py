@@ -0,0 +1,53 @@
+from person_detection.detection_postprocessing import create_bbs_from_detections, PERSON_CLASS_ID
+from person_detection.detector_abc import Detector
+import numpy as np
+import onnxruntime
+
+
+# Runs the ssdlite model with ONNX Runtime instead of TensorFlow.
+# Expects the frozen graph converted with tf2onnx, which keeps the TF object detection API's input
+# (image_tensor, a batch of uint8 images) and outputs (num_detections, detection_boxes, detection_scores,
+# detection_classes):
+#   python -m tf2onnx.convert --graphdef frozen_inference_graph.pb --output model.onnx
+#       --inputs image_tensor:0 --outputs num_detections:0,detection_boxes:0,detection_scores:0,detection_classes:0
+class ONNXDetector(Detector):
+    # intra_op_num_threads is how many threads a single inference may use, and inter_op_num_threads how many
+    # independent operators may run at once. None leaves the choice to ONNX Runtime, which uses every core.
+    # Capping them leaves CPU for the rest of the flight loop.
+    def __init__(self, model_filepath='ssdlite_mobilenet_v2_coco_2018_05_09/model.onnx', detect_thresh=0.5,
+                 nms_thresh=None, max_detections=None, intra_op_num_threads=None, inter_op_num_threads=None):
+        print("Creating ONNXDetector")
+        session_options = onnxruntime.SessionOptions()
+        session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_num_threads is not None:
+            session_options.intra_op_num_threads = intra_op_num_threads
+        if inter_op_num_threads is not None:
+            session_options.inter_op_num_threads = inter_op_num_threads
+        self.session = onnxruntime.InferenceSession(model_filepath, sess_options=session_options,
+                                                    providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        # tf2onnx keeps TF's tensor names (e.g. detection_boxes:0), so strip the suffix to look them up.
+        self.output_names = [output.name for output in self.session.get_outputs()]
+        self.output_keys = [name.split(':')[0] for name in self.output_names]
+        # Post-processing parameters. See create_bbs_from_detections for what each one does.
+        self.detect_thresh = detect_thresh
+        self.nms_thresh = nms_thresh
+        self.max_detections = max_detections
+
+    def detect(self, image):
+        if self.session is None:
+            raise RuntimeError("ONNXDetector has been closed.")
+        outputs = self.session.run(self.output_names, {self.input_name: np.expand_dims(image, 0)})
+        output_dict = dict(zip(self.output_keys, outputs))
+        num_detections = int(output_dict['num_detections'][0])
+        return create_bbs_from_detections(output_dict['detection_boxes'][0][:num_detections],
+                                          output_dict['detection_scores'][0][:num_detections],
+                                          output_dict['detection_classes'][0][:num_detections].astype(np.int64),
+                                          image.shape,
+                                          detect_thresh=self.detect_thresh,
+                                          class_ids=(PERSON_CLASS_ID,),
+                                          nms_thresh=self.nms_thresh,
+                                          max_detections=self.max_detections)
+
+    def close(self):
+        self.session = None
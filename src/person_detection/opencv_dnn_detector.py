@@ -0,0 +1,58 @@
+from person_detection.detection_postprocessing import create_bbs_from_detections, PERSON_CLASS_ID
+from person_detection.detector_abc import Detector
+import cv2
+import numpy as np
+
+
+# Runs the same frozen ssdlite graph as TFDetector, but through OpenCV's DNN module instead of TensorFlow.
+# That avoids the (slow) TF import entirely and is usually faster on a laptop CPU.
+# OpenCV needs a text graph description alongside the frozen graph. Generate it once with the
+# tf_text_graph_ssd.py script that ships with OpenCV:
+#   python tf_text_graph_ssd.py --input frozen_inference_graph.pb --config pipeline.config
+#       --output ssdlite_mobilenet_v2_coco.pbtxt
+class OpenCVDNNDetector(Detector):
+    def __init__(self, model_filepath='ssdlite_mobilenet_v2_coco_2018_05_09/frozen_inference_graph.pb',
+                 config_filepath='ssdlite_mobilenet_v2_coco_2018_05_09/ssdlite_mobilenet_v2_coco.pbtxt',
+                 input_size=(300, 300), swap_rb=False, detect_thresh=0.5, nms_thresh=None, max_detections=None,
+                 num_threads=None):
+        print("Creating OpenCVDNNDetector")
+        self.net = cv2.dnn.readNetFromTensorflow(model_filepath, config_filepath)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        if num_threads is not None:
+            # Note that this is a process-wide OpenCV setting.
+            cv2.setNumThreads(num_threads)
+        # (width, height) that frames are resized to before inference. The ssdlite graph resizes its input to
+        # 300x300 itself, so doing it here first gives the same result with less work.
+        self.input_size = tuple(input_size)
+        # TFDetector feeds frames to the graph in the order they come from cv2 (BGR), so do the same here to
+        # get the same detections. Set swap_rb to feed RGB instead.
+        self.swap_rb = swap_rb
+        # Post-processing parameters. See create_bbs_from_detections for what each one does.
+        self.detect_thresh = detect_thresh
+        self.nms_thresh = nms_thresh
+        self.max_detections = max_detections
+
+    def detect(self, image):
+        if self.net is None:
+            raise RuntimeError("OpenCVDNNDetector has been closed.")
+        blob = cv2.dnn.blobFromImage(image, size=self.input_size, swapRB=self.swap_rb, crop=False)
+        self.net.setInput(blob)
+        return self.create_bbs_from_dnn_output(self.net.forward(), image.shape)
+
+    def close(self):
+        self.net = None
+
+    # Converts the output of OpenCV's DetectionOutput layer, which is a 1x1xNx7 array of
+    # [batch index, class id, score, xmin, ymin, xmax, ymax] rows with normalized coordinates, into a list of
+    # person BoundingBoxes.
+    def create_bbs_from_dnn_output(self, detections, image_shape):
+        detections = np.asarray(detections).reshape(-1, 7)
+        return create_bbs_from_detections(detections[:, [4, 3, 6, 5]],
+                                          detections[:, 2],
+                                          detections[:, 1].astype(np.int64),
+                                          image_shape,
+                                          detect_thresh=self.detect_thresh,
+                                          class_ids=(PERSON_CLASS_ID,),
+                                          nms_thresh=self.nms_thresh,
+                                          max_detections=self.max_detections)
@@ -1,61 +1,82 @@
-from utils.bounding_box import BoundingBox
+from person_detection.detection_postprocessing import corners_to_bounding_boxes, non_max_suppression
+from person_detection.detector_abc import Detector
 import cv2
-import imutils
-from imutils.object_detection import non_max_suppression
 import numpy as np
 
+# Settings for the HOG sliding window search, from slowest and most thorough to fastest.
+# win_stride is how far the window moves between positions, in pixels, scale is the ratio between the sizes
+# of successive levels of the image pyramid, and max_width is the width images are shrunk to first.
+SPEED_PRESETS = {
+    'accurate': {'win_stride': (4, 4), 'scale': 1.05, 'max_width': 400},
+    'balanced': {'win_stride': (8, 8), 'scale': 1.1, 'max_width': 400},
+    'fast': {'win_stride': (8, 8), 'scale': 1.2, 'max_width': 320},
+}
 
-# Object for encapsulating the logic to detect people in images. The key functionality is
-# in the detect_person method, which takes in a path to a saved image on disk and returns
-# a list of bounding boxes describing where there are people in the image.
-class PersonDetector:
-    # Initialize a few helper objects that will be used for detecting people.
-    def __init__(self):
-        # FIXME: why are we using HOG and SVMs instead of tensorflow?
+
+# Object for encapsulating the logic to detect people in images with HOG features and a linear SVM.
+# It doesn't need TensorFlow, so it's the fallback when no other detector backend is available.
+# The key functionality is in the detect method, which takes in an image and returns a list of bounding
+# boxes describing where there are people in the image.
+class PersonDetector(Detector):
+    # preset is one of SPEED_PRESETS. win_stride, scale and max_width override the preset's values.
+    # detectMultiScale already searches the levels of the image pyramid in parallel on OpenCV's own thread
+    # pool. num_threads sets how many threads that pool uses (None leaves OpenCV's default).
+    # nms_thresh is the overlap above which boxes are merged by non-maximum suppression. It's fairly large,
+    # to try to keep overlapping boxes that are still different people.
+    def __init__(self, preset='balanced', win_stride=None, scale=None, max_width=None, padding=(8, 8),
+                 nms_thresh=0.65, num_threads=None):
+        if preset not in SPEED_PRESETS:
+            raise ValueError("Unknown preset " + str(preset) + ", expected one of " + str(sorted(SPEED_PRESETS)))
+        settings = SPEED_PRESETS[preset]
+        self.win_stride = win_stride if win_stride is not None else settings['win_stride']
+        self.scale = scale if scale is not None else settings['scale']
+        self.max_width = max_width if max_width is not None else settings['max_width']
+        self.padding = padding
+        self.nms_thresh = nms_thresh
+        if num_threads is not None:
+            # Note that this is a process-wide OpenCV setting.
+            cv2.setNumThreads(num_threads)
         self.hog = cv2.HOGDescriptor()
         self.hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
 
+    # Given an image, returns a list of bounding boxes of the people in the image, sorted by decreasing score.
+    # Scores are the SVM margins squashed into [0, 1] with a logistic function.
+    # The image isn't modified.
+    def detect(self, image):
+        # Shrink the image first, since the search time grows with the number of pixels.
+        resize_ratio = 1.0
+        if image.shape[1] > self.max_width:
+            resize_ratio = self.max_width / float(image.shape[1])
+            image = cv2.resize(image, None, fx=resize_ratio, fy=resize_ratio, interpolation=cv2.INTER_AREA)
+
+        rects, weights = self.hog.detectMultiScale(image, winStride=self.win_stride, padding=self.padding,
+                                                   scale=self.scale)
+        if len(rects) == 0:
+            return []
+        corners = np.array([[x, y, x + w, y + h] for (x, y, w, h) in rects], dtype=np.float64)
+        weights = np.asarray(weights, dtype=np.float64).reshape(-1)
+        keep = non_max_suppression(corners, weights, self.nms_thresh)
+        scores = 1 / (1 + np.exp(-weights[keep]))
+        return corners_to_bounding_boxes(corners[keep] / resize_ratio, scores)
+
     # Given a path to an image, returns a list of bounding boxes of the people in the image.
     # We use a list rather than a single BoundingBox in case there are multiple people in the
     # photo at the same time.
+    # If visualize_bb is set, also shows the detections on a copy of the image.
     def detect_person(self, image_filepath, visualize_bb=False):
         image = cv2.imread(image_filepath)
-        # Resize image.
-        image = imutils.resize(image, width=min(400, image.shape[1]))
-        orig = image.copy()
-        # Detect people in the image.
-        rects, weights = self.hog.detectMultiScale(image, winStride=(4, 4), padding=(8, 8), scale=1.05)
-
-        # Draw the original bounding boxes
-        for (x, y, w, h) in rects:
-            cv2.rectangle(orig, (x, y), (x + w, y + h), (0, 0, 255), 2)
-
-        # apply non-maxima suppression to the bounding boxes using a
-        # fairly large overlap threshold to try to maintain overlapping
-        # boxes that are still people
-        rects = np.array([[x, y, x + w, y + h] for (x, y, w, h) in rects])
-        pick = non_max_suppression(rects, probs=None, overlapThresh=0.65)
-
-        # Draw the final bounding boxes
-        for (xA, yA, xB, yB) in pick:
-            cv2.rectangle(image, (xA, yA), (xB, yB), (0, 255, 0), 2)
-
-        # show some information on the number of bounding boxes
-        print("[INFO] {}: {} original boxes, {} after suppression".format(image_filepath, len(rects), len(pick)))
-
-        # Show the output images
+        bounding_boxes = self.detect(image)
+        print("[INFO] {}: {} boxes".format(image_filepath, len(bounding_boxes)))
+
+        # Show the output image
         if visualize_bb:
-            cv2.imshow("Before NMS", orig)
-            cv2.imshow("After NMS", image)
+            output_image = image.copy()
+            for bb in bounding_boxes:
+                width, height = bb.get_dimensions()
+                x, y = bb.get_centroid()
+                cv2.rectangle(output_image, (int(x - width / 2), int(y - height / 2)),
+                              (int(x + width / 2), int(y + height / 2)), (0, 255, 0), 2)
+            cv2.imshow("Detections", output_image)
             cv2.waitKey(2000)
 
-        # Convert from the rectangle format used in visualization to BoundingBoxes.
-        bounding_boxes = []
-        for (xA, yA, xB, yB) in pick:
-            centroid = (np.mean((xA, xB)), np.mean((yA, yB)))
-            width = np.abs(xA - xB)
-            height = np.abs(yA - yB)
-            bb = BoundingBox((width, height), centroid)
-            bounding_boxes.append(bb)
-
         return bounding_boxes
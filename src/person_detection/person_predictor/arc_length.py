@@ -0,0 +1,61 @@
+import numpy as np
+
+# Helpers for moving a given distance along a curve y = f(x).
+
+
+# Given a curve y = f(x) that accepts arrays of x (e.g. an np.poly1d or a CubicSpline), returns the points
+# reached by travelling each of the given distances along the curve from x = start_x, in the direction of
+# increasing x. Returns two arrays, the x and y of each point, in the same order as distances.
+# All the distances are answered at once: the curve is evaluated on one grid of x, the lengths of the little
+# chords between grid points are summed up with a cumulative sum, and each distance is located on it with a
+# binary search and interpolated within its chord.
+# The grid starts out evenly spaced in x, but on steep parts of the curve a small step in x can still be a long
+# chord, so chords longer than max_step are split until none are (or the grid reaches max_num_samples points).
+# Each result is then within one chord, i.e. max_step, of the right point along the curve, and it isn't biased
+# towards overshooting.
+# Travelling a distance d along the curve never takes more than d in x, so the grid only needs to span that.
+def project_along_curve(curve, start_x, distances, max_step=0.001, max_num_samples=200000, max_refinements=8):
+    distances = np.maximum(np.asarray(distances, dtype=np.float64).reshape(-1), 0)
+    start_y = float(curve(start_x))
+    max_distance = distances.max() if len(distances) > 0 else 0
+    if max_distance <= 0:
+        return np.full(len(distances), float(start_x)), np.full(len(distances), start_y)
+
+    num_samples = int(min(max(np.ceil(max_distance / max_step), 1), max_num_samples - 1)) + 1
+    x = np.linspace(start_x, start_x + max_distance, num_samples)
+    y = np.asarray(curve(x), dtype=np.float64)
+    chord_lengths = np.hypot(np.diff(x), np.diff(y))
+    for _ in range(max_refinements):
+        # Past the point where the longest distance is covered, the grid isn't needed, so don't refine it.
+        num_needed_chords = np.searchsorted(np.cumsum(chord_lengths), max_distance) + 1
+        x = x[:num_needed_chords + 1]
+        chord_lengths = chord_lengths[:num_needed_chords]
+        if chord_lengths.max() <= max_step or len(x) >= max_num_samples:
+            break
+        x = refine_grid(x, chord_lengths, max_step, max_num_samples)
+        y = np.asarray(curve(x), dtype=np.float64)
+        chord_lengths = np.hypot(np.diff(x), np.diff(y))
+    arc_lengths = np.concatenate([[0], np.cumsum(chord_lengths)])
+
+    # Index of the chord each distance ends up in, and how far along that chord it is.
+    chord_indices = np.clip(np.searchsorted(arc_lengths, distances, side='right') - 1, 0, len(chord_lengths) - 1)
+    fractions = (distances - arc_lengths[chord_indices]) / np.maximum(chord_lengths[chord_indices], 1e-12)
+    fractions = np.clip(fractions, 0, 1)
+    projected_x = x[chord_indices] + fractions * (x[chord_indices + 1] - x[chord_indices])
+    # Put the points back on the curve rather than leaving them on the chords.
+    return projected_x, np.asarray(curve(projected_x), dtype=np.float64)
+
+
+# Splits every chord of the grid x that's longer than max_step into equal steps in x, so each piece is about
+# max_step long. If that would take more than max_num_samples points, the chords are split proportionally
+# less. Returns the new grid, which still includes every point of x.
+def refine_grid(x, chord_lengths, max_step, max_num_samples):
+    num_pieces = np.maximum(np.ceil(chord_lengths / max_step), 1)
+    if num_pieces.sum() + 1 > max_num_samples:
+        num_pieces = np.maximum(np.floor(num_pieces * (max_num_samples - 1) / num_pieces.sum()), 1)
+    num_pieces = num_pieces.astype(np.int64)
+    # For every new point: the chord it's in, and how many pieces along that chord it is.
+    chord_indices = np.repeat(np.arange(len(num_pieces)), num_pieces)
+    piece_indices = np.arange(len(chord_indices)) - np.repeat(np.cumsum(num_pieces) - num_pieces, num_pieces)
+    steps = np.diff(x) / num_pieces
+    return np.append(x[chord_indices] + piece_indices * steps[chord_indices], x[-1])
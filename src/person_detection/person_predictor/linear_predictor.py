@@ -1,4 +1,5 @@
-import time
+from person_detection.person_predictor.person_state_history import PersonStateHistory
+from utils.clock import RealClock
 from utils.person_state import PersonState
 
 
@@ -8,22 +9,23 @@ from utils.person_state import PersonState
 # linear projection is very crude, so other predictors should eventually
 # replace this object.
 class LinearPredictor:
-    def __init__(self, num_states_to_track=5):
-        self.person_states = []
+    def __init__(self, num_states_to_track=5, clock=None):
+        self.person_states = PersonStateHistory(num_states_to_track)
         self.num_states_to_track = num_states_to_track
+        # Where timestamps come from. See utils/clock.py.
+        self.clock = clock if clock is not None else RealClock()
 
     def add_person_state(self, person_state):
-        current_time = time.time()  # Gets the current time in seconds
-        self.person_states.append((person_state, current_time))
-        if len(self.person_states) > self.num_states_to_track:
-            del self.person_states[0]  # Get rid of most stale person state.
+        current_time = self.clock.time()  # Gets the current time in seconds
+        # Once the history is full, this gets rid of the most stale person state.
+        self.person_states.append(person_state, current_time)
 
     # Accept as input a list of seconds to project into the future (e.g. [10, 15] means
     # that this method should return predictions for the drone 10 and 15 seconds from
     # now).
     def predict_next_person_state(self, time_deltas_to_predict):
         # Translate time_deltas into global times
-        current_time = time.time()
+        current_time = self.clock.time()
         times_to_predict = [time_delta + current_time for time_delta in time_deltas_to_predict]
 
         num_datapoints = len(self.person_states)
@@ -32,9 +34,9 @@ class LinearPredictor:
             return None
         if num_datapoints == 1:
             print("WARNING: asked to predict but only given a single past datapoint.")
-            return [self.person_states[0][0] for _ in times_to_predict]
-        oldest_state, oldest_time = self.person_states[0]
-        newest_state, newest_time = self.person_states[-1]
+            return [self.person_states.get_newest()[0] for _ in times_to_predict]
+        oldest_state, oldest_time = self.person_states.get_oldest()
+        newest_state, newest_time = self.person_states.get_newest()
 
         delta_x_per_sec = (newest_state.x - oldest_state.x) / (newest_time - oldest_time)
         delta_y_per_sec = (newest_state.y - oldest_state.y) / (newest_time - oldest_time)
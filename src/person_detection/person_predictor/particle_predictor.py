@@ -0,0 +1,167 @@
+import numpy as np
+from utils.clock import RealClock
+from utils.person_state import PersonState
+
+
+# Class used for predicting where a person will go, and how sure we are about it.
+# A particle filter over [x, y, speed, heading, turn rate], where each particle also follows one of three
+# motion models: standing still, walking at constant velocity, or walking while turning at a constant rate.
+# Particles switch models at random, so the filter works out which one best explains the person's recent
+# motion (see get_model_probabilities), the way an interacting multiple model filter would.
+# All particles are moved together as NumPy arrays, and predictions for every requested time are rolled out
+# at once. Predicted PersonStates carry the covariance of the particles' positions, which grows with the
+# prediction horizon.
+class ParticlePredictor:
+    # Motion models.
+    STILL = 0
+    CONSTANT_VELOCITY = 1
+    TURNING = 2
+    NUM_MODELS = 3
+
+    # Noise parameters are standard deviations: measurement_noise in meters, and the others per sqrt(second)
+    # of random drift in speed (m/s), heading (rad) and turn rate (rad/s).
+    # model_switch_rate is the probability per second of a particle switching to a different motion model.
+    # If a measurement is more than gate_distance measurement_noise standard deviations away from every
+    # particle, the person is assumed to have jumped (e.g. the tracker switched people) and the filter starts
+    # over from the measurement.
+    def __init__(self, num_particles=500, measurement_noise=0.3, speed_noise=0.5, heading_noise=0.3,
+                 turn_rate_noise=0.2, model_switch_rate=0.2, max_speed=3.0, gate_distance=5.0, random_seed=None,
+                 clock=None):
+        self.num_particles = num_particles
+        self.measurement_noise = measurement_noise
+        self.speed_noise = speed_noise
+        self.heading_noise = heading_noise
+        self.turn_rate_noise = turn_rate_noise
+        self.model_switch_rate = model_switch_rate
+        self.max_speed = max_speed
+        self.gate_distance = gate_distance
+        self.random_state = np.random.RandomState(random_seed)
+        # Where default timestamps and "now" come from. See utils/clock.py.
+        self.clock = clock if clock is not None else RealClock()
+
+        self.x = None
+        self.y = None
+        self.speed = None
+        self.heading = None
+        self.turn_rate = None
+        self.models = None
+        self.weights = None
+        self.latest_time = None
+        self.latest_person_state = None
+
+    # timestamp is when the person was at person_state, in seconds. Defaults to now.
+    def add_person_state(self, person_state, timestamp=None):
+        current_time = self.clock.time() if timestamp is None else timestamp
+        if self.x is None:
+            self.initialize_particles(person_state)
+        else:
+            self.propagate(max(current_time - self.latest_time, 0.0))
+            self.update(person_state)
+        self.latest_time = current_time
+        self.latest_person_state = person_state
+
+    # Spreads the particles around the first measurement, with no idea yet of how the person is moving.
+    def initialize_particles(self, person_state):
+        n = self.num_particles
+        self.x = person_state.x + self.random_state.normal(0, self.measurement_noise, n)
+        self.y = person_state.y + self.random_state.normal(0, self.measurement_noise, n)
+        self.speed = self.random_state.uniform(0, self.max_speed, n)
+        self.heading = self.random_state.uniform(-np.pi, np.pi, n)
+        self.turn_rate = self.random_state.normal(0, self.turn_rate_noise, n)
+        self.models = self.random_state.randint(0, ParticlePredictor.NUM_MODELS, n)
+        self.weights = np.full(n, 1.0 / n)
+
+    # Moves every particle forward by dt seconds, with random drift and model switches.
+    def propagate(self, dt):
+        n = self.num_particles
+        switch = self.random_state.uniform(size=n) < self.model_switch_rate * dt
+        self.models = np.where(switch, (self.models + self.random_state.randint(1, ParticlePredictor.NUM_MODELS, n)) %
+                               ParticlePredictor.NUM_MODELS, self.models)
+        sqrt_dt = np.sqrt(dt)
+        self.speed = np.clip(self.speed + self.random_state.normal(0, self.speed_noise * sqrt_dt, n), 0,
+                             self.max_speed)
+        self.heading = self.heading + self.random_state.normal(0, self.heading_noise * sqrt_dt, n)
+        self.turn_rate = self.turn_rate + self.random_state.normal(0, self.turn_rate_noise * sqrt_dt, n)
+        x, y = self.rollout(np.array([dt]))
+        self.heading = self.heading + self.get_effective_turn_rate() * dt
+        self.x = x[0]
+        self.y = y[0]
+
+    # Reweights the particles by how well they explain the measured position, resampling if too few of
+    # them are doing the explaining.
+    def update(self, person_state):
+        squared_distance = (self.x - person_state.x) ** 2 + (self.y - person_state.y) ** 2
+        log_likelihood = -squared_distance / (2 * self.measurement_noise ** 2)
+        # Gate on the unnormalized likelihood: the weights below are rescaled so the best particle always counts,
+        # which would otherwise collapse the filter onto that one particle.
+        if not np.isfinite(log_likelihood.max()) or log_likelihood.max() < -self.gate_distance ** 2 / 2.0:
+            # Nothing explains the measurement; the person must have jumped. Start over from here.
+            self.initialize_particles(person_state)
+            return
+        weights = self.weights * np.exp(log_likelihood - log_likelihood.max())
+        self.weights = weights / weights.sum()
+        effective_num_particles = 1.0 / np.sum(self.weights ** 2)
+        if effective_num_particles < self.num_particles / 2.0:
+            self.resample()
+
+    # Systematic resampling: draws num_particles particles in proportion to their weights.
+    def resample(self):
+        positions = (self.random_state.uniform() + np.arange(self.num_particles)) / self.num_particles
+        indices = np.minimum(np.searchsorted(np.cumsum(self.weights), positions), self.num_particles - 1)
+        self.x = self.x[indices]
+        self.y = self.y[indices]
+        self.speed = self.speed[indices]
+        self.heading = self.heading[indices]
+        self.turn_rate = self.turn_rate[indices]
+        self.models = self.models[indices]
+        self.weights = np.full(self.num_particles, 1.0 / self.num_particles)
+
+    def get_effective_speed(self):
+        return np.where(self.models == ParticlePredictor.STILL, 0.0, self.speed)
+
+    def get_effective_turn_rate(self):
+        return np.where(self.models == ParticlePredictor.TURNING, self.turn_rate, 0.0)
+
+    # Returns the positions of every particle after each of the times in dts (in seconds), following its
+    # motion model with no further noise, as two arrays of shape (len(dts), num_particles).
+    def rollout(self, dts):
+        dts = np.asarray(dts, dtype=np.float64)[:, np.newaxis]
+        speed = self.get_effective_speed()[np.newaxis, :]
+        turn_rate = self.get_effective_turn_rate()[np.newaxis, :]
+        heading = self.heading[np.newaxis, :]
+        # Closed form for a constant turn rate, which becomes a straight line as the turn rate goes to zero.
+        turning = np.abs(turn_rate) > 1e-6
+        safe_turn_rate = np.where(turning, turn_rate, 1.0)
+        new_heading = heading + turn_rate * dts
+        dx = np.where(turning, speed / safe_turn_rate * (np.sin(new_heading) - np.sin(heading)),
+                      speed * np.cos(heading) * dts)
+        dy = np.where(turning, speed / safe_turn_rate * (np.cos(heading) - np.cos(new_heading)),
+                      speed * np.sin(heading) * dts)
+        return self.x[np.newaxis, :] + dx, self.y[np.newaxis, :] + dy
+
+    # Returns the weighted probability of each motion model (indexed by STILL, CONSTANT_VELOCITY, TURNING).
+    def get_model_probabilities(self):
+        return np.bincount(self.models, weights=self.weights, minlength=ParticlePredictor.NUM_MODELS)
+
+    # Accept as input a list of seconds to project into the future (e.g. [10, 15] means
+    # that this method should return predictions for the drone 10 and 15 seconds from
+    # now).
+    # Each PersonState is the weighted mean of the particles, with their 2x2 covariance.
+    def predict_next_person_state(self, time_deltas_to_predict):
+        if self.x is None:
+            print("ERROR: cannot predict if not given any past data")
+            return None
+        dts = np.asarray(time_deltas_to_predict, dtype=np.float64) + max(self.clock.time() - self.latest_time, 0.0)
+        x, y = self.rollout(dts)
+        mean_x = x.dot(self.weights)
+        mean_y = y.dot(self.weights)
+        dx = x - mean_x[:, np.newaxis]
+        dy = y - mean_y[:, np.newaxis]
+        var_x = (dx ** 2).dot(self.weights)
+        var_y = (dy ** 2).dot(self.weights)
+        cov_xy = (dx * dy).dot(self.weights)
+        projections = []
+        for i in range(len(dts)):
+            covariance = np.array([[var_x[i], cov_xy[i]], [cov_xy[i], var_y[i]]])
+            projections.append(PersonState(float(mean_x[i]), float(mean_y[i]), covariance=covariance))
+        return projections
@@ -0,0 +1,74 @@
+import numpy as np
+from utils.person_state import PersonState
+
+
+# Fixed-capacity history of timestamped person positions, shared by the person predictors.
+# Times and positions live in preallocated NumPy arrays, so appending never allocates, and once the history
+# is full each new state silently pushes out the oldest one.
+# Every value is written twice, capacity entries apart, so the states in order from oldest to newest always
+# sit next to each other in memory. That way get_times, get_x and get_y return views into the arrays rather
+# than copies. The views are only valid until the next change to the history.
+class PersonStateHistory:
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1, got " + str(capacity))
+        self.capacity = capacity
+        self.times = np.zeros(2 * capacity)
+        self.x = np.zeros(2 * capacity)
+        self.y = np.zeros(2 * capacity)
+        self.newest_index = -1  # Index (in the first copy) of the newest state.
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        self.newest_index = -1
+        self.size = 0
+
+    # Adds a state at the given time, dropping the oldest state if the history is full.
+    def append(self, person_state, timestamp):
+        self.newest_index = (self.newest_index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.write(self.newest_index, person_state, timestamp)
+
+    # Overwrites the newest state. The history must not be empty.
+    def replace_newest(self, person_state, timestamp):
+        self.write(self.newest_index, person_state, timestamp)
+
+    def write(self, index, person_state, timestamp):
+        for array, value in ((self.times, timestamp), (self.x, person_state.x), (self.y, person_state.y)):
+            array[index] = value
+            array[index + self.capacity] = value
+
+    # Returns the slice of the arrays holding the states from oldest to newest.
+    def get_window(self):
+        end = self.newest_index + self.capacity + 1
+        return slice(end - self.size, end)
+
+    def get_times(self):
+        return self.times[self.get_window()]
+
+    def get_x(self):
+        return self.x[self.get_window()]
+
+    def get_y(self):
+        return self.y[self.get_window()]
+
+    # Returns the i-th oldest state and its time as a (PersonState, time) tuple. Negative i counts back
+    # from the newest state, like list indexing.
+    def get(self, i):
+        if not -self.size <= i < self.size:
+            raise IndexError("history index out of range")
+        index = self.get_window().start + (i % self.size)
+        return PersonState(float(self.x[index]), float(self.y[index])), float(self.times[index])
+
+    def get_oldest(self):
+        return self.get(0)
+
+    def get_newest(self):
+        return self.get(-1)
+
+    # Total distance travelled from the oldest state to the newest one, following every state in between.
+    def get_distance_covered(self):
+        return float(np.sum(np.hypot(np.diff(self.get_x()), np.diff(self.get_y()))))
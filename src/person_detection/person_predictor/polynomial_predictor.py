@@ -1,40 +1,95 @@
 import numpy as np
 import matplotlib.pyplot as plt
-import time
+from person_detection.person_predictor.arc_length import project_along_curve
+from person_detection.person_predictor.person_state_history import PersonStateHistory
+from utils.clock import RealClock
 from utils.person_state import PersonState
 
 
 # Class used for predicting where a person will go.
 # Uses a sliding window for some fixed number of PersonStates in the past.
 # Fits a polynomial to project into the future.
+# Newer states can be given more weight: each state counts weight_decay_factor times as much as the one
+# before it. The fit keeps the weighted normal equations of the least squares problem up to date as states
+# come and go, so each new state costs O(poly_degree^2) no matter how long the window or how steep the
+# weighting.
+# Raw powers of x are badly conditioned once the person is a few meters from the origin, and forming the normal
+# equations squares that. So the features are powers of u = (x - reference_x) / reference_scale, where the
+# window is centered on reference_x and reference_scale is its half-width. Both are re-based whenever the sums are
+# rebuilt, which also happens as soon as a new state lands more than REBASE_DISTANCE half-widths from the center.
+# A person walking steadily in one direction therefore triggers a rebuild at most every few window lengths'
+# worth of states, which keeps the amortized cost per state at O(poly_degree^2).
 class PolynomialPredictor:
-    def __init__(self, num_states_to_track=4, poly_degree=2, weight_decay_factor=1):
-        self.person_states = []
+    REBASE_DISTANCE = 2
+    # Smallest half-width (in meters) used to scale x, so a window of identical x doesn't divide by zero.
+    MIN_REFERENCE_SCALE = 1e-6
+
+    def __init__(self, num_states_to_track=4, poly_degree=2, weight_decay_factor=1, refit_interval=1000,
+                 clock=None):
+        self.person_states = PersonStateHistory(num_states_to_track)
         self.num_states_to_track = num_states_to_track
+        # Where timestamps come from. See utils/clock.py.
+        self.clock = clock if clock is not None else RealClock()
         self.poly_degree = poly_degree
         self.poly = None
-        self.weight_decay_factor = weight_decay_factor  # Some crazy stuff I'm doing about weighting the poly.
+        self.weight_decay_factor = weight_decay_factor
+        # Sum over the window of weight * features * features^T, and of weight * features * y, where the
+        # features of x are [u^poly_degree, ..., u, 1] for u = (x - reference_x) / reference_scale. The newest
+        # state always has weight 1.
+        self.reference_x = 0.0
+        self.reference_scale = 1.0
+        self.normal_matrix = np.zeros((poly_degree + 1, poly_degree + 1))
+        self.normal_vector = np.zeros(poly_degree + 1)
+        # Removing states from the sums slowly accumulates rounding error, so every refit_interval states
+        # they're rebuilt from scratch.
+        self.refit_interval = refit_interval
+        self.num_updates = 0
+
+    def get_features(self, x):
+        u = (np.asarray(x, dtype=np.float64) - self.reference_x) / self.reference_scale
+        return u ** np.arange(self.poly_degree, -1, -1)
 
     def add_person_state(self, person_state):
-        current_time = time.time()  # Gets the current time in seconds
-        self.person_states.append((person_state, current_time))
-        if len(self.person_states) > self.num_states_to_track:
-            del self.person_states[0]  # Get rid of most stale person state.
+        current_time = self.clock.time()  # Gets the current time in seconds
+        forgetting_factor = 1.0 / self.weight_decay_factor
+        if len(self.person_states) == self.num_states_to_track:
+            # The most stale person state is about to be pushed out of the window, so take it out of the fit.
+            oldest_state, _ = self.person_states.get_oldest()
+            oldest_weight = forgetting_factor ** (self.num_states_to_track - 1)
+            features = self.get_features(oldest_state.x)
+            self.normal_matrix -= oldest_weight * np.outer(features, features)
+            self.normal_vector -= oldest_weight * features * oldest_state.y
+        self.person_states.append(person_state, current_time)
+        self.num_updates += 1
+
+        far_from_reference = (abs(person_state.x - self.reference_x) >
+                              PolynomialPredictor.REBASE_DISTANCE * self.reference_scale)
+        if self.num_updates % self.refit_interval == 0 or far_from_reference:
+            self.rebuild_normal_equations()
+        else:
+            features = self.get_features(person_state.x)
+            self.normal_matrix = forgetting_factor * self.normal_matrix + np.outer(features, features)
+            self.normal_vector = forgetting_factor * self.normal_vector + features * person_state.y
 
         # If there are enough states to fit a predictor, do so.
         if len(self.person_states) >= self.poly_degree:
-            x_data = [state_time_tuple[0].x for state_time_tuple in self.person_states]
-            y_data = [state_time_tuple[0].y for state_time_tuple in self.person_states]
-            weighted_x_data = []
-            weighted_y_data = []
-            for i, x in enumerate(x_data):
-                weight_factor = self.weight_decay_factor ** i
-                y = y_data[i]
-                for j in range(weight_factor):
-                    weighted_x_data.append(x)
-                    weighted_y_data.append(y)
-            quadratic_coeffs = np.polyfit(weighted_x_data, weighted_y_data, self.poly_degree)
-            self.poly = np.poly1d(quadratic_coeffs)
+            # lstsq rather than solve, since the system is singular until there are more states than
+            # coefficients.
+            coeffs = np.linalg.lstsq(self.normal_matrix, self.normal_vector, rcond=None)[0]
+            # Substitute u = (x - reference_x) / reference_scale to get the polynomial in x.
+            self.poly = np.poly1d(coeffs)(np.poly1d([1.0 / self.reference_scale,
+                                                     -self.reference_x / self.reference_scale]))
+
+    # Re-centers the features on the states in the window and recomputes the normal equations from them.
+    def rebuild_normal_equations(self):
+        x_data = self.person_states.get_x()
+        y_data = self.person_states.get_y()
+        self.reference_x = (x_data.max() + x_data.min()) / 2
+        self.reference_scale = max((x_data.max() - x_data.min()) / 2, PolynomialPredictor.MIN_REFERENCE_SCALE)
+        weights = (1.0 / self.weight_decay_factor) ** np.arange(len(x_data) - 1, -1, -1)
+        features = self.get_features(x_data[:, np.newaxis])
+        self.normal_matrix = (features * weights[:, np.newaxis]).T.dot(features)
+        self.normal_vector = (features * weights[:, np.newaxis]).T.dot(y_data)
 
     # Accept as input a list of seconds to project into the future (e.g. [10, 15] means
     # that this method should return predictions for the drone 10 and 15 seconds from
@@ -46,46 +101,23 @@ class PolynomialPredictor:
             return None
         if num_datapoints == 1:
             print("WARNING: asked to predict but only given a single past datapoint.")
-            return [self.person_states[0][0] for _ in time_deltas_to_predict]
+            return [self.person_states.get_newest()[0] for _ in time_deltas_to_predict]
 
         # Estimate the distance covered so we can back out the velocity
-        distance_covered = 0
-        for i in range(len(self.person_states) - 1):
-            current_state = self.person_states[i][0]
-            next_state = self.person_states[i + 1][0]
-            distance_covered += np.sqrt((current_state.x - next_state.x)**2 + (current_state.y - next_state.y)**2)
-        oldest_state, oldest_time = self.person_states[0]
-        newest_state, newest_time = self.person_states[-1]
+        distance_covered = self.person_states.get_distance_covered()
+        oldest_state, oldest_time = self.person_states.get_oldest()
+        newest_state, newest_time = self.person_states.get_newest()
         projected_speed = distance_covered / (newest_time - oldest_time)
 
-        # Project for each of the requested times
-        projections = []
-        step_size_x = 0.00001  # The smaller the better resolution, but also slower computationally.
-        for time_delta in time_deltas_to_predict:
-            distance_to_cover = time_delta * projected_speed
-            # Inch forward along the curve
-            previous_x = newest_state.x
-            previous_y = newest_state.y
-            projected_x = previous_x + step_size_x
-            projected_y = self.poly(projected_x)
-            distance_projected = 0
-            # Obviously, this is a numerical method that's inexact, and what I'm doing will always overshoot
-            # instead of finding an unbiased estimate, and it's computationally inefficient because I'm
-            # stepping forward linearly instead of growing step size exponentially. It's super easy to implement
-            # and understand, at least.
-            while distance_projected < distance_to_cover:
-                projected_x = previous_x + step_size_x
-                projected_y = self.poly(projected_x)
-                distance_projected += np.sqrt(step_size_x**2 + (projected_y - previous_y)**2)
-                previous_x = projected_x
-                previous_y = projected_y
-            print("Overshot distance by:", distance_projected - distance_to_cover)
-            projections.append(PersonState(projected_x, projected_y))
+        # Project all the requested times at once, by walking the distance each one covers along the curve.
+        distances_to_cover = np.asarray(time_deltas_to_predict, dtype=np.float64) * projected_speed
+        projected_x, projected_y = project_along_curve(self.poly, newest_state.x, distances_to_cover)
+        projections = [PersonState(float(x), float(y)) for x, y in zip(projected_x, projected_y)]
         return projections
 
     def plot_projections(self, projections):
-        x_data = [state_time_tuple[0].x for state_time_tuple in self.person_states]
-        y_data = [state_time_tuple[0].y for state_time_tuple in self.person_states]
+        x_data = list(self.person_states.get_x())
+        y_data = list(self.person_states.get_y())
 
         projected_x = [projection.x for projection in projections]
         projected_y = [projection.y for projection in projections]
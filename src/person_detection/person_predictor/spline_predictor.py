@@ -1,28 +1,33 @@
 import matplotlib.pyplot as plt
 import numpy as np
 from scipy.interpolate import CubicSpline
-import time
+from person_detection.person_predictor.arc_length import project_along_curve
+from person_detection.person_predictor.person_state_history import PersonStateHistory
+from utils.clock import RealClock
 from utils.person_state import PersonState
 
 
 class SplinePredictor:
-    def __init__(self, num_states_to_track=4, bc_type='not-a-knot', extrapolation_type=True):
-        self.person_states = []
+    def __init__(self, num_states_to_track=4, bc_type='not-a-knot', extrapolation_type=True, clock=None):
+        self.person_states = PersonStateHistory(num_states_to_track)
         self.num_states_to_track = num_states_to_track
+        # Where timestamps come from. See utils/clock.py.
+        self.clock = clock if clock is not None else RealClock()
         self.bc_type = bc_type
         self.extrapolation_type = extrapolation_type
         self.spline = None
 
     def add_person_state(self, person_state):
-        current_time = time.time()  # Gets the current time in seconds
-        self.person_states.append((person_state, current_time))
-        if len(self.person_states) > self.num_states_to_track:
-            del self.person_states[0]  # Get rid of most stale person state.
+        current_time = self.clock.time()  # Gets the current time in seconds
+        # Once the history is full, this gets rid of the most stale person state.
+        self.person_states.append(person_state, current_time)
 
         # If there are enough states to fit a predictor, do so.
         if len(self.person_states) >= 3:
-            x_data = [state_time_tuple[0].x for state_time_tuple in self.person_states]
-            y_data = [state_time_tuple[0].y for state_time_tuple in self.person_states]
+            # CubicSpline keeps a reference to its breakpoints, so give it its own copy rather than a view
+            # into the history, which will be overwritten.
+            x_data = self.person_states.get_x().copy()
+            y_data = self.person_states.get_y()
             self.spline = CubicSpline(x_data, y_data, bc_type=self.bc_type, extrapolate=self.extrapolation_type)
 
     # Accept as input a list of seconds to project into the future (e.g. [10, 15] means
@@ -35,46 +40,23 @@ class SplinePredictor:
             return None
         if num_datapoints == 1:
             print("WARNING: asked to predict but only given a single past datapoint.")
-            return [self.person_states[0][0] for _ in time_deltas_to_predict]
+            return [self.person_states.get_newest()[0] for _ in time_deltas_to_predict]
 
         # Estimate the distance covered so we can back out the velocity
-        distance_covered = 0
-        for i in range(len(self.person_states) - 1):
-            current_state = self.person_states[i][0]
-            next_state = self.person_states[i + 1][0]
-            distance_covered += np.sqrt((current_state.x - next_state.x)**2 + (current_state.y - next_state.y)**2)
-        oldest_state, oldest_time = self.person_states[0]
-        newest_state, newest_time = self.person_states[-1]
+        distance_covered = self.person_states.get_distance_covered()
+        oldest_state, oldest_time = self.person_states.get_oldest()
+        newest_state, newest_time = self.person_states.get_newest()
         projected_speed = distance_covered / (newest_time - oldest_time)
 
-        # Project for each of the requested times
-        projections = []
-        step_size_x = 0.01  # The smaller the better resolution, but also slower computationally.
-        for time_delta in time_deltas_to_predict:
-            distance_to_cover = time_delta * projected_speed
-            # Inch forward along the curve
-            previous_x = newest_state.x
-            previous_y = newest_state.y
-            projected_x = previous_x + step_size_x
-            projected_y = self.spline(projected_x)
-            distance_projected = 0
-            # Obviously, this is a numerical method that's inexact, and what I'm doing will always overshoot
-            # instead of finding an unbiased estimate, and it's computationally inefficient because I'm
-            # stepping forward linearly instead of growing step size exponentially. It's super easy to implement
-            # and understand, at least.
-            while distance_projected < distance_to_cover:
-                projected_x = previous_x + step_size_x
-                projected_y = self.spline(projected_x)
-                distance_projected += np.sqrt(step_size_x**2 + (projected_y - previous_y)**2)
-                previous_x = projected_x
-                previous_y = projected_y
-            print("Overshot distance by:", distance_projected - distance_to_cover)
-            projections.append(PersonState(projected_x, projected_y))
+        # Project all the requested times at once, by walking the distance each one covers along the curve.
+        distances_to_cover = np.asarray(time_deltas_to_predict, dtype=np.float64) * projected_speed
+        projected_x, projected_y = project_along_curve(self.spline, newest_state.x, distances_to_cover)
+        projections = [PersonState(float(x), float(y)) for x, y in zip(projected_x, projected_y)]
         return projections
 
     def plot_projections(self, projections):
-        x_data = [state_time_tuple[0].x for state_time_tuple in self.person_states]
-        y_data = [state_time_tuple[0].y for state_time_tuple in self.person_states]
+        x_data = list(self.person_states.get_x())
+        y_data = list(self.person_states.get_y())
 
         projected_x = [projection.x for projection in projections]
         projected_y = [projection.y for projection in projections]
@@ -0,0 +1,55 @@
+import numpy as np
+from person_detection.person_predictor.person_state_history import PersonStateHistory
+from utils.clock import RealClock
+from utils.person_state import PersonState
+
+
+# Class used for predicting where a person will go.
+# Uses a sliding window for some fixed number of PersonStates in the past.
+# Unlike PolynomialPredictor, which fits y as a function of x, this fits x and y separately as polynomials
+# of time. That works whichever way the person is heading (including straight along the y axis, or doubling
+# back), and predicting is just evaluating both polynomials at the requested times.
+class TimePolynomialPredictor:
+    def __init__(self, num_states_to_track=4, poly_degree=2, clock=None):
+        self.person_states = PersonStateHistory(num_states_to_track)
+        self.num_states_to_track = num_states_to_track
+        # Where default timestamps and "now" come from. See utils/clock.py.
+        self.clock = clock if clock is not None else RealClock()
+        self.poly_degree = poly_degree
+        self.x_poly = None
+        self.y_poly = None
+
+    # timestamp is when the person was at person_state, in seconds. Defaults to now.
+    def add_person_state(self, person_state, timestamp=None):
+        current_time = self.clock.time() if timestamp is None else timestamp
+        # Once the history is full, this gets rid of the most stale person state.
+        self.person_states.append(person_state, current_time)
+
+        # Fit the highest degree that the data supports, up to poly_degree.
+        if len(self.person_states) >= 2:
+            times = self.person_states.get_times()
+            # Times are relative to the newest state to keep the fit well conditioned.
+            t_data = times - times[-1]
+            x_data = self.person_states.get_x()
+            y_data = self.person_states.get_y()
+            degree = min(self.poly_degree, len(np.unique(t_data)) - 1)
+            if degree < 1:
+                return
+            self.x_poly = np.poly1d(np.polyfit(t_data, x_data, degree))
+            self.y_poly = np.poly1d(np.polyfit(t_data, y_data, degree))
+
+    # Accept as input a list of seconds to project into the future (e.g. [10, 15] means
+    # that this method should return predictions for the drone 10 and 15 seconds from
+    # now).
+    def predict_next_person_state(self, time_deltas_to_predict):
+        num_datapoints = len(self.person_states)
+        if num_datapoints == 0:
+            print("ERROR: cannot predict if not given any past data")
+            return None
+        if self.x_poly is None:
+            print("WARNING: asked to predict but only given a single past datapoint.")
+            return [self.person_states.get_newest()[0] for _ in time_deltas_to_predict]
+
+        newest_time = self.person_states.get_newest()[1]
+        t = np.asarray(time_deltas_to_predict, dtype=np.float64) + (self.clock.time() - newest_time)
+        return [PersonState(float(x), float(y)) for x, y in zip(self.x_poly(t), self.y_poly(t))]
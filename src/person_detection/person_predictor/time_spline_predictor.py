@@ -0,0 +1,59 @@
+import numpy as np
+from scipy.interpolate import CubicSpline
+from person_detection.person_predictor.person_state_history import PersonStateHistory
+from utils.clock import RealClock
+from utils.person_state import PersonState
+
+
+# Class used for predicting where a person will go.
+# Like SplinePredictor, but fits x and y separately as cubic splines of time instead of y as a spline of x.
+# Timestamps always increase, so this never fails the way a y(x) spline does when the person isn't moving
+# towards increasing x, and predicting is just evaluating both splines at the requested times.
+class TimeSplinePredictor:
+    def __init__(self, num_states_to_track=4, bc_type='not-a-knot', extrapolation_type=True, clock=None):
+        self.person_states = PersonStateHistory(num_states_to_track)
+        self.num_states_to_track = num_states_to_track
+        # Where default timestamps and "now" come from. See utils/clock.py.
+        self.clock = clock if clock is not None else RealClock()
+        self.bc_type = bc_type
+        self.extrapolation_type = extrapolation_type
+        self.x_spline = None
+        self.y_spline = None
+
+    # timestamp is when the person was at person_state, in seconds. Defaults to now.
+    def add_person_state(self, person_state, timestamp=None):
+        current_time = self.clock.time() if timestamp is None else timestamp
+        if len(self.person_states) > 0 and current_time <= self.person_states.get_newest()[1]:
+            # Splines need strictly increasing times, so a state with the same timestamp replaces the last one.
+            self.person_states.replace_newest(person_state, self.person_states.get_newest()[1])
+        else:
+            # Once the history is full, this gets rid of the most stale person state.
+            self.person_states.append(person_state, current_time)
+
+        if len(self.person_states) >= 2:
+            times = self.person_states.get_times()
+            # Times are relative to the newest state to keep the fit well conditioned.
+            t_data = times - times[-1]
+            x_data = self.person_states.get_x()
+            y_data = self.person_states.get_y()
+            self.x_spline = CubicSpline(t_data, x_data, bc_type=self.bc_type, extrapolate=self.extrapolation_type)
+            self.y_spline = CubicSpline(t_data, y_data, bc_type=self.bc_type, extrapolate=self.extrapolation_type)
+        else:
+            self.x_spline = None
+            self.y_spline = None
+
+    # Accept as input a list of seconds to project into the future (e.g. [10, 15] means
+    # that this method should return predictions for the drone 10 and 15 seconds from
+    # now).
+    def predict_next_person_state(self, time_deltas_to_predict):
+        num_datapoints = len(self.person_states)
+        if num_datapoints == 0:
+            print("ERROR: cannot predict if not given any past data")
+            return None
+        if self.x_spline is None:
+            print("WARNING: asked to predict but only given a single past datapoint.")
+            return [self.person_states.get_newest()[0] for _ in time_deltas_to_predict]
+
+        newest_time = self.person_states.get_newest()[1]
+        t = np.asarray(time_deltas_to_predict, dtype=np.float64) + (self.clock.time() - newest_time)
+        return [PersonState(float(x), float(y)) for x, y in zip(self.x_spline(t), self.y_spline(t))]
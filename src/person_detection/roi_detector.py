@@ -0,0 +1,77 @@
+from person_detection.detector_abc import Detector
+from utils.bounding_box import BoundingBox
+import cv2
+
+
+# Wraps another Detector so that, while a person is being tracked, only a padded window around them is run
+# through the detector instead of the whole frame. Smaller inputs take much less time per frame.
+# Tell it where the tracked person is with update_tracked_bb (e.g. with the CinematicController's
+# smoothed_bounding_box after each step). The whole frame is still searched when nobody is tracked, when
+# nobody is found in the window (the track was lost), and every full_frame_interval frames, so new people
+# and fast movement aren't missed for long.
+# Boxes are always returned in full-frame coordinates.
+class ROIDetector(Detector):
+    # padding is how much room to leave around the tracked box on each side, as a fraction of its size.
+    # min_roi_size is the smallest (width, height) window to search, in pixels.
+    # Anything wider than max_input_width (the window or the full frame) is downscaled to that width before
+    # being handed to the detector. None always hands over the full resolution.
+    def __init__(self, detector, padding=0.5, min_roi_size=(160, 160), full_frame_interval=10,
+                 max_input_width=640):
+        self.detector = detector
+        self.padding = padding
+        self.min_roi_size = min_roi_size
+        self.full_frame_interval = full_frame_interval
+        self.max_input_width = max_input_width
+        self.tracked_bb = None
+        self.frames_since_full_frame = 0
+        # Counters, mostly useful for checking how often we fall back to the full frame.
+        self.num_roi_detections = 0
+        self.num_full_frame_detections = 0
+
+    # Sets the box of the person being tracked, in full-frame coordinates. None means nobody is tracked.
+    def update_tracked_bb(self, bounding_box):
+        self.tracked_bb = bounding_box
+
+    def detect(self, image):
+        if self.tracked_bb is not None and self.frames_since_full_frame < self.full_frame_interval - 1:
+            roi = self.get_roi(image.shape)
+            bounding_boxes = self.detect_in_window(image, roi)
+            self.num_roi_detections += 1
+            if len(bounding_boxes) > 0:
+                self.frames_since_full_frame += 1
+                return bounding_boxes
+        self.frames_since_full_frame = 0
+        self.num_full_frame_detections += 1
+        return self.detect_in_window(image, (0, 0, image.shape[1], image.shape[0]))
+
+    def close(self):
+        self.detector.close()
+
+    # Returns the window to search, as pixel (xmin, ymin, xmax, ymax), clipped to the image.
+    def get_roi(self, image_shape):
+        imheight, imwidth = image_shape[:2]
+        center_x, center_y = self.tracked_bb.get_centroid()
+        width, height = self.tracked_bb.get_dimensions()
+        roi_width = min(max(width * (1 + 2 * self.padding), self.min_roi_size[0]), imwidth)
+        roi_height = min(max(height * (1 + 2 * self.padding), self.min_roi_size[1]), imheight)
+        # Shift the window back inside the image rather than shrinking it when the person is near an edge.
+        xmin = int(round(min(max(center_x - roi_width / 2, 0), imwidth - roi_width)))
+        ymin = int(round(min(max(center_y - roi_height / 2, 0), imheight - roi_height)))
+        return xmin, ymin, xmin + int(round(roi_width)), ymin + int(round(roi_height))
+
+    # Runs the detector on the (xmin, ymin, xmax, ymax) window of image, downscaled if needed, and maps the
+    # boxes it finds back to full-frame coordinates.
+    def detect_in_window(self, image, window):
+        xmin, ymin, xmax, ymax = window
+        window_image = image[ymin:ymax, xmin:xmax]
+        scale = 1.0
+        if self.max_input_width is not None and window_image.shape[1] > self.max_input_width:
+            scale = self.max_input_width / float(window_image.shape[1])
+            window_image = cv2.resize(window_image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        bounding_boxes = []
+        for bb in self.detector.detect(window_image):
+            width, height = bb.get_dimensions()
+            x, y = bb.get_centroid()
+            bounding_boxes.append(BoundingBox((width / scale, height / scale), (x / scale + xmin, y / scale + ymin),
+                                              score=bb.get_score()))
+        return bounding_boxes
@@ -2,16 +2,17 @@ import numpy as np
 import tensorflow as tf
 import os
 import sys
-import cv2
 
 sys.path.append("..")
 
-from utils.bounding_box import BoundingBox
+from person_detection.detection_postprocessing import create_bbs_from_detections, PERSON_CLASS_ID
+from person_detection.detector_abc import Detector
 
 
-class TFDetector:
+class TFDetector(Detector):
     def __init__(self, model_filepath='ssdlite_mobilenet_v2_coco_2018_05_09/frozen_inference_graph.pb',
-                 label_filepath='mscoco_label_map.pbtxt'):
+                 label_filepath='mscoco_label_map.pbtxt', warm_up=True, warm_up_image_shape=(360, 640, 3),
+                 detect_thresh=0.5, nms_thresh=None, max_detections=None):
         print("Creating TFDetector")
         MODEL = model_filepath
         LABELS = label_filepath
@@ -27,6 +28,42 @@ class TFDetector:
                 tf.import_graph_def(od_graph_def, name='')
 
         self.labels = TFDetector.read_labels(LABELS)
+        # Post-processing parameters. See create_bbs_from_detections for what each one does.
+        self.detect_thresh = detect_thresh
+        self.nms_thresh = nms_thresh
+        self.max_detections = max_detections
+
+        # Resolve the input and output tensor handles once, instead of walking every op in the graph
+        # each time we're given a new frame.
+        self.tensor_dict = TFDetector.get_output_tensors(self.detection_graph)
+        self.image_tensor = self.detection_graph.get_tensor_by_name('image_tensor:0')
+
+        # Keep a single session open for the lifetime of the detector. Creating a session is far more
+        # expensive than running the model on a frame, so it must not happen inside the flight loop.
+        # Call close() (or use the detector as a context manager) to release it.
+        self.sess = tf.Session(graph=self.detection_graph)
+        if warm_up:
+            # The first sess.run is much slower than the rest because TF lazily allocates memory and
+            # picks kernels, so pay that cost up front on a dummy frame instead of on the first real one.
+            self.sess.run(self.tensor_dict,
+                          feed_dict={self.image_tensor: np.zeros((1,) + tuple(warm_up_image_shape), dtype=np.uint8)})
+
+    def close(self):
+        if self.sess is not None:
+            self.sess.close()
+            self.sess = None
+
+    # Returns a dict from output name to tensor handle for the detection outputs present in the graph.
+    @staticmethod
+    def get_output_tensors(detection_graph):
+        ops = detection_graph.get_operations()
+        all_tensor_names = {output.name for op in ops for output in op.outputs}
+        tensor_dict = {}
+        for key in ['num_detections', 'detection_boxes', 'detection_scores', 'detection_classes']:
+            tensor_name = key + ':0'
+            if tensor_name in all_tensor_names:
+                tensor_dict[key] = detection_graph.get_tensor_by_name(tensor_name)
+        return tensor_dict
 
     @staticmethod
     def read_labels(label_file):
@@ -41,108 +78,73 @@ class TFDetector:
             labelmap[ix] = dn
         return labelmap
 
-    # Given an image, returns the bounding box of the person in the image.
-    # TODO: generalize to return a list of bounding boxes
-    def detect_bounding_box(self, image,iternum, visualize=False, firstrun=False):
-
-        if firstrun: 
-            # Create a tf session.
-            self.detection_graph.as_default()
-            print(firstrun, "firstrun")
-
-        with tf.Session(graph=self.detection_graph) as sess:
-            # Get handles to input and output tensors
-            ops = self.detection_graph.get_operations()
-            all_tensor_names = {output.name for op in ops for output in op.outputs}
-            tensor_dict = {}
-            for key in ['num_detections', 'detection_boxes', 'detection_scores', 'detection_classes']:
-                tensor_name = key + ':0'
-                if tensor_name in all_tensor_names:
-                    tensor_dict[key] = self.detection_graph.get_tensor_by_name(
-                        tensor_name)
-            image_tensor = self.detection_graph.get_tensor_by_name('image_tensor:0')
-
-
-            output_dict = sess.run(tensor_dict, feed_dict={image_tensor: np.expand_dims(image, 0)})
-            TFDetector.update_output_dict(output_dict)
-
-            bb = TFDetector.create_bb_from_tf_result(image, output_dict, self.labels)
-
-            if visualize:
-                # Display the image and the overlayed bounding box
-                if bb is None:
-                    print("No bounding box to visualize.")
-                    # cv2.imshow("image", image)
-                    cv2.imwrite("nobbimage" + str(iternum) + ".png", image)
-                    # cv2.waitKey(0)
-                    return None
-
-                center_x, center_y = bb.centroid
-                width, height = bb.dimensions
-
-                min_x = int(center_x - width / 2)
-                min_y = int(center_y - height / 2)
-                print("center_x", center_x)
-                max_x = int(center_x + width / 2)
-                max_y = int(center_y + height / 2)
-                cv2.rectangle(image, (min_x, min_y), (max_x, max_y), (0,255,0), 2)
-                
-                # class label viz
-                label_background_color = (0, 255, 0)
-                
-                label_text = "this guy"
-                label_text_color = (0,0,0)
-
-                label_size = cv2.getTextSize(label_text, cv2.FONT_HERSHEY_SIMPLEX, 1, 1)[0]
-                label_left = min_x
-                label_top = min_y - label_size[1]
-                if (label_top < 1):
-                    label_top = 1
-                label_right = label_left + label_size[0]
-                label_bottom = label_top + label_size[1]
-                cv2.rectangle(image, (label_left - 1, label_top - 1), (label_right + 1, label_bottom + 1),
-                              label_background_color, -1)
-
-                # label text above the box
-                cv2.putText(image, label_text, (label_left, label_bottom), cv2.FONT_HERSHEY_SIMPLEX, 1, label_text_color, 2,cv2.LINE_AA)
-
-                cv2.imwrite("bbimage" + str(iternum) + ".png", image)
-                # cv2.imshow("image", image)
-                # cv2.waitKey(0) 
-            return [bb]  # FIXME: support lists, but right now it's only a list of length 1
-
-
-
-    @staticmethod
-    def update_output_dict(original_dict):
-        original_dict['num_detections'] = int(original_dict['num_detections'][0])
-        original_dict['detection_classes'] = original_dict['detection_classes'][0].astype(np.uint8)
-        original_dict['detection_boxes'] = original_dict['detection_boxes'][0]
-        original_dict['detection_scores'] = original_dict['detection_scores'][0]
-
+    def detect(self, image):
+        return self.detect_bounding_box(image)
+
+    # Given an image, returns a list of bounding boxes of all the people in the image, sorted by decreasing
+    # score. The list is empty if nobody was detected.
+    # The image isn't modified. To draw the detections, use a DetectionAnnotator, which does it off the
+    # inference path.
+    def detect_bounding_box(self, image):
+        if self.sess is None:
+            raise RuntimeError("TFDetector has been closed.")
+        output_dict = self.sess.run(self.tensor_dict, feed_dict={self.image_tensor: np.expand_dims(image, 0)})
+        TFDetector.update_output_dict(output_dict)
+        return self.create_bbs_from_tf_result(image, output_dict)
+
+    # Given a list of images, returns a list with one entry per image, where each entry is the list of
+    # bounding boxes detected in that image.
+    # All the frames are stacked into a single batch and run through the model with one sess.run call,
+    # which is much faster than calling detect_bounding_box on each frame when reprocessing a recorded
+    # flight or handling several camera streams. The model needs a rectangular batch, so all the images
+    # must have the same shape.
+    def detect_bounding_boxes_batch(self, images):
+        if self.sess is None:
+            raise RuntimeError("TFDetector has been closed.")
+        if len(images) == 0:
+            return []
+        image_shape = images[0].shape
+        for image in images:
+            if image.shape != image_shape:
+                raise ValueError("All images in a batch must have the same shape, but got " + str(image_shape) +
+                                 " and " + str(image.shape))
+        output_dict = self.sess.run(self.tensor_dict, feed_dict={self.image_tensor: np.stack(images)})
+
+        all_bounding_boxes = []
+        for frame_index, image in enumerate(images):
+            frame_output_dict = dict(output_dict)
+            TFDetector.update_output_dict(frame_output_dict, frame_index)
+            all_bounding_boxes.append(self.create_bbs_from_tf_result(image, frame_output_dict))
+        return all_bounding_boxes
+
+    # Strips the batch dimension off the raw model outputs, keeping only the outputs for the frame at
+    # frame_index in the batch.
     @staticmethod
-    def create_bb_from_tf_result(image, output_dict, labels, detect_thresh=0.5):
-        imheight, imwidth, _ = image.shape
-        for ix, score in enumerate(output_dict['detection_scores']):
-            #max_score = max(score)  # FIXME: this is bad
-            if score > detect_thresh:
-                [ymin, xmin, ymax, xmax] = output_dict['detection_boxes'][ix]
-                classid = output_dict['detection_classes'][ix]
-                classname = labels[classid]
-
-                if classid == 1:  # refers to person
-
-                    dimensions = ((xmax - xmin) * imwidth, (ymax - ymin) * imheight)
-                    centroid = (np.mean([xmax * imwidth, xmin * imwidth]), np.mean([ymax * imheight, ymin * imheight]))
-                    bb = BoundingBox(dimensions, centroid)
-                    return bb
+    def update_output_dict(original_dict, frame_index=0):
+        original_dict['num_detections'] = int(original_dict['num_detections'][frame_index])
+        original_dict['detection_classes'] = original_dict['detection_classes'][frame_index].astype(np.uint8)
+        original_dict['detection_boxes'] = original_dict['detection_boxes'][frame_index]
+        original_dict['detection_scores'] = original_dict['detection_scores'][frame_index]
+
+    # Converts the (already un-batched) model outputs for one image into a list of person BoundingBoxes,
+    # using this detector's threshold, NMS and top-K settings.
+    def create_bbs_from_tf_result(self, image, output_dict):
+        num_detections = output_dict['num_detections']
+        return create_bbs_from_detections(output_dict['detection_boxes'][:num_detections],
+                                          output_dict['detection_scores'][:num_detections],
+                                          output_dict['detection_classes'][:num_detections],
+                                          image.shape,
+                                          detect_thresh=self.detect_thresh,
+                                          class_ids=(PERSON_CLASS_ID,),
+                                          nms_thresh=self.nms_thresh,
+                                          max_detections=self.max_detections)
 
 if __name__=='__main__':
     pass
     # print("hello world2")
     # my_detector = TFDetector()
     # loaded_image = cv2.imread('../../data/thi.png')
-    # detect_bb = my_detector.detect_bounding_box(loaded_image, visualize=True)
+    # detect_bb = my_detector.detect_bounding_box(loaded_image)
     # print(detect_bb)
 
     
@@ -0,0 +1,128 @@
+from person_detection.detector_abc import Detector
+from utils.bounding_box import BoundingBox
+import cv2
+import numpy as np
+
+
+# Wraps another Detector so that it only runs every detect_interval frames. In between, the boxes it found
+# are carried along with sparse Lucas-Kanade optical flow on corner features inside each box, which costs a
+# small fraction of running the detector.
+# Each tracked box has a confidence: the fraction of its features that survived the last step of tracking.
+# Points that can't be tracked back to where they came from (forward-backward check) are dropped. As soon as
+# any box's confidence falls below min_confidence, or it runs out of points, the detector is run again.
+# Returns the same list of BoundingBoxes as the wrapped detector, with each score scaled by the box's
+# tracking confidence.
+class TrackingDetector(Detector):
+    def __init__(self, detector, detect_interval=5, min_confidence=0.5, min_points=5, max_points_per_box=30,
+                 max_forward_backward_error=1.0):
+        self.detector = detector
+        self.detect_interval = detect_interval
+        self.min_confidence = min_confidence
+        self.min_points = min_points
+        self.max_points_per_box = max_points_per_box
+        self.max_forward_backward_error = max_forward_backward_error  # pixels
+        self.lk_params = dict(winSize=(15, 15), maxLevel=2,
+                              criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+        self.previous_gray = None
+        # One entry per tracked box: [corners as an array of xmin, ymin, xmax, ymax, points (Nx1x2 float32),
+        # detector score, confidence].
+        self.tracks = []
+        self.frames_since_detection = 0
+        # Counters, mostly useful for checking how often the detector actually runs.
+        self.num_detections = 0
+        self.num_tracked_frames = 0
+
+    def detect(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        if self.should_detect():
+            return self.detect_and_reset_tracks(image, gray)
+        if not self.track(gray):
+            return self.detect_and_reset_tracks(image, gray)
+        self.previous_gray = gray
+        self.frames_since_detection += 1
+        self.num_tracked_frames += 1
+        return self.get_bounding_boxes()
+
+    def close(self):
+        self.detector.close()
+
+    def should_detect(self):
+        return (self.previous_gray is None or len(self.tracks) == 0 or
+                self.frames_since_detection >= self.detect_interval - 1)
+
+    def detect_and_reset_tracks(self, image, gray):
+        bounding_boxes = self.detector.detect(image)
+        self.num_detections += 1
+        self.frames_since_detection = 0
+        self.previous_gray = gray
+        self.tracks = []
+        for bb in bounding_boxes:
+            corners = TrackingDetector.bb_to_corners(bb)
+            points = self.find_features(gray, corners)
+            score = bb.get_score()
+            self.tracks.append([corners, points, score, 1.0])
+        return bounding_boxes
+
+    # Returns up to max_points_per_box good corner features inside the box, as an Nx1x2 float32 array.
+    def find_features(self, gray, corners):
+        xmin, ymin, xmax, ymax = np.clip(np.round(corners), 0, [gray.shape[1], gray.shape[0]] * 2).astype(int)
+        if xmax - xmin < 2 or ymax - ymin < 2:
+            return np.zeros((0, 1, 2), dtype=np.float32)
+        mask = np.zeros_like(gray)
+        mask[ymin:ymax, xmin:xmax] = 255
+        points = cv2.goodFeaturesToTrack(gray, maxCorners=self.max_points_per_box, qualityLevel=0.01,
+                                         minDistance=3, mask=mask)
+        return points if points is not None else np.zeros((0, 1, 2), dtype=np.float32)
+
+    # Moves every tracked box from the previous frame to gray. Returns False if the detector should be run
+    # instead because a box couldn't be tracked well enough.
+    def track(self, gray):
+        for track in self.tracks:
+            corners, points, _, _ = track
+            if len(points) < self.min_points:
+                return False
+            new_points, status, _ = cv2.calcOpticalFlowPyrLK(self.previous_gray, gray, points, None,
+                                                             **self.lk_params)
+            back_points, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self.previous_gray, new_points, None,
+                                                                   **self.lk_params)
+            forward_backward_error = np.linalg.norm((points - back_points).reshape(-1, 2), axis=1)
+            good = ((status.reshape(-1) == 1) & (back_status.reshape(-1) == 1) &
+                    (forward_backward_error < self.max_forward_backward_error))
+            confidence = np.count_nonzero(good) / float(len(points))
+            if confidence < self.min_confidence or np.count_nonzero(good) < self.min_points:
+                return False
+            old_points = points.reshape(-1, 2)[good]
+            new_points = new_points.reshape(-1, 2)[good]
+            track[0] = TrackingDetector.move_corners(corners, old_points, new_points)
+            track[1] = new_points.reshape(-1, 1, 2)
+            track[3] = confidence
+        return True
+
+    # Moves the box by the median displacement of its points, and scales it about its center by the median
+    # change in the distances between them.
+    @staticmethod
+    def move_corners(corners, old_points, new_points):
+        displacement = np.median(new_points - old_points, axis=0)
+        old_distances = np.linalg.norm(old_points[:, np.newaxis] - old_points[np.newaxis], axis=2)
+        new_distances = np.linalg.norm(new_points[:, np.newaxis] - new_points[np.newaxis], axis=2)
+        valid = old_distances > 1e-6
+        scale = np.median(new_distances[valid] / old_distances[valid]) if np.any(valid) else 1.0
+        center = (corners[:2] + corners[2:]) / 2 + displacement
+        half_size = (corners[2:] - corners[:2]) / 2 * scale
+        return np.concatenate([center - half_size, center + half_size])
+
+    def get_bounding_boxes(self):
+        bounding_boxes = []
+        for corners, _, score, confidence in self.tracks:
+            width, height = corners[2:] - corners[:2]
+            x, y = (corners[:2] + corners[2:]) / 2
+            bounding_boxes.append(BoundingBox((float(width), float(height)), (float(x), float(y)),
+                                              score=None if score is None else score * confidence))
+        return bounding_boxes
+
+    @staticmethod
+    def bb_to_corners(bb):
+        width, height = bb.get_dimensions()
+        x, y = bb.get_centroid()
+        return np.array([x - width / 2.0, y - height / 2.0, x + width / 2.0, y + height / 2.0])
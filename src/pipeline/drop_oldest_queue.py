@@ -0,0 +1,44 @@
+from collections import deque
+import threading
+
+
+# Bounded, thread-safe FIFO queue that never blocks the producer. When the queue is full, putting a new
+# item silently throws away the oldest one instead. This is what we want between pipeline stages: a slow
+# consumer should always work on the freshest data rather than fall further and further behind.
+class DropOldestQueue:
+    def __init__(self, maxsize=1):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1, got " + str(maxsize))
+        self.items = deque(maxlen=maxsize)
+        self.not_empty = threading.Condition()
+        # Number of items thrown away so far because the consumer wasn't keeping up.
+        self.num_dropped = 0
+
+    def put(self, item):
+        with self.not_empty:
+            if len(self.items) == self.items.maxlen:
+                self.num_dropped += 1
+            self.items.append(item)
+            self.not_empty.notify()
+
+    # Removes and returns the oldest item, waiting up to timeout seconds (forever if None) for one to
+    # show up. Returns None on timeout.
+    def get(self, timeout=None):
+        with self.not_empty:
+            if not self.not_empty.wait_for(lambda: len(self.items) > 0, timeout):
+                return None
+            return self.items.popleft()
+
+    # Removes everything in the queue and returns the newest item without waiting, or None if the queue
+    # was empty.
+    def get_latest(self):
+        with self.not_empty:
+            if len(self.items) == 0:
+                return None
+            latest_item = self.items[-1]
+            self.items.clear()
+            return latest_item
+
+    def __len__(self):
+        with self.not_empty:
+            return len(self.items)
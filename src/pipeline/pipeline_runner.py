@@ -0,0 +1,151 @@
+from pipeline.drop_oldest_queue import DropOldestQueue
+from utils.clock import RealClock, SimulatedClock
+import threading
+
+
+# Runs the flight loop as a set of concurrent stages instead of one big serial loop:
+# 1) capture: pulls frames off the FrameGrabber as they arrive.
+# 2) detection: runs the detector (any Detector) on the newest frame, as fast as the CPU allows.
+# 3) state estimation: polls the state estimator at state_rate.
+# 4) control: at control_rate, feeds the newest detections and drone state to the CinematicController
+#    and hands the resulting waypoints to command_function.
+# Stages are connected by bounded DropOldestQueues, so a slow stage never stalls the ones upstream of it
+# and always works on fresh data. In particular, the control stage keeps running at its own rate no
+# matter how long detection takes.
+# command_function is called as command_function(waypoints, drone_state) from the control stage and is
+# responsible for actually moving the drone. It should return quickly.
+# If a TelemetryRecorder is given, every drone state, bounding box list and waypoint list the stages
+# produce is recorded to it.
+# clock paces the stages that run at a fixed rate (see utils/clock.py). With a ReplayClock, the rates are in
+# replay time, so a replay running as fast as possible doesn't wait on the wall clock. A SimulatedClock is
+# rejected: every stage would move it forward on its own, so the stages' rates would stop meaning anything.
+class PipelineRunner:
+    def __init__(self, frame_grabber, detector, state_estimator, cinematic_controller, command_function,
+                 control_rate=10, state_rate=20, queue_size=1, frame_timeout=0.5, telemetry_recorder=None,
+                 clock=None):
+        self.frame_grabber = frame_grabber
+        self.detector = detector
+        self.state_estimator = state_estimator
+        self.cinematic_controller = cinematic_controller
+        self.command_function = command_function
+        self.control_rate = control_rate  # Hz
+        self.state_rate = state_rate  # Hz
+        # How long blocking stages wait for input before checking whether they should stop, in seconds.
+        self.frame_timeout = frame_timeout
+        self.telemetry_recorder = telemetry_recorder
+        if isinstance(clock, SimulatedClock):
+            raise ValueError("PipelineRunner runs its stages on several threads, which can't share a SimulatedClock. "
+                             "Use a RealClock or a ReplayClock.")
+        self.clock = clock if clock is not None else RealClock()
+
+        self.frame_queue = DropOldestQueue(queue_size)
+        self.detection_queue = DropOldestQueue(queue_size)
+        self.state_queue = DropOldestQueue(queue_size)
+
+        self.stop_event = threading.Event()
+        self.threads = []
+        # The first exception raised by any stage, if any. An exception in one stage stops the whole pipeline.
+        self.error = None
+        # Counters, mostly useful for checking how fast each stage is actually running.
+        self.num_frames_captured = 0
+        self.num_frames_detected = 0
+        self.num_control_steps = 0
+
+    def start(self):
+        self.stop_event.clear()
+        stages = [self.capture_stage, self.detection_stage, self.state_estimation_stage, self.control_stage]
+        self.threads = [threading.Thread(target=self.run_stage, args=(stage,), name=stage.__name__, daemon=True)
+                        for stage in stages]
+        for thread in self.threads:
+            thread.start()
+
+    # Asks every stage to stop and waits for them to finish.
+    def stop(self, timeout=None):
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join(timeout)
+
+    def is_running(self):
+        return not self.stop_event.is_set()
+
+    # Starts the pipeline, lets it run for duration seconds (or until a stage fails), and stops it.
+    def run(self, duration):
+        self.start()
+        self.stop_event.wait(duration)
+        self.stop()
+
+    def run_stage(self, stage):
+        try:
+            stage()
+        except Exception as e:
+            print("CAUGHT AN ERROR in", stage.__name__, ":", e)
+            if self.error is None:
+                self.error = e
+            self.stop_event.set()
+
+    # Runs function every period seconds until the pipeline is stopped. If an iteration takes longer than
+    # the period, the next one starts right away instead of trying to catch up.
+    # Iterations are scheduled at fixed times rather than a period after the last one finished, so the rate
+    # holds even when other stages move a shared ReplayClock forward while this one waits.
+    def run_at_rate(self, function, rate):
+        period = 1.0 / rate
+        next_time = self.clock.time()
+        while not self.stop_event.is_set():
+            function()
+            next_time += period
+            now = self.clock.time()
+            if next_time < now:
+                next_time = now
+            self.clock.wait(self.stop_event, next_time - now)
+
+    def capture_stage(self):
+        last_sequence_number = 0
+        while not self.stop_event.is_set():
+            captured_frame = self.frame_grabber.next_frame(timeout=self.frame_timeout,
+                                                           after_sequence_number=last_sequence_number)
+            if captured_frame is None:
+                continue
+            last_sequence_number = captured_frame.sequence_number
+            self.num_frames_captured += 1
+            self.frame_queue.put(captured_frame)
+
+    def detection_stage(self):
+        while not self.stop_event.is_set():
+            captured_frame = self.frame_queue.get(timeout=self.frame_timeout)
+            if captured_frame is None:
+                continue
+            bounding_boxes = self.detector.detect(captured_frame.image)
+            self.num_frames_detected += 1
+            if self.telemetry_recorder is not None:
+                self.telemetry_recorder.record_bounding_boxes(bounding_boxes, timestamp=captured_frame.timestamp)
+            self.detection_queue.put((captured_frame, bounding_boxes))
+
+    def state_estimation_stage(self):
+        def estimate_state():
+            drone_state, _ = self.state_estimator.get_current_drone_state()
+            if self.telemetry_recorder is not None:
+                self.telemetry_recorder.record_drone_state(drone_state)
+            self.state_queue.put(drone_state)
+        self.run_at_rate(estimate_state, self.state_rate)
+
+    def control_stage(self):
+        # Only the control stage touches the cinematic controller, so it doesn't need any locking.
+        latest_drone_state = [None]
+
+        def control_step():
+            drone_state = self.state_queue.get_latest()
+            if drone_state is not None:
+                latest_drone_state[0] = drone_state
+                self.cinematic_controller.update_latest_drone_state(drone_state)
+            if latest_drone_state[0] is None:
+                return  # Nothing sensible to do until we know where the drone is.
+            detection = self.detection_queue.get_latest()
+            if detection is not None:
+                _, bounding_boxes = detection
+                self.cinematic_controller.update_latest_bbs(bounding_boxes)
+            waypoints = self.cinematic_controller.generate_waypoints()
+            if self.telemetry_recorder is not None:
+                self.telemetry_recorder.record_waypoints(waypoints)
+            self.command_function(waypoints, latest_drone_state[0])
+            self.num_control_steps += 1
+        self.run_at_rate(control_step, self.control_rate)
@@ -0,0 +1,83 @@
+from cinematic_waypoints.cinematic_controller import CinematicController
+from cinematic_waypoints.waypoint_generator.yaw_waypoint_generator import YawWaypointGenerator
+from person_detection.frame_grabber import FrameGrabber
+from person_detection.detector_factory import create_detector, get_model_filepaths
+from pipeline.pipeline_runner import PipelineRunner
+from replay.sensor_log_recorder import SensorLogRecorder
+from state_estimation.event_driven_state_estimator import EventDrivenStateEstimator
+from smooth_control.smooth_controller import SmoothController
+from utils.telemetry_recorder import TelemetryRecorder
+from utils.video_writer import LiveVideoRecorder, VideoWriter
+from pyparrot.Minidrone import Mambo
+
+# Main script for executing a flight with the pipelined loop.
+# Does the same job as main_script.py, but capture, detection, state estimation and control each run
+# in their own stage (see PipelineRunner), so the drone keeps being controlled while detection runs.
+
+control_rate = 10  # Hz. Independent of how fast the detector can run.
+state_rate = 20  # Hz
+flight_duration = 60  # seconds
+telemetry_directory = './telemetry/'  # Read it back with utils.telemetry_recorder.read_telemetry.
+# Saved on landing, next to the telemetry, so the flight's sensors can be replayed with ReplayMambo.
+sensor_log_filepath = telemetry_directory + 'sensor_log.csv'
+detector_backend = 'tf'  # 'tf', 'opencv', 'onnx' or 'hog'. See person_detection/detector_factory.py.
+
+waypoint_generator = YawWaypointGenerator()
+cinematic_controller = CinematicController(waypoint_generator=waypoint_generator)
+
+mamboAddr = "e0:14:d0:63:3d:d0"  # Doesn't matter
+mambo = Mambo(mamboAddr, use_wifi=True)
+print("About to connect to mambo.")
+mambo.connect(num_retries=3)
+print("Connected to mambo.")
+mambo.smart_sleep(1)
+mambo.ask_for_state_update()
+mambo.smart_sleep(1)
+
+print("taking off!")
+mambo.safe_takeoff(5)
+
+frame_grabber = FrameGrabber(mambo)
+frame_grabber.start()
+# Encode the camera stream as it arrives, instead of converting saved images after landing.
+video_recorder = LiveVideoRecorder(frame_grabber, VideoWriter('droneVideo.avi'))
+video_recorder.start()
+# Update paths as needed based on working directory.
+detector = create_detector(detector_backend, **get_model_filepaths(detector_backend))
+# Fed by sensor callbacks, so polling it from the state estimation stage is cheap.
+state_estimator = EventDrivenStateEstimator(mambo)
+# Registered after the state estimator, which keeps getting the sensor callbacks through the recorder.
+sensor_log_recorder = SensorLogRecorder(mambo)
+sensor_log_recorder.start()
+telemetry_recorder = TelemetryRecorder(telemetry_directory)
+smooth_controller = SmoothController(mambo, state_estimator, control_rate=control_rate,
+                                     telemetry_recorder=telemetry_recorder)
+
+
+# Retarget the controller at the next waypoint and send one command towards it, without blocking.
+def command_drone(waypoints, drone_state):
+    smooth_controller.set_goal(waypoints[0] if waypoints else None)
+    smooth_controller.step()
+
+
+pipeline_runner = PipelineRunner(frame_grabber, detector, state_estimator, cinematic_controller, command_drone,
+                                 control_rate=control_rate, state_rate=state_rate,
+                                 telemetry_recorder=telemetry_recorder)
+try:
+    pipeline_runner.run(flight_duration)
+finally:
+    print("Captured %d frames, ran detection on %d, and took %d control steps." %
+          (pipeline_runner.num_frames_captured, pipeline_runner.num_frames_detected,
+           pipeline_runner.num_control_steps))
+    # Exited the loop, so we're done and want to land
+    print("landing now. Flying state is %s" % mambo.sensors.flying_state)
+    video_recorder.stop()
+    frame_grabber.stop()
+    mambo.safe_land(5)
+    mambo.smart_sleep(5)
+    sensor_log_recorder.save(sensor_log_filepath)
+    state_estimator.stop()
+    print("disconnect")
+    mambo.disconnect()
+    detector.close()
+    telemetry_recorder.close()
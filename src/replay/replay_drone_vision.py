@@ -0,0 +1,73 @@
+from replay.replay_timeline import ReplayTimeline
+from utils.video_writer import list_numbered_frames, read_frame
+import threading
+
+
+# Stand-in for pyparrot's DroneVision that plays back frames saved during a flight (e.g. the
+# test_image_%06d.png files that ImageSaver writes to ./images/, or .npy files for RAW frames) instead of
+# streaming from a drone.
+# Frame i is released at replay time i / fps, which calls the user callback just like DroneVision does
+# when it buffers a new frame, so a FrameGrabber can be pointed at it.
+# For offline processing, frames() steps through the recording in lockstep with the caller instead.
+class ReplayDroneVision:
+    def __init__(self, image_directory='./images/', fps=30, timeline=None):
+        self.frame_filepaths = list_numbered_frames(image_directory)
+        self.fps = fps
+        self.timeline = timeline if timeline is not None else ReplayTimeline()
+        self.user_callback_function = None
+        self.user_callback_args = None
+        self.latest_picture = None
+        self.num_frames_played = 0
+        self.stop_event = threading.Event()
+        self.playback_thread = None
+
+    def set_user_callback_function(self, user_callback_function=None, user_callback_args=None):
+        self.user_callback_function = user_callback_function
+        self.user_callback_args = user_callback_args
+
+    def open_video(self):
+        self.stop_event.clear()
+        self.playback_thread = threading.Thread(target=self.play_frames, daemon=True)
+        self.playback_thread.start()
+        return True
+
+    def close_video(self):
+        self.stop_event.set()
+        if self.playback_thread is not None:
+            self.playback_thread.join()
+
+    def get_latest_valid_picture(self):
+        return self.latest_picture
+
+    # Whether every frame has been played back.
+    def is_finished(self):
+        return self.num_frames_played >= len(self.frame_filepaths)
+
+    # Yields every recorded frame in order, one at a time, advancing replay time to each frame's timestamp
+    # before yielding it. Unlike the threaded playback used by open_video, no frame is ever skipped, and when
+    # replaying as fast as possible the next frame is only released once the caller asks for it.
+    def frames(self):
+        for frame_index, filepath in enumerate(self.frame_filepaths):
+            frame_time = frame_index / float(self.fps)
+            if self.timeline.is_as_fast_as_possible():
+                self.timeline.advance_to(frame_time)
+            else:
+                self.timeline.wait_until(frame_time)
+            picture = read_frame(filepath)
+            self.num_frames_played = frame_index + 1
+            if picture is None:
+                continue
+            self.latest_picture = picture
+            yield picture
+
+    def play_frames(self):
+        for frame_index, filepath in enumerate(self.frame_filepaths):
+            if not self.timeline.wait_until(frame_index / float(self.fps), self.stop_event):
+                return
+            picture = read_frame(filepath)
+            self.num_frames_played = frame_index + 1
+            if picture is None:
+                continue
+            self.latest_picture = picture
+            if self.user_callback_function is not None:
+                self.user_callback_function(self.user_callback_args)
@@ -0,0 +1,78 @@
+from pyparrot.Minidrone import MinidroneSensors
+from replay.replay_timeline import ReplayTimeline
+from replay.sensor_log import SensorLog
+import threading
+
+
+# Stand-in for pyparrot's Mambo that plays back a recorded SensorLog instead of talking to a drone.
+# It exposes the parts of the Mambo interface the rest of the project uses, so state estimators and
+# controllers run against it unchanged. Sensor readings are applied through a real MinidroneSensors object
+# in the order pyparrot would apply them (calling the user sensor callback as it goes), as replay time
+# reaches each row of the log.
+# Commands sent to the drone are not simulated; they're recorded in self.commands as
+# (replay time, roll, pitch, yaw, vertical_movement, duration) tuples so they can be inspected afterwards.
+class ReplayMambo:
+    def __init__(self, sensor_log, timeline=None):
+        self.sensor_log = sensor_log
+        self.timeline = timeline if timeline is not None else ReplayTimeline()
+        self.replay_sensors = MinidroneSensors()
+        self.next_row_index = 0
+        self.sensor_lock = threading.RLock()
+        self.commands = []
+        self.commands_lock = threading.Lock()
+
+    # Reading the sensors first applies every log row whose time has come, so code that reads
+    # mambo.sensors.<field> directly always sees the readings for the current replay time.
+    @property
+    def sensors(self):
+        self.sync_sensors()
+        return self.replay_sensors
+
+    def sync_sensors(self):
+        now = self.timeline.now()
+        with self.sensor_lock:
+            rows = self.sensor_log.rows
+            while self.next_row_index < len(rows) and rows[self.next_row_index][0] <= now:
+                row = rows[self.next_row_index]
+                self.next_row_index += 1
+                for (_, name), value in zip(SensorLog.FIELDS, row[1:]):
+                    self.replay_sensors.update(name, value, {})
+
+    # Whether every row of the sensor log has been played back.
+    def is_finished(self):
+        self.sync_sensors()
+        return self.next_row_index >= len(self.sensor_log.rows)
+
+    def connect(self, num_retries=3):
+        self.timeline.start()
+        self.sync_sensors()
+        return True
+
+    def disconnect(self):
+        pass
+
+    def smart_sleep(self, timeout):
+        self.timeline.sleep(timeout)
+        self.sync_sensors()
+
+    def ask_for_state_update(self):
+        self.sync_sensors()
+
+    def set_user_sensor_callback(self, function, args):
+        self.replay_sensors.set_user_callback_function(function, args)
+
+    def safe_takeoff(self, timeout):
+        self.replay_sensors.flying_state = "hovering"
+        return True
+
+    def safe_land(self, timeout):
+        self.replay_sensors.flying_state = "landed"
+
+    def fly_direct(self, roll, pitch, yaw, vertical_movement, duration=None):
+        with self.commands_lock:
+            self.commands.append((self.timeline.now(), roll, pitch, yaw, vertical_movement, duration))
+        if duration is not None:
+            self.smart_sleep(duration)
+
+    def turn_degrees(self, degrees):
+        self.fly_direct(0, 0, degrees, 0)
@@ -0,0 +1,64 @@
+import threading
+import time
+
+
+# Shared notion of "now" for a replayed flight, in seconds since the start of the recording.
+# With a speed (1.0 for real time, 2.0 for twice as fast, ...), replay time follows the wall clock.
+# With speed=None, the replay runs as fast as possible: replay time is virtual and only moves forward when
+# the code under test sleeps or sends a timed command (see sleep), or when it sits idle waiting for the next
+# recorded event for idle_timeout seconds of wall time, in which case it skips straight to that event.
+class ReplayTimeline:
+    def __init__(self, speed=1.0, idle_timeout=0.005):
+        self.speed = speed
+        self.idle_timeout = idle_timeout
+        self.condition = threading.Condition()
+        self.virtual_time = 0.0
+        self.wall_start_time = None
+
+    def is_as_fast_as_possible(self):
+        return self.speed is None
+
+    # Starts the replay at replay time 0. Called when the replayed drone connects.
+    def start(self):
+        self.wall_start_time = time.time()
+
+    def now(self):
+        if self.is_as_fast_as_possible() or self.wall_start_time is None:
+            with self.condition:
+                return self.virtual_time
+        return (time.time() - self.wall_start_time) * self.speed
+
+    # Lets seconds of replay time pass.
+    def sleep(self, seconds):
+        if self.is_as_fast_as_possible():
+            self.advance_to(self.now() + seconds)
+        else:
+            time.sleep(seconds / self.speed)
+
+    # Moves virtual time forward to replay_time. Has no effect when following the wall clock.
+    def advance_to(self, replay_time):
+        with self.condition:
+            if replay_time > self.virtual_time:
+                self.virtual_time = replay_time
+                self.condition.notify_all()
+
+    # Blocks until replay time reaches replay_time. Returns False if stop_event was set first.
+    def wait_until(self, replay_time, stop_event=None):
+        if not self.is_as_fast_as_possible():
+            while not (stop_event is not None and stop_event.is_set()):
+                remaining = (replay_time - self.now()) / self.speed
+                if remaining <= 0:
+                    return True
+                time.sleep(min(remaining, 0.05))
+            return False
+        with self.condition:
+            while self.virtual_time < replay_time:
+                if stop_event is not None and stop_event.is_set():
+                    return False
+                time_before_wait = self.virtual_time
+                self.condition.wait(self.idle_timeout)
+                if self.virtual_time == time_before_wait:
+                    # Nothing moved time forward while we waited, so the code under test is idle.
+                    self.virtual_time = replay_time
+                    self.condition.notify_all()
+            return True
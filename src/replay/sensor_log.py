@@ -0,0 +1,45 @@
+import numpy as np
+
+
+# Recording of the mambo's sensor readings over a flight, used to replay the flight offline.
+# Each row is one snapshot of the sensors. The first column is the time of the snapshot in seconds since
+# the start of the recording; the rest are the pyparrot MinidroneSensors fields listed in FIELDS.
+# Logs are saved as CSV with a header row, so they're easy to inspect and edit by hand.
+class SensorLog:
+    # Pairs of (MinidroneSensors attribute, name pyparrot uses when updating it), in the order pyparrot
+    # receives them. Within each message, the timestamp comes last.
+    FIELDS = [("speed_x", "DroneSpeed_speed_x"),
+              ("speed_y", "DroneSpeed_speed_y"),
+              ("speed_z", "DroneSpeed_speed_z"),
+              ("speed_ts", "DroneSpeed_ts"),
+              ("altitude", "DroneAltitude_altitude"),
+              ("altitude_ts", "DroneAltitude_ts"),
+              ("quaternion_w", "DroneQuaternion_q_w"),
+              ("quaternion_x", "DroneQuaternion_q_x"),
+              ("quaternion_y", "DroneQuaternion_q_y"),
+              ("quaternion_z", "DroneQuaternion_q_z"),
+              ("quaternion_ts", "DroneQuaternion_ts")]
+    COLUMNS = ["time"] + [attribute for attribute, _ in FIELDS]
+
+    def __init__(self, rows=None):
+        self.rows = [] if rows is None else [list(row) for row in rows]
+
+    # Appends a snapshot of a MinidroneSensors object taken at the given time (seconds since the start of
+    # the recording). Hook this up to the mambo's sensor callback to record a live flight.
+    def record(self, timestamp, sensors):
+        self.rows.append([timestamp] + [getattr(sensors, attribute) for attribute, _ in SensorLog.FIELDS])
+
+    def get_times(self):
+        return [row[0] for row in self.rows]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def save(self, filepath):
+        np.savetxt(filepath, np.asarray(self.rows, dtype=np.float64).reshape(-1, len(SensorLog.COLUMNS)),
+                   delimiter=",", header=",".join(SensorLog.COLUMNS), comments="")
+
+    @staticmethod
+    def load(filepath):
+        data = np.loadtxt(filepath, delimiter=",", skiprows=1, ndmin=2)
+        return SensorLog(data.tolist())
@@ -0,0 +1,63 @@
+import os
+from replay.sensor_log import SensorLog
+from utils.clock import RealClock
+
+
+# Records a live flight's sensor readings into a SensorLog, so the flight can be replayed offline with
+# ReplayMambo (see replay_script.py).
+# Listens on the mambo's user sensor callback. pyparrot only has room for one callback, so whatever callback
+# was registered before start() (e.g. an EventDrivenStateEstimator's) keeps being called after each reading is
+# recorded, and is put back by stop().
+# A row is only recorded once a whole message has arrived, i.e. when one of the message timestamps changes,
+# which is also when ReplayMambo needs a row to reproduce the message.
+class SensorLogRecorder:
+    TIMESTAMP_FIELDS = ("speed_ts", "altitude_ts", "quaternion_ts")
+
+    def __init__(self, mambo, sensor_log=None, clock=None):
+        self.mambo = mambo
+        self.sensor_log = sensor_log if sensor_log is not None else SensorLog()
+        # Row times are seconds on this clock since start() was called. See utils/clock.py.
+        self.clock = clock if clock is not None else RealClock()
+        self.sensors = None
+        self.start_time = None
+        self.last_timestamps = None
+        self.previous_callback = None
+        self.previous_callback_args = None
+
+    def start(self):
+        # Keep hold of the sensors object itself. Reading mambo.sensors from inside the callback would make a
+        # ReplayMambo apply more log rows in the middle of applying one.
+        self.sensors = self.mambo.sensors
+        self.previous_callback = self.sensors.user_callback_function
+        # pyparrot only creates user_callback_function_args once a callback has been set.
+        self.previous_callback_args = getattr(self.sensors, "user_callback_function_args", None)
+        self.start_time = self.clock.time()
+        self.last_timestamps = None
+        self.record_snapshot()
+        self.mambo.set_user_sensor_callback(self.on_sensor_update, None)
+
+    # Stops recording and gives the callback back to whoever had it before start().
+    def stop(self):
+        if self.sensors is not None and self.sensors.user_callback_function == self.on_sensor_update:
+            self.mambo.set_user_sensor_callback(self.previous_callback, self.previous_callback_args)
+
+    def on_sensor_update(self, args):
+        timestamps = tuple(getattr(self.sensors, field) for field in SensorLogRecorder.TIMESTAMP_FIELDS)
+        if timestamps != self.last_timestamps:
+            self.record_snapshot(timestamps)
+        if self.previous_callback is not None:
+            self.previous_callback(self.previous_callback_args)
+
+    def record_snapshot(self, timestamps=None):
+        if timestamps is None:
+            timestamps = tuple(getattr(self.sensors, field) for field in SensorLogRecorder.TIMESTAMP_FIELDS)
+        self.last_timestamps = timestamps
+        self.sensor_log.record(self.clock.time() - self.start_time, self.sensors)
+
+    # Stops recording and saves the log to filepath, creating its directory if needed.
+    def save(self, filepath):
+        self.stop()
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.sensor_log.save(filepath)
@@ -0,0 +1,59 @@
+from cinematic_waypoints.cinematic_controller import CinematicController
+from cinematic_waypoints.waypoint_generator.yaw_waypoint_generator import YawWaypointGenerator
+from person_detection.detector_factory import create_detector, get_model_filepaths
+from replay.replay_drone_vision import ReplayDroneVision
+from replay.replay_mambo import ReplayMambo
+from replay.replay_timeline import ReplayTimeline
+from replay.sensor_log import SensorLog
+from state_estimation.new_state_estimator import NewStateEstimator
+from smooth_control.smooth_controller import SmoothController
+from utils.clock import ReplayClock
+import time
+
+# Offline version of main_script.py. Runs the same loop, but against a recorded flight: frames come
+# from image_directory and sensor readings from sensor_log_filepath, so no drone is needed. Useful for
+# benchmarking and profiling the whole pipeline.
+# Every recorded frame goes through detection, state estimation and control in turn. To replay through the
+# threaded capture path instead, hand the ReplayMambo, clock and a
+# FrameGrabber(mambo, drone_vision=drone_vision, clock=clock) to the pipelined loop (see pipeline_main_script.py).
+
+image_directory = './images/'
+sensor_log_filepath = image_directory + 'sensor_log.csv'  # Saved next to the frames by main_script.py.
+fps = 30  # Frame rate the images were recorded at.
+replay_speed = None  # 1.0 replays in real time, None replays as fast as possible.
+detector_backend = 'tf'  # 'tf', 'opencv', 'onnx' or 'hog'. See person_detection/detector_factory.py.
+
+timeline = ReplayTimeline(speed=replay_speed)
+# Everything that needs the time reads it off the replay, so the replay can run faster than real time.
+clock = ReplayClock(timeline)
+mambo = ReplayMambo(SensorLog.load(sensor_log_filepath), timeline=timeline)
+mambo.connect()
+mambo.safe_takeoff(5)
+drone_vision = ReplayDroneVision(image_directory, fps=fps, timeline=timeline)
+
+waypoint_generator = YawWaypointGenerator()
+cinematic_controller = CinematicController(waypoint_generator=waypoint_generator)
+detector = create_detector(detector_backend, **get_model_filepaths(detector_backend))
+state_estimator = NewStateEstimator(mambo)
+smooth_controller = SmoothController(mambo, state_estimator, clock=clock)
+
+start_time = time.time()
+itercounter = 0
+for latest_image in drone_vision.frames():
+    bounding_boxes = detector.detect(latest_image)
+    drone_state, _ = state_estimator.get_current_drone_state()
+    cinematic_controller.update_latest_bbs(bounding_boxes)
+    cinematic_controller.update_latest_drone_state(drone_state)
+    cinematic_waypoints = cinematic_controller.generate_waypoints()
+    # The replayed drone doesn't actually move, so use the non-blocking controller rather than smooth_gen,
+    # which would wait forever for the drone to reach the waypoint.
+    smooth_controller.set_goal(cinematic_waypoints[0])
+    smooth_controller.step()
+    itercounter += 1
+
+elapsed_time = time.time() - start_time
+print("Replayed %.1f s of flight in %.1f s (%d iterations, %d commands sent)." %
+      (timeline.now(), elapsed_time, itercounter, len(mambo.commands)))
+mambo.safe_land(5)
+mambo.disconnect()
+detector.close()
@@ -12,6 +12,8 @@ def interp(val, max_value):
     return val/max_value*100
 
 
+# Sends a fly_direct command that moves the drone by (dx, dy, dz, dyaw).
+# Returns the roll, pitch, yaw and vertical_movement values that were sent.
 def move(mambo, dx, dy, dz, dyaw, duration):
 
     thresh_pos = 0.3
@@ -38,6 +40,7 @@ def move(mambo, dx, dy, dz, dyaw, duration):
         yaw = np.sign(dyaw)*interp(dyaw, yaw_ref)
 
     mambo.fly_direct(roll=roll, pitch=pitch, yaw=yaw, vertical_movement=vertical_movement, duration=duration)
+    return roll, pitch, yaw, vertical_movement
 
 
 def move_forward(mambo, percent, duration):
@@ -1,15 +1,62 @@
 import numpy as np
 from smooth_control.move_commands import move
+from utils.clock import RealClock
 
 
+# Flies the drone towards cinematic waypoints.
+# There are two ways of using it:
+# 1) smooth_gen blocks, sending commands until the drone reaches the first waypoint.
+# 2) step is non-blocking: each call sends at most one short command towards the goal set with set_goal,
+#    and reports whether the drone has converged. Calling it from a loop running at control_rate lets the
+#    goal be retargeted mid-flight as new detections come in.
 class SmoothController:
+    # Statuses reported by step().
+    IDLE = "idle"  # No goal to fly to.
+    MOVING = "moving"  # Still flying towards the goal.
+    CONVERGED = "converged"  # Close enough to the goal; no command is sent, so the drone hovers.
 
-    def __init__(self, mambo, state_estim):
+    def __init__(self, mambo, state_estim, control_rate=20, telemetry_recorder=None, clock=None):
         self.mambo = mambo
         self.state_estim = state_estim
+        # Where step() gets the current time from when it isn't given one. See utils/clock.py.
+        self.clock = clock if clock is not None else RealClock()
+        # Optional TelemetryRecorder that every command sent to the drone is recorded to.
+        self.telemetry_recorder = telemetry_recorder
         self.thresh_dist = 0.5
         self.thresh_yaw = 20
+        self.control_rate = control_rate  # Hz. step() sends at most this many commands per second.
 
+        self.goal = None
+        self.next_step_time = None
+        self.status = SmoothController.IDLE
+
+    # Computes the move (in the drone's relative frame) that takes the drone from drone_state to goal.
+    # Returns dx, dy, dz, dyaw.
+    @staticmethod
+    def compute_relative_move(drone_state, goal):
+        # pyparrot's +x is our -y (forward)
+        # pyparrot's +y is our +x (right)
+        # pyparrot's +z is our -z (up)
+
+        Dx = goal.x - drone_state.y
+        Dy = goal.y - (-drone_state.x)
+        dz = goal.z - (-drone_state.z)
+        dyaw = goal.yaw - drone_state.yaw
+
+        # conversion to relative coordinates
+        dx = Dx * np.sin(np.deg2rad(-drone_state.yaw))
+        dy = Dy * np.cos(np.deg2rad(-drone_state.yaw))
+        return dx, dy, dz, dyaw
+
+    # Moves the drone by (dx, dy, dz, dyaw), recording the command if there's a telemetry recorder.
+    def send_move(self, dx, dy, dz, dyaw, duration):
+        roll, pitch, yaw, vertical_movement = move(self.mambo, dx=dx, dy=dy, dz=dz, dyaw=dyaw, duration=duration)
+        if self.telemetry_recorder is not None:
+            self.telemetry_recorder.record_command(dx, dy, dz, dyaw, roll, pitch, yaw, vertical_movement, duration)
+
+    def is_close(self, dx, dy, dz, dyaw):
+        distance = np.sqrt(dx**2 + dy**2 + dz**2)
+        return distance < self.thresh_dist and abs(dyaw) < self.thresh_yaw
 
     def smooth_gen(self, cinematic_waypoints, duration=1):
         # list of drone states
@@ -26,29 +73,53 @@ class SmoothController:
             print("drone_state:", drone_state)
             print("goal_state:", goal)
 
-            # pyparrot's +x is our -y (forward)
-            # pyparrot's +y is our +x (right)
-            # pyparrot's +z is our -z (up)
-
-            Dx = goal.x - drone_state.y
-            Dy = goal.y - (-drone_state.x)
-            dz = goal.z - (-drone_state.z)
-            dyaw = goal.yaw - drone_state.yaw
-
-            # conversion to relative coordinates
-            dx = Dx * np.sin(np.deg2rad(-drone_state.yaw))
-            dy = Dy * np.cos(np.deg2rad(-drone_state.yaw))
+            dx, dy, dz, dyaw = SmoothController.compute_relative_move(drone_state, goal)
 
             print("dx", dx)
             print("dy", dy)
             print("dz", dz)
             print("dyaw", dyaw)
 
-            move(self.mambo, dx=dx, dy=dy, dz=dz, dyaw=dyaw, duration=duration)
+            self.send_move(dx, dy, dz, dyaw, duration)
 
-            distance = np.sqrt(dx**2 + dy**2 + dz**2)
-            if distance < self.thresh_dist and dyaw < self.thresh_yaw:
-                close = True
+            close = self.is_close(dx, dy, dz, dyaw)
 
         print("Done! Close enough")
 
+    # Sets the DroneState that step() flies towards. Can be called at any time, including mid-flight.
+    # Passing None stops sending commands.
+    def set_goal(self, goal):
+        if goal is self.goal:
+            return
+        self.goal = goal
+        self.status = SmoothController.IDLE if goal is None else SmoothController.MOVING
+
+    # Sends at most one command towards the current goal and returns the controller's status.
+    # now is the current time in seconds (defaults to the controller's clock). If less than one control period has
+    # passed since the last command, nothing is sent and the previous status is returned, so it's safe to
+    # call this more often than control_rate.
+    def step(self, now=None):
+        if now is None:
+            now = self.clock.time()
+        if self.goal is None:
+            self.status = SmoothController.IDLE
+            return self.status
+        if self.next_step_time is not None and now < self.next_step_time:
+            return self.status
+        # Keep commands on a fixed schedule, unless we've fallen more than a whole period behind it.
+        period = 1.0 / self.control_rate
+        if self.next_step_time is None or now - self.next_step_time >= period:
+            self.next_step_time = now + period
+        else:
+            self.next_step_time += period
+
+        drone_state, _ = self.state_estim.get_current_drone_state()
+        dx, dy, dz, dyaw = SmoothController.compute_relative_move(drone_state, self.goal)
+        if self.is_close(dx, dy, dz, dyaw):
+            self.status = SmoothController.CONVERGED
+        else:
+            # A duration of None sends a single command instead of blocking, so the next step can
+            # correct it.
+            self.send_move(dx, dy, dz, dyaw, None)
+            self.status = SmoothController.MOVING
+        return self.status
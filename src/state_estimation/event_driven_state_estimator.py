@@ -0,0 +1,111 @@
+from pyparrot.Minidrone import MinidroneSensors
+import numpy as np
+import threading
+from utils.drone_state import DroneState
+
+
+# State estimator that listens for sensor updates from the mambo instead of polling it.
+# Every time pyparrot receives a new speed or quaternion message, the estimate is integrated forward and
+# pushed onto a fixed-size ring buffer of timestamped states. get_current_drone_state() just returns the
+# newest entry, so it's O(1) and never costs a round trip to the drone.
+# The estimate itself follows NewStateEstimator: x and y are dead-reckoned from the speed, z comes from
+# the altimeter, and attitude comes from the quaternion. Attitude rates are finite differences between
+# consecutive quaternion messages.
+class EventDrivenStateEstimator:
+    # Columns of the history buffer.
+    TIME, X, Y, Z, ROLL, PITCH, YAW, X_DOT, Y_DOT, Z_DOT, ROLL_DOT, PITCH_DOT, YAW_DOT = range(13)
+    NUM_COLUMNS = 13
+
+    def __init__(self, mambo, history_size=256):
+        self.mambo = mambo
+        self.history = np.zeros((history_size, EventDrivenStateEstimator.NUM_COLUMNS))
+        self.history_size = history_size
+        self.num_states = 0  # Total number of states ever pushed, not capped at history_size.
+        self.lock = threading.Lock()
+
+        sensors = mambo.sensors
+        self.last_speed_ts = sensors.speed_ts
+        self.last_quaternion_ts = sensors.quaternion_ts
+        # The estimate that gets updated in place as sensor messages come in. Same layout as a history row.
+        self.current = np.zeros(EventDrivenStateEstimator.NUM_COLUMNS)
+        self.current[EventDrivenStateEstimator.TIME] = sensors.speed_ts
+        self.current[EventDrivenStateEstimator.Z] = sensors.altitude
+        self.push_current_state()
+
+        # Called by pyparrot on its own thread every time any sensor is updated.
+        mambo.set_user_sensor_callback(self.on_sensor_update, None)
+
+    # Stops listening to the drone's sensors. The last estimate is still available afterwards.
+    def stop(self):
+        self.mambo.set_user_sensor_callback(None, None)
+
+    def on_sensor_update(self, args):
+        sensors = self.mambo.sensors
+        updated = False
+        # The timestamp is the last field of each message, so once it changes the rest of the message
+        # has already been written.
+        if sensors.speed_ts != self.last_speed_ts:
+            self.integrate_speed(sensors)
+            updated = True
+        if sensors.quaternion_ts != self.last_quaternion_ts:
+            self.integrate_attitude(sensors)
+            updated = True
+        if updated:
+            self.push_current_state()
+
+    def integrate_speed(self, sensors):
+        current = self.current
+        elapsed_time = (sensors.speed_ts - self.last_speed_ts) / 1000.0
+        current[EventDrivenStateEstimator.X] += sensors.speed_x * elapsed_time
+        current[EventDrivenStateEstimator.Y] += sensors.speed_y * elapsed_time
+        # The altimeter seems to be more accurate than integrating speed_z.
+        current[EventDrivenStateEstimator.Z] = sensors.altitude
+        current[EventDrivenStateEstimator.X_DOT] = sensors.speed_x
+        current[EventDrivenStateEstimator.Y_DOT] = sensors.speed_y
+        current[EventDrivenStateEstimator.Z_DOT] = sensors.speed_z
+        current[EventDrivenStateEstimator.TIME] = sensors.speed_ts
+        self.last_speed_ts = sensors.speed_ts
+
+    def integrate_attitude(self, sensors):
+        current = self.current
+        attitude_columns = slice(EventDrivenStateEstimator.ROLL, EventDrivenStateEstimator.YAW + 1)
+        attitude_rate_columns = slice(EventDrivenStateEstimator.ROLL_DOT, EventDrivenStateEstimator.YAW_DOT + 1)
+
+        attitude = np.array(MinidroneSensors.quaternion_to_euler_angle(self.mambo, sensors.quaternion_w,
+                                                                       sensors.quaternion_x, sensors.quaternion_y,
+                                                                       sensors.quaternion_z))
+        elapsed_time = (sensors.quaternion_ts - self.last_quaternion_ts) / 1000.0
+        # The first quaternion message has nothing to difference against.
+        if self.last_quaternion_ts >= 0 and elapsed_time > 0:
+            # Wrap the change in angle to [-180, 180) degrees so crossing +-180 doesn't look like a huge spin.
+            attitude_change = (attitude - current[attitude_columns] + 180) % 360 - 180
+            current[attitude_rate_columns] = attitude_change / elapsed_time
+        current[attitude_columns] = attitude
+        self.last_quaternion_ts = sensors.quaternion_ts
+
+    def push_current_state(self):
+        with self.lock:
+            self.history[self.num_states % self.history_size] = self.current
+            self.num_states += 1
+
+    # Returns current drone state and the time, like NewStateEstimator, but without touching the drone.
+    def get_current_drone_state(self):
+        with self.lock:
+            row = self.history[(self.num_states - 1) % self.history_size].copy()
+        return EventDrivenStateEstimator.row_to_drone_state(row), row[EventDrivenStateEstimator.TIME]
+
+    # Returns a copy of the buffered states as an array with one row per state, oldest first.
+    # See the column constants at the top of the class for the layout of each row.
+    def get_state_history(self):
+        with self.lock:
+            if self.num_states <= self.history_size:
+                return self.history[:self.num_states].copy()
+            start = self.num_states % self.history_size
+            return np.concatenate((self.history[start:], self.history[:start]))
+
+    @staticmethod
+    def row_to_drone_state(row):
+        return DroneState(*row[EventDrivenStateEstimator.X:EventDrivenStateEstimator.YAW_DOT + 1])
+
+    def has_taken_off(self):
+        return DroneState(x=0, y=0, z=0, roll=0, pitch=0, yaw=0)
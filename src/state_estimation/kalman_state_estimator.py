@@ -0,0 +1,177 @@
+from pyparrot.Minidrone import MinidroneSensors
+import numpy as np
+from utils.drone_state import DroneState
+
+
+# Drop-in replacement for NewStateEstimator that runs a linear Kalman filter instead of dead-reckoning
+# with a single Euler step.
+# The filter state is [x, y, z, x_dot, y_dot, z_dot, yaw, yaw_dot], with a constant-velocity model whose
+# accelerations (and yaw acceleration) are treated as white noise. Each fetch fuses:
+# - the measured velocity (speed_x, speed_y, speed_z),
+# - the altimeter reading (altitude), and
+# - the yaw from the quaternion.
+# Roll and pitch come straight from the quaternion, since nothing else measures them.
+# Like the other estimators, z is the altitude and angles are in degrees. The mambo reports speed_z as positive
+# when moving down, so inside the filter z_dot is -speed_z (positive when climbing, to match z). The DroneState
+# still reports z_dot as speed_z, like NewStateEstimator does.
+# The horizontal position standard deviation (in meters) is reported as DroneState.uncertainty.
+class KalmanStateEstimator:
+    # Indices into the filter state.
+    X, Y, Z, X_DOT, Y_DOT, Z_DOT, YAW, YAW_DOT = range(8)
+    NUM_STATES = 8
+    NUM_MEASUREMENTS = 5  # x_dot, y_dot, z_dot, z, yaw
+
+    def __init__(self, mambo, acceleration_noise=1.0, yaw_acceleration_noise=90.0, velocity_noise=0.1,
+                 altitude_noise=0.05, yaw_noise=2.0, initial_position_variance=0.01):
+        self.mambo = mambo
+        self.acceleration_noise = acceleration_noise  # m/s^2
+        self.yaw_acceleration_noise = yaw_acceleration_noise  # deg/s^2
+
+        n = KalmanStateEstimator.NUM_STATES
+        m = KalmanStateEstimator.NUM_MEASUREMENTS
+        self.state = np.zeros(n)
+        self.state[KalmanStateEstimator.Z] = max(mambo.sensors.altitude, 0)
+        self.covariance = np.eye(n) * initial_position_variance
+
+        # Buffers that are reused on every fetch instead of being reallocated. predict and update write into
+        # these (and into state and covariance) in place; the only array made per fetch is the solve for the
+        # gain.
+        self.transition = np.eye(n)
+        self.process_noise = np.zeros((n, n))
+        self.measurement = np.zeros(m)
+        self.innovation = np.zeros(m)
+        self.identity = np.eye(n)
+        self.state_correction = np.zeros(n)
+        self.covariance_product = np.zeros((n, n))
+        self.gain_model = np.zeros((n, n))
+        self.valid_measurement_model = np.zeros((m, n))
+        self.model_covariance = np.zeros((m, n))
+        self.innovation_covariance = np.zeros((m, m))
+        # The measurement model never changes: each measurement reads one element of the state.
+        self.measurement_model = np.zeros((m, n))
+        for row, column in enumerate([KalmanStateEstimator.X_DOT, KalmanStateEstimator.Y_DOT,
+                                      KalmanStateEstimator.Z_DOT, KalmanStateEstimator.Z, KalmanStateEstimator.YAW]):
+            self.measurement_model[row, column] = 1
+        self.measurement_noise = np.diag([velocity_noise ** 2, velocity_noise ** 2, velocity_noise ** 2,
+                                          altitude_noise ** 2, yaw_noise ** 2])
+
+        self.previous_fetch_time = mambo.sensors.speed_ts
+        self.roll = 0
+        self.pitch = 0
+        self.roll_rate = 0
+        self.pitch_rate = 0
+
+    # Propagates the state forward by elapsed_time seconds.
+    def predict(self, elapsed_time):
+        transition = self.transition
+        for position, velocity in [(KalmanStateEstimator.X, KalmanStateEstimator.X_DOT),
+                                   (KalmanStateEstimator.Y, KalmanStateEstimator.Y_DOT),
+                                   (KalmanStateEstimator.Z, KalmanStateEstimator.Z_DOT),
+                                   (KalmanStateEstimator.YAW, KalmanStateEstimator.YAW_DOT)]:
+            transition[position, velocity] = elapsed_time
+
+        # Discretized white-noise acceleration for each (position, velocity) pair.
+        dt2 = elapsed_time ** 2
+        dt3 = elapsed_time ** 3 / 2
+        dt4 = elapsed_time ** 4 / 4
+        for position, velocity, noise in [(KalmanStateEstimator.X, KalmanStateEstimator.X_DOT, self.acceleration_noise),
+                                          (KalmanStateEstimator.Y, KalmanStateEstimator.Y_DOT, self.acceleration_noise),
+                                          (KalmanStateEstimator.Z, KalmanStateEstimator.Z_DOT, self.acceleration_noise),
+                                          (KalmanStateEstimator.YAW, KalmanStateEstimator.YAW_DOT,
+                                           self.yaw_acceleration_noise)]:
+            variance = noise ** 2
+            self.process_noise[position, position] = dt4 * variance
+            self.process_noise[position, velocity] = dt3 * variance
+            self.process_noise[velocity, position] = dt3 * variance
+            self.process_noise[velocity, velocity] = dt2 * variance
+
+        np.dot(transition, self.state, out=self.state_correction)
+        self.state[:] = self.state_correction
+        np.dot(transition, self.covariance, out=self.covariance_product)
+        np.dot(self.covariance_product, transition.T, out=self.covariance)
+        self.covariance += self.process_noise
+
+    # Fuses a measurement vector of [x_dot, y_dot, z_dot, z, yaw] into the state.
+    # valid is an optional boolean mask of the measurements that were actually received. The others are
+    # dropped by zeroing their rows of the measurement model and their innovations, which gives them zero gain
+    # (the measurement noise is diagonal), exactly as if they had been left out.
+    def update(self, measurement, valid=None):
+        H = self.measurement_model
+        np.subtract(measurement, H.dot(self.state, out=self.innovation), out=self.innovation)
+        innovation = self.innovation
+        # Wrap the yaw innovation to [-180, 180) so the filter takes the short way around.
+        innovation[4] = (innovation[4] + 180) % 360 - 180
+        if valid is not None:
+            # Drop the measurements we didn't get this time (e.g. no altimeter over BLE).
+            invalid = np.logical_not(valid)
+            H = self.valid_measurement_model
+            H[:] = self.measurement_model
+            H[invalid] = 0
+            innovation[invalid] = 0
+
+        np.dot(H, self.covariance, out=self.model_covariance)
+        np.dot(self.model_covariance, H.T, out=self.innovation_covariance)
+        self.innovation_covariance += self.measurement_noise
+        gain = np.linalg.solve(self.innovation_covariance, self.model_covariance).T
+        self.state += np.dot(gain, innovation, out=self.state_correction)
+        np.dot(gain, H, out=self.gain_model)
+        np.subtract(self.identity, self.gain_model, out=self.gain_model)
+        np.dot(self.gain_model, self.covariance, out=self.covariance_product)
+        # Keep the covariance symmetric despite rounding.
+        np.add(self.covariance_product, self.covariance_product.T, out=self.covariance)
+        self.covariance *= 0.5
+        self.state[KalmanStateEstimator.YAW] = (self.state[KalmanStateEstimator.YAW] + 180) % 360 - 180
+
+    def get_attitude(self):
+        q1 = self.mambo.sensors.quaternion_w
+        q2 = self.mambo.sensors.quaternion_x
+        q3 = self.mambo.sensors.quaternion_y
+        q4 = self.mambo.sensors.quaternion_z
+
+        roll, pitch, yaw = MinidroneSensors.quaternion_to_euler_angle(self.mambo, q1, q2, q3, q4)
+
+        return roll, pitch, yaw
+
+    # Returns current drone state and the time.
+    def get_current_drone_state(self):
+        sensors = self.mambo.sensors
+        current_time = sensors.speed_ts
+        elapsed_time = (current_time - self.previous_fetch_time) / 1000.0
+        # Only run the filter if the drone has sent something new since the last fetch.
+        if elapsed_time > 0:
+            self.predict(elapsed_time)
+
+            roll, pitch, yaw = self.get_attitude()
+            self.roll_rate = (roll - self.roll) / elapsed_time
+            self.pitch_rate = (pitch - self.pitch) / elapsed_time
+            self.roll = roll
+            self.pitch = pitch
+
+            measurement = self.measurement
+            measurement[0] = sensors.speed_x
+            measurement[1] = sensors.speed_y
+            measurement[2] = -sensors.speed_z
+            measurement[3] = sensors.altitude
+            measurement[4] = yaw
+            valid = None
+            if sensors.altitude < 0:  # The altimeter reports -1 when it isn't available.
+                valid = np.array([True, True, True, False, True])
+            self.update(measurement, valid)
+            self.previous_fetch_time = current_time
+
+        return self.get_drone_state(), current_time
+
+    # Packs the current filter estimate into a DroneState.
+    def get_drone_state(self):
+        state = self.state
+        horizontal_variance = (self.covariance[KalmanStateEstimator.X, KalmanStateEstimator.X] +
+                               self.covariance[KalmanStateEstimator.Y, KalmanStateEstimator.Y]) / 2
+        return DroneState(state[KalmanStateEstimator.X], state[KalmanStateEstimator.Y], state[KalmanStateEstimator.Z],
+                          self.roll, self.pitch, state[KalmanStateEstimator.YAW],
+                          state[KalmanStateEstimator.X_DOT], state[KalmanStateEstimator.Y_DOT],
+                          -state[KalmanStateEstimator.Z_DOT],
+                          self.roll_rate, self.pitch_rate, state[KalmanStateEstimator.YAW_DOT],
+                          uncertainty=float(np.sqrt(horizontal_variance)))
+
+    def has_taken_off(self):
+        return DroneState(x=0, y=0, z=0, roll=0, pitch=0, yaw=0)
@@ -1,12 +1,15 @@
 # Class for representing the information in a bounding box of a person.
 # Contains width and height of the box, in pixels, and the centroid of
-# the box in the image.
+# the box in the image, and optionally the detector's confidence in the box.
 class BoundingBox:
-    def __init__(self, dimensions, centroid):
+    def __init__(self, dimensions, centroid, score=None):
         # Dimensions is a 2-element tuple of width, height
         self.dimensions = dimensions
         # Centroid is a 2-element tuple of x, y of center of box in the raw image
         self.centroid = centroid
+        # Score is the detector's confidence in [0, 1], or None if the source of the box doesn't have one.
+        # It's intentionally left out of equality, which only compares the geometry of the box.
+        self.score = score
 
     def get_dimensions(self):
         return self.dimensions
@@ -14,6 +17,9 @@ class BoundingBox:
     def get_centroid(self):
         return self.centroid
 
+    def get_score(self):
+        return self.score
+
     def get_area(self):
         return self.dimensions[0] * self.dimensions[1]
 
@@ -0,0 +1,80 @@
+import threading
+import time
+
+
+# Clocks are the single source of "now" for anything that timestamps or paces itself (predictors, the state
+# estimator, the controllers, the pipeline, the frame grabber). They all default to a RealClock, but can be
+# given a SimulatedClock or a ReplayClock instead, so simulations, replays and tests run at CPU speed instead
+# of being tied to the wall clock.
+# Every clock has:
+#   time(): the current time in seconds.
+#   sleep(seconds): lets seconds pass.
+#   wait(event, seconds): like event.wait(seconds), but with seconds measured on this clock. Returns whether
+#       the event is set.
+
+
+# Follows the wall clock.
+class RealClock:
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def wait(self, event, seconds):
+        return event.wait(max(0.0, seconds))
+
+
+# Manually driven clock. Time only moves when advance is called, or when someone sleeps or waits on it, which
+# moves it forward instantly.
+# Meant for single-threaded use (tests and simulations that step everything from one loop). Reading and
+# advancing it is thread safe, but threads that each sleep or wait on it push time forward for all of them, so
+# their waits stop meaning anything. For threaded code, use a ReplayClock, whose timeline handles that.
+class SimulatedClock:
+    def __init__(self, start_time=0.0):
+        self.lock = threading.Lock()
+        self.current_time = float(start_time)
+
+    def time(self):
+        with self.lock:
+            return self.current_time
+
+    # Moves time forward by seconds. Time never goes backwards, so negative values are ignored.
+    def advance(self, seconds):
+        if seconds <= 0:
+            return
+        with self.lock:
+            self.current_time += seconds
+
+    # Moves time to timestamp, if it's in the future.
+    def set_time(self, timestamp):
+        with self.lock:
+            self.current_time = max(self.current_time, float(timestamp))
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def wait(self, event, seconds):
+        if not event.is_set():
+            self.advance(seconds)
+        return event.is_set()
+
+
+# Reads time off a ReplayTimeline, so everything in a replayed flight agrees with the replayed sensors and
+# frames, whether the replay runs in real time, sped up, or as fast as possible.
+class ReplayClock:
+    def __init__(self, timeline):
+        self.timeline = timeline
+
+    def time(self):
+        return self.timeline.now()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.timeline.sleep(seconds)
+
+    def wait(self, event, seconds):
+        if seconds > 0:
+            self.timeline.wait_until(self.timeline.now() + seconds, event)
+        return event.is_set()
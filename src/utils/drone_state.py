@@ -39,3 +39,14 @@ class DroneState:
         
         return my_str
     
+
+# Column order used when a batch of drone states is stored as an N x NUM_STATE_COLUMNS array, with one state
+# per row. Matches the order of DroneState's constructor arguments, so DroneState(*row) rebuilds a state.
+STATE_COLUMNS = ('x', 'y', 'z', 'roll', 'pitch', 'yaw',
+                 'x_dot', 'y_dot', 'z_dot', 'roll_dot', 'pitch_dot', 'yaw_dot')
+NUM_STATE_COLUMNS = len(STATE_COLUMNS)
+
+
+# Turns an N x NUM_STATE_COLUMNS array of states into a list of N DroneStates.
+def drone_states_from_array(state_array):
+    return [DroneState(*row) for row in state_array.tolist()]
@@ -4,11 +4,14 @@ import math
 # Representation of a person state, which for now is just x and y location.
 # The key method is estimating the state from a drone state and a bounding box.
 # There's lots of room for calibration and more sophisticated calculation.
+# Predicted states may also carry a 2x2 covariance of x and y, for predictors that know how uncertain they
+# are. It's None otherwise.
 class PersonState:
-    def __init__(self, x, y):
+    def __init__(self, x, y, covariance=None):
         self.x = x
         self.y = y
         self.radius = 0.5
+        self.covariance = covariance
 
     # Estimate an x, y position from a bounding_box and a drone state. We need the
     # drone state as a sort of reference frame, and then we project into a new point
@@ -0,0 +1,141 @@
+import numpy as np
+import os
+import queue
+import threading
+import time
+from utils.clock import RealClock
+
+# Records flight telemetry (drone states, bounding boxes, waypoints and move commands) to disk.
+# Each kind of record goes to its own append-only binary file of fixed-size little-endian records, one
+# NumPy structured dtype per file (see below). A new recorder starts the files over, so each directory holds
+# a single run. Because the records are fixed-size, a file can be opened
+# afterwards as a memory-mapped array with read_telemetry, without parsing anything.
+# Lists (of bounding boxes or waypoints) are flattened to one record per element. list_index numbers the
+# lists in the order they were recorded, and count is the length of the list the record came from. An empty
+# list is recorded as a single record with count 0 and element_index -1, so it isn't lost.
+
+STATE_FIELDS = [('x', '<f8'), ('y', '<f8'), ('z', '<f8'), ('roll', '<f8'), ('pitch', '<f8'), ('yaw', '<f8'),
+                ('x_dot', '<f8'), ('y_dot', '<f8'), ('z_dot', '<f8'),
+                ('roll_dot', '<f8'), ('pitch_dot', '<f8'), ('yaw_dot', '<f8'), ('uncertainty', '<f8')]
+LIST_FIELDS = [('time', '<f8'), ('list_index', '<i8'), ('element_index', '<i8'), ('count', '<i8')]
+
+DRONE_STATE_DTYPE = np.dtype([('time', '<f8')] + STATE_FIELDS)
+BOUNDING_BOX_DTYPE = np.dtype(LIST_FIELDS + [('width', '<f8'), ('height', '<f8'), ('x', '<f8'), ('y', '<f8'),
+                                             ('score', '<f8')])
+WAYPOINT_DTYPE = np.dtype(LIST_FIELDS + STATE_FIELDS)
+COMMAND_DTYPE = np.dtype([('time', '<f8'), ('dx', '<f8'), ('dy', '<f8'), ('dz', '<f8'), ('dyaw', '<f8'),
+                          ('roll', '<f8'), ('pitch', '<f8'), ('yaw', '<f8'), ('vertical_movement', '<f8'),
+                          ('duration', '<f8')])
+
+# Name of the file each kind of record is written to, and its dtype.
+STREAMS = {'drone_states': DRONE_STATE_DTYPE,
+           'bounding_boxes': BOUNDING_BOX_DTYPE,
+           'waypoints': WAYPOINT_DTYPE,
+           'commands': COMMAND_DTYPE}
+
+
+# Returns the fields of a DroneState in the order used by STATE_FIELDS.
+def drone_state_to_tuple(drone_state):
+    return (drone_state.x, drone_state.y, drone_state.z, drone_state.roll, drone_state.pitch, drone_state.yaw,
+            drone_state.x_dot, drone_state.y_dot, drone_state.z_dot,
+            drone_state.roll_dot, drone_state.pitch_dot, drone_state.yaw_dot, drone_state.uncertainty)
+
+
+# Opens every telemetry file in directory as a read-only memory-mapped structured array.
+# Returns a dict from stream name (e.g. 'drone_states') to array. Streams with no records map to an empty
+# array of the right dtype.
+def read_telemetry(directory):
+    telemetry = {}
+    for name, dtype in STREAMS.items():
+        filepath = os.path.join(directory, name + '.bin')
+        if not os.path.exists(filepath) or os.path.getsize(filepath) < dtype.itemsize:
+            telemetry[name] = np.zeros(0, dtype=dtype)
+        else:
+            num_records = os.path.getsize(filepath) // dtype.itemsize
+            telemetry[name] = np.memmap(filepath, dtype=dtype, mode='r', shape=(num_records,))
+    return telemetry
+
+
+class TelemetryRecorder:
+    # Records are packed into arrays by the caller, which is cheap, and written to disk by a background
+    # thread, so recording never blocks the control loop on disk.
+    # Records without an explicit timestamp are stamped with clock (see utils/clock.py). Flushing always
+    # follows the wall clock, since it's about getting data onto the disk.
+    def __init__(self, directory, flush_interval=1.0, clock=None):
+        self.directory = directory
+        self.flush_interval = flush_interval  # seconds
+        self.clock = clock if clock is not None else RealClock()
+        os.makedirs(directory, exist_ok=True)
+        self.files = {name: open(os.path.join(directory, name + '.bin'), 'wb') for name in STREAMS}
+        self.pending_records = queue.Queue()
+        self.list_indices = {'bounding_boxes': 0, 'waypoints': 0}
+        self.list_index_lock = threading.Lock()
+        self.writer_thread = threading.Thread(target=self.write_records, daemon=True)
+        self.writer_thread.start()
+
+    def record_drone_state(self, drone_state, timestamp=None):
+        timestamp = self.clock.time() if timestamp is None else timestamp
+        records = np.array([(timestamp,) + drone_state_to_tuple(drone_state)], dtype=DRONE_STATE_DTYPE)
+        self.pending_records.put(('drone_states', records))
+
+    def record_bounding_boxes(self, bounding_boxes, timestamp=None):
+        timestamp = self.clock.time() if timestamp is None else timestamp
+        list_index = self.next_list_index('bounding_boxes')
+        bounding_boxes = [] if bounding_boxes is None else bounding_boxes
+        rows = []
+        for element_index, bb in enumerate(bounding_boxes):
+            score = np.nan if bb.score is None else bb.score
+            rows.append((timestamp, list_index, element_index, len(bounding_boxes)) +
+                        tuple(bb.get_dimensions()) + tuple(bb.get_centroid()) + (score,))
+        if len(rows) == 0:
+            rows.append((timestamp, list_index, -1, 0) + (np.nan,) * 5)
+        self.pending_records.put(('bounding_boxes', np.array(rows, dtype=BOUNDING_BOX_DTYPE)))
+
+    def record_waypoints(self, waypoints, timestamp=None):
+        timestamp = self.clock.time() if timestamp is None else timestamp
+        list_index = self.next_list_index('waypoints')
+        waypoints = [] if waypoints is None else waypoints
+        rows = [(timestamp, list_index, element_index, len(waypoints)) + drone_state_to_tuple(waypoint)
+                for element_index, waypoint in enumerate(waypoints)]
+        if len(rows) == 0:
+            rows.append((timestamp, list_index, -1, 0) + (np.nan,) * len(STATE_FIELDS))
+        self.pending_records.put(('waypoints', np.array(rows, dtype=WAYPOINT_DTYPE)))
+
+    # Records a move command: the requested displacement (dx, dy, dz, dyaw), the fly_direct values it was
+    # turned into (roll, pitch, yaw, vertical_movement) and its duration (None for a single command).
+    def record_command(self, dx, dy, dz, dyaw, roll, pitch, yaw, vertical_movement, duration, timestamp=None):
+        timestamp = self.clock.time() if timestamp is None else timestamp
+        duration = np.nan if duration is None else duration
+        records = np.array([(timestamp, dx, dy, dz, dyaw, roll, pitch, yaw, vertical_movement, duration)],
+                           dtype=COMMAND_DTYPE)
+        self.pending_records.put(('commands', records))
+
+    def next_list_index(self, name):
+        with self.list_index_lock:
+            list_index = self.list_indices[name]
+            self.list_indices[name] += 1
+            return list_index
+
+    def write_records(self):
+        last_flush_time = time.time()
+        while True:
+            try:
+                item = self.pending_records.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+            if item is not None:
+                if item == 'close':
+                    break
+                name, records = item
+                records.tofile(self.files[name])
+            if time.time() - last_flush_time >= self.flush_interval:
+                for f in self.files.values():
+                    f.flush()
+                last_flush_time = time.time()
+        for f in self.files.values():
+            f.close()
+
+    # Writes out everything recorded so far and closes the files. Call once at the end of the flight.
+    def close(self):
+        self.pending_records.put('close')
+        self.writer_thread.join()
@@ -0,0 +1,154 @@
+import cv2
+import numpy as np
+import os
+import queue
+import re
+import threading
+
+# Streaming video encoding. Frames are written to the video file as soon as they're available, instead of
+# being collected into a list first, so memory use stays flat no matter how long the flight was.
+
+
+# Returns the paths of all the numbered images in image_directory (e.g. test_image_000012.png), ordered
+# by their number rather than alphabetically. Files without a number, like latest_image.png, are skipped.
+# Frames saved uncompressed as .npy files (see FrameDiskSink.RAW) are included too. Load them with read_frame.
+def list_numbered_frames(image_directory):
+    numbered_files = []
+    for filename in os.listdir(image_directory):
+        match = re.search(r'(\d+)\.(png|jpg|jpeg|npy)$', filename, re.IGNORECASE)
+        if match is not None and os.path.isfile(os.path.join(image_directory, filename)):
+            numbered_files.append((int(match.group(1)), filename))
+    numbered_files.sort()
+    return [os.path.join(image_directory, filename) for _, filename in numbered_files]
+
+
+# Loads a frame saved as an image file or as a .npy array. Returns None if it can't be read.
+def read_frame(filepath):
+    if filepath.lower().endswith('.npy'):
+        try:
+            return np.load(filepath)
+        except (OSError, ValueError):
+            return None
+    return cv2.imread(filepath)
+
+
+# Yields the images at filepaths in order. A background thread decodes up to prefetch_size images ahead of
+# the consumer, so decoding the next image overlaps with whatever the consumer does with the current one
+# (e.g. encoding it), while never holding more than prefetch_size decoded images in memory.
+# Files that can't be read are skipped.
+def read_frames_prefetched(filepaths, prefetch_size=8):
+    decoded_images = queue.Queue(maxsize=prefetch_size)
+    stop_event = threading.Event()
+    end_of_frames = object()
+
+    # Puts item on the queue, unless the consumer stops reading first. Returns whether it was put.
+    # Never blocks forever on a full queue, since the consumer may never come back for it.
+    def put_unless_stopped(item):
+        while not stop_event.is_set():
+            try:
+                decoded_images.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def decode_frames():
+        for filepath in filepaths:
+            image = read_frame(filepath)
+            if image is None:
+                continue
+            if not put_unless_stopped(image):
+                return
+        put_unless_stopped(end_of_frames)
+
+    decoder_thread = threading.Thread(target=decode_frames, daemon=True)
+    decoder_thread.start()
+    try:
+        while True:
+            image = decoded_images.get()
+            if image is end_of_frames:
+                return
+            yield image
+    finally:
+        stop_event.set()
+        decoder_thread.join()
+
+
+# Thin wrapper around cv2.VideoWriter that opens the file when the first frame arrives, so the frame size
+# doesn't need to be known in advance.
+class VideoWriter:
+    def __init__(self, path_out='droneVideo.avi', fps=30, fourcc='DIVX'):
+        self.path_out = path_out
+        self.fps = fps
+        self.fourcc = fourcc
+        self.writer = None
+        self.frame_size = None  # (width, height), set by the first frame.
+        self.num_frames_written = 0
+
+    # Appends image to the video. Every image must be the same size as the first one.
+    def write(self, image):
+        height, width = image.shape[:2]
+        if self.writer is None:
+            self.frame_size = (width, height)
+            self.writer = cv2.VideoWriter(self.path_out, cv2.VideoWriter_fourcc(*self.fourcc), self.fps,
+                                          self.frame_size)
+        elif (width, height) != self.frame_size:
+            raise ValueError("All frames in a video must have the same size, expected " + str(self.frame_size) +
+                             " but got " + str((width, height)))
+        self.writer.write(image)
+        self.num_frames_written += 1
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Records the live camera stream to a video during the flight. A background thread pulls every new frame
+# off a FrameGrabber and encodes it straight away, so nothing is written to ./images/ first.
+class LiveVideoRecorder:
+    def __init__(self, frame_grabber, video_writer, frame_timeout=0.5):
+        self.frame_grabber = frame_grabber
+        self.video_writer = video_writer
+        # How long to wait for a frame before checking whether we should stop, in seconds.
+        self.frame_timeout = frame_timeout
+        self.stop_event = threading.Event()
+        self.recording_thread = None
+
+    def start(self):
+        self.stop_event.clear()
+        self.recording_thread = threading.Thread(target=self.record_frames, daemon=True)
+        self.recording_thread.start()
+
+    # Stops recording and closes the video file.
+    def stop(self):
+        self.stop_event.set()
+        if self.recording_thread is not None:
+            self.recording_thread.join()
+        self.video_writer.close()
+
+    def record_frames(self):
+        last_sequence_number = 0
+        while not self.stop_event.is_set():
+            captured_frame = self.frame_grabber.next_frame(timeout=self.frame_timeout,
+                                                           after_sequence_number=last_sequence_number)
+            if captured_frame is None:
+                continue
+            last_sequence_number = captured_frame.sequence_number
+            self.video_writer.write(captured_frame.image)
+
+
+# Encodes the numbered images in path_in (see list_numbered_frames) into a video at path_out, streaming
+# them from disk with read_frames_prefetched. Returns the number of frames written.
+def convert_frames_to_video(path_in='./images/', path_out='droneVideo.avi', fps=30, fourcc='DIVX',
+                            prefetch_size=8):
+    with VideoWriter(path_out, fps, fourcc) as video_writer:
+        for image in read_frames_prefetched(list_numbered_frames(path_in), prefetch_size):
+            video_writer.write(image)
+        return video_writer.num_frames_written
@@ -5,13 +5,13 @@ from cinematic_waypoints.waypoint_generator.fixed_bb_waypoint_generator import F
 from cinematic_waypoints.waypoint_generator.yaw_waypoint_generator import YawWaypointGenerator
 from cinematic_waypoints.waypoint_generator.ngon_waypoint_generator import NGonWaypointGenerator
 from utils.bounding_box import BoundingBox
+from utils.clock import SimulatedClock
 from utils.drone_state import DroneState
 from utils.environment import Environment
 from utils.person_state import PersonState
 from person_detection.person_predictor.polynomial_predictor import PolynomialPredictor
 import math
 import os
-import time
 
 # Define a few helpful variables common across a few tests
 bb_10_10_0_0 = BoundingBox((10, 10), (0, 0))
@@ -292,23 +292,24 @@ class TestCinematicController(unittest.TestCase):
         assert TestCinematicController.are_points_close(waypoint4.get_position(), (0, 0, 0))
         # Check that the drone yaw gets updated, too
         epsilon = 0.01  # How much mathematical error is allowed
-        assert abs(waypoint1.get_attitude()[2] - math.pi / 2) < epsilon
-        assert abs(waypoint2.get_attitude()[2] - math.pi) < epsilon
-        assert abs(waypoint3.get_attitude()[2] - 3 * math.pi / 2) < epsilon
-        assert abs(waypoint4.get_attitude()[2] - 2 * math.pi) < epsilon
+        assert abs(waypoint1.get_attitude()[2] - 90) < epsilon
+        assert abs(waypoint2.get_attitude()[2] - 180) < epsilon
+        assert abs(waypoint3.get_attitude()[2] - 270) < epsilon
+        assert abs(waypoint4.get_attitude()[2] - 360) < epsilon
 
     # Test that the ngon waypoint generator can make squares around a moving target
     def test_generate_square_waypoints_around_prediction(self):
-        self.cinematic_controller.person_predictor = PolynomialPredictor(weight_decay_factor=2)
+        clock = SimulatedClock()
+        self.cinematic_controller.person_predictor = PolynomialPredictor(weight_decay_factor=2, clock=clock)
         self.cinematic_controller.update_latest_drone_state(origin_drone_state)
         self.cinematic_controller.update_latest_bbs([BoundingBox((10, 10), (0, 0))])
-        time.sleep(1)
+        clock.advance(1)
         self.cinematic_controller.update_latest_bbs([BoundingBox((9, 9), (0, 0))])
-        time.sleep(1)
+        clock.advance(1)
         self.cinematic_controller.update_latest_bbs([BoundingBox((8, 8), (0, 0))])
-        time.sleep(1)
+        clock.advance(1)
         self.cinematic_controller.update_latest_bbs([BoundingBox((7, 7), (0, 0))])
-        time.sleep(1)
+        clock.advance(1)
         self.cinematic_controller.update_latest_bbs([BoundingBox((6, 6), (0, 0))])
         self.cinematic_controller.set_waypoint_generator(NGonWaypointGenerator(n=4, radius=1))
 
@@ -328,10 +329,10 @@ class TestCinematicController(unittest.TestCase):
         assert abs(waypoint4.get_position()[1]) < allowed_error
         # Check that the drone yaw gets updated, too
         epsilon = 0.01  # How much mathematical error is allowed
-        assert abs(waypoint1.get_attitude()[2] - math.pi / 2) < epsilon
-        assert abs(waypoint2.get_attitude()[2] - math.pi) < epsilon
-        assert abs(waypoint3.get_attitude()[2] - 3 * math.pi / 2) < epsilon
-        assert abs(waypoint4.get_attitude()[2] - 2 * math.pi) < epsilon
+        assert abs(waypoint1.get_attitude()[2] - 90) < epsilon
+        assert abs(waypoint2.get_attitude()[2] - 180) < epsilon
+        assert abs(waypoint3.get_attitude()[2] - 270) < epsilon
+        assert abs(waypoint4.get_attitude()[2] - 360) < epsilon
 
     @staticmethod
     def are_points_close(point1, point2):
@@ -439,13 +440,14 @@ class TestCinematicController(unittest.TestCase):
         gamma = 0.9
         cinematic_controller = CinematicController(waypoint_generator=waypoint_generator, bb_filter_gamma=gamma)
         cinematic_controller.update_latest_drone_state(DroneState(x=2, y=-3))
-        cinematic_controller.person_predictor = PolynomialPredictor(poly_degree=2, weight_decay_factor=1)
+        clock = SimulatedClock()
+        cinematic_controller.person_predictor = PolynomialPredictor(poly_degree=2, weight_decay_factor=1, clock=clock)
         cinematic_controller.update_latest_bbs([BoundingBox((10, 10), (0, 0))])
-        time.sleep(.001)
+        clock.advance(.001)
         cinematic_controller.update_latest_bbs([BoundingBox((5, 5), (50, 0))])
-        time.sleep(.001)
+        clock.advance(.001)
         cinematic_controller.update_latest_bbs([BoundingBox((2, 2), (50, 0))])
-        time.sleep(.001)
+        clock.advance(.001)
         cinematic_controller.update_latest_bbs([BoundingBox((1, 1), (50, 0))])
 
         # initialize the drone waypoints
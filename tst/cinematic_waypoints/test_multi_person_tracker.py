@@ -0,0 +1,81 @@
+import numpy as np
+import unittest
+from cinematic_waypoints.cinematic_controller import CinematicController
+from cinematic_waypoints.multi_person_tracker import MultiPersonTracker
+from cinematic_waypoints.waypoint_generator.fixed_bb_waypoint_generator import FixedBBWaypointGenerator
+from utils.bounding_box import BoundingBox
+
+
+class TestMultiPersonTracker(unittest.TestCase):
+    def setUp(self):
+        self.tracker = MultiPersonTracker(max_misses=2)
+
+    # Test that two people walking past each other keep their ids.
+    def test_ids_persist(self):
+        # EXECUTE
+        for step in range(10):
+            left_person = BoundingBox((40, 100), (100 + 5 * step, 200))
+            right_person = BoundingBox((40, 100), (300 - 5 * step, 200))
+            # Shuffle the order of the detections, which shouldn't matter.
+            tracks = self.tracker.update([right_person, left_person] if step % 2 else [left_person, right_person])
+
+        # VERIFY
+        assert len(tracks) == 2
+        track_ids_by_x = {track.track_id: track.get_bounding_box().get_centroid()[0] for track in tracks}
+        assert track_ids_by_x[0] < track_ids_by_x[1]
+        assert abs(track_ids_by_x[0] - 145) < 5
+        assert abs(track_ids_by_x[1] - 255) < 5
+
+    # Test that a track coasts through a few missed frames and is then dropped.
+    def test_missed_tracks_are_dropped(self):
+        # SETUP
+        self.tracker.update([BoundingBox((40, 100), (100, 200))])
+
+        # EXECUTE & VERIFY
+        assert len(self.tracker.update([])) == 1
+        assert len(self.tracker.update(None)) == 1
+        assert len(self.tracker.update([])) == 0
+
+    # Test the cost of matching a track to a detection that's in the same place, and to one that's far away.
+    def test_cost_matrix(self):
+        # SETUP
+        track_corners = np.array([[0, 0, 10, 10]], dtype=np.float64)
+        detection_corners = np.array([[0, 0, 10, 10], [100, 100, 110, 110]], dtype=np.float64)
+
+        # EXECUTE
+        cost = MultiPersonTracker.compute_cost_matrix(track_corners, detection_corners, 0.5)
+
+        # VERIFY
+        np.testing.assert_allclose(cost, [[0, 1]])
+
+
+class TestCinematicControllerWithTracker(unittest.TestCase):
+    # Test that the controller keeps following the same person when someone larger shows up.
+    def test_follows_same_track(self):
+        # SETUP
+        cinematic_controller = CinematicController(waypoint_generator=FixedBBWaypointGenerator(),
+                                                   tracker=MultiPersonTracker())
+        cinematic_controller.update_latest_bbs([BoundingBox((40, 100), (100, 200))])
+        followed_track_id = cinematic_controller.followed_track_id
+
+        # EXECUTE
+        cinematic_controller.update_latest_bbs([BoundingBox((80, 200), (400, 200)), BoundingBox((40, 100), (102, 200))])
+
+        # VERIFY
+        assert cinematic_controller.followed_track_id == followed_track_id
+        assert abs(cinematic_controller.smoothed_bounding_box.get_centroid()[0] - 101) < 2
+
+    # Test that a chosen track id is followed.
+    def test_follows_target_track(self):
+        # SETUP
+        cinematic_controller = CinematicController(waypoint_generator=FixedBBWaypointGenerator(),
+                                                   tracker=MultiPersonTracker())
+        cinematic_controller.update_latest_bbs([BoundingBox((40, 100), (100, 200)), BoundingBox((80, 200), (400, 200))])
+
+        # EXECUTE
+        cinematic_controller.set_target_track_id(0)
+        cinematic_controller.update_latest_bbs([BoundingBox((40, 100), (100, 200)), BoundingBox((80, 200), (400, 200))])
+
+        # VERIFY
+        assert cinematic_controller.followed_track_id == 0
+        assert cinematic_controller.smoothed_bounding_box.get_centroid()[0] < 150
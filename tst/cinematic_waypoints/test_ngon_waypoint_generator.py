@@ -0,0 +1,104 @@
+import numpy as np
+import unittest
+from cinematic_waypoints.waypoint_generator.ngon_waypoint_generator import NGonWaypointGenerator
+from utils.drone_state import DroneState, NUM_STATE_COLUMNS
+from utils.person_state import PersonState
+
+
+# Predictor that always says the person walks along the x axis at 1 m/s, starting from (2, 0), and remembers
+# what it was asked.
+class FakePredictor:
+    def __init__(self):
+        self.requested_timesteps = []
+
+    def predict_next_person_state(self, time_deltas_to_predict):
+        self.requested_timesteps.append(list(time_deltas_to_predict))
+        return [PersonState(2 + t, 0) for t in time_deltas_to_predict]
+
+
+# Predictor that always says the person stays at the origin, less and less sure of it the further ahead it
+# looks.
+class UncertainPredictor:
+    def predict_next_person_state(self, time_deltas_to_predict):
+        return [PersonState(0, 0, covariance=np.diag([t ** 2, 0.25 * t ** 2])) for t in time_deltas_to_predict]
+
+
+class TestNGonWaypointGenerator(unittest.TestCase):
+    # Test that the waypoint array and the DroneStates describe the same square.
+    def test_array_matches_drone_states(self):
+        # SETUP
+        waypoint_generator = NGonWaypointGenerator(n=4, radius=1)
+        drone_state = DroneState(z=2, roll=0.1, pitch=0.2)
+
+        # EXECUTE
+        waypoints = waypoint_generator.generate_waypoints(None, drone_state)
+        waypoint_array = waypoint_generator.waypoint_array
+
+        # VERIFY
+        assert waypoint_array.shape == (4, NUM_STATE_COLUMNS)
+        np.testing.assert_allclose(waypoint_array[:, :2], [[1, -1], [2, 0], [1, 1], [0, 0]], atol=1e-9)
+        np.testing.assert_allclose(waypoint_array[:, 5], 90 * np.arange(1, 5))
+        for waypoint, row in zip(waypoints, waypoint_array):
+            assert waypoint.get_position() == tuple(row[:3])
+            assert waypoint.get_attitude() == (0.1, 0.2, row[5])
+            assert waypoint.get_linear_velocities() == (0, 0, 0)
+
+    # Test that the n-gon follows the predicted person, and that the predictor is only asked about the
+    # vertices' times.
+    def test_follows_predictor(self):
+        # SETUP
+        waypoint_generator = NGonWaypointGenerator(n=4, radius=1, time_to_project=8)
+        person_predictor = FakePredictor()
+
+        # EXECUTE
+        waypoint_array = waypoint_generator.generate_waypoint_array(None, DroneState(), person_predictor)
+
+        # VERIFY
+        assert person_predictor.requested_timesteps == [[2, 4, 6, 8]]
+        np.testing.assert_allclose(waypoint_array[:, :2], [[4, -1], [7, 0], [8, 1], [9, 0]], atol=1e-9)
+
+    # Test that the current yaw is read in degrees, and that the headings come out in degrees too.
+    def test_yaw_in_degrees(self):
+        # SETUP
+        waypoint_generator = NGonWaypointGenerator(n=4, radius=1)
+        drone_state = DroneState(x=1, y=2, yaw=90)
+
+        # EXECUTE
+        waypoint_array = waypoint_generator.generate_waypoint_array(None, drone_state)
+
+        # VERIFY
+        # Facing along +y, so the center is at (1, 3) and the drone circles it counterclockwise.
+        np.testing.assert_allclose(waypoint_array[:, :2], [[2, 3], [1, 4], [0, 3], [1, 2]], atol=1e-9)
+        np.testing.assert_allclose(waypoint_array[:, 5], [180, 270, 360, 450])
+
+    # Test that vertices are pushed out by the predicted uncertainty.
+    def test_uncertainty_margin(self):
+        # SETUP
+        waypoint_generator = NGonWaypointGenerator(n=4, radius=1, time_to_project=4, uncertainty_margin=2)
+
+        # EXECUTE
+        waypoint_array = waypoint_generator.generate_waypoint_array(None, DroneState(), UncertainPredictor())
+
+        # VERIFY
+        # Vertex i is predicted i seconds ahead, with a standard deviation of i along x.
+        distances = np.hypot(waypoint_array[:, 0], waypoint_array[:, 1])
+        np.testing.assert_allclose(distances, 1 + 2 * np.arange(1, 5))
+
+    # Test that large n gives a smooth circle of evenly spaced points, with headings that keep increasing.
+    def test_large_n(self):
+        # SETUP
+        n = 100000
+        waypoint_generator = NGonWaypointGenerator(n=n, radius=3)
+
+        # EXECUTE
+        waypoint_array = waypoint_generator.generate_waypoint_array(None, DroneState(yaw=60))
+
+        # VERIFY
+        center = np.array([3 * np.cos(np.pi / 3), 3 * np.sin(np.pi / 3)])
+        np.testing.assert_allclose(np.hypot(*(waypoint_array[:, :2] - center).T), 3)
+        np.testing.assert_allclose(np.diff(waypoint_array[:, 5]), 360 / n)
+        np.testing.assert_allclose(waypoint_array[-1, :2], [0, 0], atol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
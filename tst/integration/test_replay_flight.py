@@ -0,0 +1,54 @@
+import unittest
+from cinematic_waypoints.cinematic_controller import CinematicController
+from cinematic_waypoints.waypoint_generator.yaw_waypoint_generator import YawWaypointGenerator
+from replay.replay_mambo import ReplayMambo
+from replay.replay_timeline import ReplayTimeline
+from replay.sensor_log import SensorLog
+from smooth_control.smooth_controller import SmoothController
+from state_estimation.new_state_estimator import NewStateEstimator
+from utils.bounding_box import BoundingBox
+
+
+# Runs the cinematic and smooth controllers against a replayed flight, with no drone attached.
+class TestReplayFlight(unittest.TestCase):
+    def test_controllers_run_against_replay(self):
+        # SETUP
+        # Ten seconds of a drone drifting forward at 0.1 m/s, sampled at 10 Hz.
+        rows = []
+        for i in range(100):
+            row = [i * 0.1] + [0] * len(SensorLog.FIELDS)
+            row[SensorLog.COLUMNS.index("speed_x")] = 0.1
+            row[SensorLog.COLUMNS.index("speed_ts")] = i * 100
+            row[SensorLog.COLUMNS.index("altitude")] = 1.0
+            row[SensorLog.COLUMNS.index("quaternion_w")] = 1.0
+            rows.append(row)
+        timeline = ReplayTimeline(speed=None)
+        mambo = ReplayMambo(SensorLog(rows), timeline=timeline)
+        mambo.connect()
+        mambo.safe_takeoff(5)
+        state_estimator = NewStateEstimator(mambo)
+        cinematic_controller = CinematicController(waypoint_generator=YawWaypointGenerator())
+        smooth_controller = SmoothController(mambo, state_estimator, control_rate=10)
+
+        # EXECUTE
+        # A person standing off to the right of the frame the whole time.
+        while not mambo.is_finished():
+            drone_state, _ = state_estimator.get_current_drone_state()
+            cinematic_controller.update_latest_bbs([BoundingBox((50, 100), (500, 180))])
+            cinematic_controller.update_latest_drone_state(drone_state)
+            waypoints = cinematic_controller.generate_waypoints()
+            smooth_controller.set_goal(waypoints[0])
+            smooth_controller.step(timeline.now())
+            timeline.sleep(0.1)
+
+        # VERIFY
+        drone_state, _ = state_estimator.get_current_drone_state()
+        assert abs(drone_state.x - 0.99) < 0.05
+        assert len(mambo.commands) > 0
+        # Commands were sent at the replayed control rate, not as fast as the loop could go.
+        command_times = [command[0] for command in mambo.commands]
+        assert all(later - earlier >= 0.1 - 1e-9 for earlier, later in zip(command_times, command_times[1:]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import numpy as np
+from scipy.integrate import quad
+import unittest
+from person_detection.person_predictor.arc_length import project_along_curve
+
+
+class TestArcLength(unittest.TestCase):
+    # Test that walking along a straight line lands exactly where expected, for every distance at once.
+    def test_straight_line(self):
+        # EXECUTE
+        projected_x, projected_y = project_along_curve(np.poly1d([1, 0]), 0, [0, np.sqrt(2), 2 * np.sqrt(2)])
+
+        # VERIFY
+        np.testing.assert_allclose(projected_x, [0, 1, 2], atol=1e-9)
+        np.testing.assert_allclose(projected_y, [0, 1, 2], atol=1e-9)
+
+    # Test that walking along a parabola covers the requested arc length, to within the step size.
+    def test_parabola(self):
+        # SETUP
+        parabola = np.poly1d([1, 0, 0])
+        distances = [0.5, 1, 5, 10]
+
+        # EXECUTE
+        projected_x, projected_y = project_along_curve(parabola, 0, distances, max_step=0.001)
+
+        # VERIFY
+        np.testing.assert_allclose(projected_y, parabola(projected_x))
+        # Closed-form arc length of y = x^2 from 0 to x.
+        arc_lengths = (2 * projected_x * np.sqrt(1 + 4 * projected_x ** 2) +
+                       np.arcsinh(2 * projected_x)) / 4
+        np.testing.assert_allclose(arc_lengths, distances, atol=1e-3)
+
+    # Test that on a steep, wiggly curve, where a small step in x is a long way along the curve, the result is
+    # still within one step along the curve.
+    def test_steep_curve(self):
+        # SETUP
+        def wiggly_curve(x):
+            return 0.5 * np.sin(300 * x)
+        distances = [0.5, 2]
+
+        # EXECUTE
+        projected_x, projected_y = project_along_curve(wiggly_curve, 0, distances, max_step=0.001)
+
+        # VERIFY
+        np.testing.assert_allclose(projected_y, wiggly_curve(projected_x))
+        arc_lengths = [quad(lambda x: np.sqrt(1 + (150 * np.cos(300 * x)) ** 2), 0, end_x, limit=2000)[0]
+                       for end_x in projected_x]
+        np.testing.assert_allclose(arc_lengths, distances, atol=1e-3)
@@ -1,6 +1,6 @@
-import time
 import unittest
 from person_detection.person_predictor.linear_predictor import LinearPredictor
+from utils.clock import SimulatedClock
 from utils.person_state import PersonState
 
 
@@ -13,7 +13,9 @@ ten_second_intervals = [10, 20, 30, 40, 50, 60]
 class TestLinearPredictor(unittest.TestCase):
     # Before every test, reset the LinearPredictor object that will be tested.
     def setUp(self):
-        self.linear_predictor = LinearPredictor()
+        # Timestamps come from a simulated clock, so the tests can "wait" without actually sleeping.
+        self.clock = SimulatedClock()
+        self.linear_predictor = LinearPredictor(clock=self.clock)
 
     def test_one_state_given(self):
         # SETUP
@@ -31,8 +33,8 @@ class TestLinearPredictor(unittest.TestCase):
     def test_two_states_given(self):
         # SETUP
         self.linear_predictor.add_person_state(origin_person_state)
-        # Wait 1 seconds to give a chance to predict velocity.
-        time.sleep(1)
+        # Let 1 second pass to give a chance to predict velocity.
+        self.clock.advance(1)
         self.linear_predictor.add_person_state(x10_person_state)
 
         # EXECUTE
@@ -41,13 +43,11 @@ class TestLinearPredictor(unittest.TestCase):
         # VERIFY
         # Given two states, should be able to project out into the future along the x axis
         assert len(predicted_states) == len(ten_second_intervals)
-        prev_x = 0
-        for predicted_state in predicted_states:
-            # Because the above sleep isn't exact, this test is a bit loose and just says that at least
-            # the prediction should be heading along the x axis in the positive direction.
-            assert predicted_state.x > prev_x
+        # The person moved 10 in 1 second, and the simulated clock hasn't moved since, so the predictions
+        # are exact.
+        for predicted_state, time_delta in zip(predicted_states, ten_second_intervals):
+            assert abs(predicted_state.x - (10 + 10 * time_delta)) < 1e-9
             assert predicted_state.y == 0
-            prev_x = predicted_state.x
 
 
 if __name__ == '__main__':
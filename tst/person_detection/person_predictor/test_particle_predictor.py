@@ -0,0 +1,68 @@
+import numpy as np
+import time
+import unittest
+from person_detection.person_predictor.particle_predictor import ParticlePredictor
+from utils.person_state import PersonState
+
+second_intervals = [1, 2, 3]
+
+
+class TestParticlePredictor(unittest.TestCase):
+    def setUp(self):
+        self.particle_predictor = ParticlePredictor(num_particles=1000, random_seed=0)
+
+    # Feeds the predictor the given (x, y) positions, dt seconds apart, ending now.
+    def add_positions(self, positions, dt=0.5):
+        start_time = time.time() - (len(positions) - 1) * dt
+        for i, (x, y) in enumerate(positions):
+            self.particle_predictor.add_person_state(PersonState(x, y), timestamp=start_time + i * dt)
+
+    # Test that someone walking in a straight line is predicted to keep walking, with growing uncertainty.
+    def test_constant_velocity(self):
+        # SETUP
+        self.add_positions([(0.5 * i, 0) for i in range(16)])
+
+        # EXECUTE
+        predicted_states = self.particle_predictor.predict_next_person_state(second_intervals)
+
+        # VERIFY
+        assert len(predicted_states) == len(second_intervals)
+        for time_delta, predicted_state in zip(second_intervals, predicted_states):
+            assert abs(predicted_state.x - (7.5 + time_delta)) < 0.5 * time_delta
+            assert abs(predicted_state.y) < 0.5 * time_delta
+        variances = [np.trace(predicted_state.covariance) for predicted_state in predicted_states]
+        assert variances[0] < variances[1] < variances[2]
+
+    # Test that someone standing still is predicted to stay put, and recognized as standing still.
+    def test_still(self):
+        # SETUP
+        self.add_positions([(2, 3)] * 16)
+
+        # EXECUTE
+        predicted_states = self.particle_predictor.predict_next_person_state(second_intervals)
+
+        # VERIFY
+        for predicted_state in predicted_states:
+            assert abs(predicted_state.x - 2) < 0.5
+            assert abs(predicted_state.y - 3) < 0.5
+        model_probabilities = self.particle_predictor.get_model_probabilities()
+        assert np.argmax(model_probabilities) == ParticlePredictor.STILL
+
+    # Test that when the person jumps somewhere far away, the filter starts over there instead of collapsing
+    # onto whichever particle happened to be closest.
+    def test_jump_reinitializes(self):
+        # SETUP
+        self.add_positions([(0, 0)] * 10 + [(20, 20)])
+
+        # EXECUTE
+        predicted_states = self.particle_predictor.predict_next_person_state([0])
+
+        # VERIFY
+        assert abs(predicted_states[0].x - 20) < 0.5
+        assert abs(predicted_states[0].y - 20) < 0.5
+        # Particles are spread around the new position again, rather than all copies of one particle.
+        assert len(np.unique(self.particle_predictor.x)) > self.particle_predictor.num_particles / 2
+
+    # Test that predicting without any data fails the same way the other predictors do.
+    def test_no_data(self):
+        assert self.particle_predictor.predict_next_person_state(second_intervals) is None
@@ -0,0 +1,51 @@
+import numpy as np
+import unittest
+from person_detection.person_predictor.person_state_history import PersonStateHistory
+from utils.person_state import PersonState
+
+
+class TestPersonStateHistory(unittest.TestCase):
+    # Test that once full, the oldest states are pushed out and the rest stay in order.
+    def test_wraps_around_in_order(self):
+        # SETUP
+        history = PersonStateHistory(3)
+
+        # EXECUTE
+        for i in range(5):
+            history.append(PersonState(i, 10 * i), timestamp=100 + i)
+
+        # VERIFY
+        assert len(history) == 3
+        np.testing.assert_array_equal(history.get_times(), [102, 103, 104])
+        np.testing.assert_array_equal(history.get_x(), [2, 3, 4])
+        np.testing.assert_array_equal(history.get_y(), [20, 30, 40])
+        assert history.get_oldest() == (PersonState(2, 20), 102)
+        assert history.get_newest() == (PersonState(4, 40), 104)
+
+    # Test that the ordered views share memory with the history instead of being copies.
+    def test_views_are_zero_copy(self):
+        # SETUP
+        history = PersonStateHistory(4)
+        for i in range(6):
+            history.append(PersonState(i, 0), timestamp=i)
+
+        # EXECUTE
+        x = history.get_x()
+
+        # VERIFY
+        assert np.shares_memory(x, history.x)
+        assert x.flags['C_CONTIGUOUS']
+
+    # Test replacing the newest state, and the distance covered through every state.
+    def test_replace_newest_and_distance(self):
+        # SETUP
+        history = PersonStateHistory(3)
+        history.append(PersonState(0, 0), timestamp=0)
+        history.append(PersonState(3, 0), timestamp=1)
+
+        # EXECUTE
+        history.replace_newest(PersonState(3, 4), timestamp=1)
+
+        # VERIFY
+        assert len(history) == 2
+        assert history.get_distance_covered() == 5
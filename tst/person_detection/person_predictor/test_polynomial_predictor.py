@@ -1,6 +1,7 @@
-import time
+import numpy as np
 import unittest
 from person_detection.person_predictor.polynomial_predictor import PolynomialPredictor
+from utils.clock import SimulatedClock
 from utils.person_state import PersonState
 
 
@@ -12,7 +13,9 @@ second_intervals = [1, 2, 3, 4, 5, 6]
 class TestPolynomialPredictor(unittest.TestCase):
     # Before every test, reset the PolynomialPredictor object that will be tested.
     def setUp(self):
-        self.polynomial_predictor = PolynomialPredictor()
+        # Timestamps come from a simulated clock, so the tests can "wait" without actually sleeping.
+        self.clock = SimulatedClock()
+        self.polynomial_predictor = PolynomialPredictor(clock=self.clock)
 
     def test_one_state_given(self):
         # SETUP
@@ -31,9 +34,9 @@ class TestPolynomialPredictor(unittest.TestCase):
         # SETUP
         # Feed in states that match a parabola going through (-1, 1), (0, 0) and (1, 1)
         self.polynomial_predictor.add_person_state(PersonState(-1, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.polynomial_predictor.add_person_state(origin_person_state)
-        time.sleep(1)
+        self.clock.advance(1)
         self.polynomial_predictor.add_person_state(PersonState(1, 1))
 
         # EXECUTE
@@ -57,16 +60,16 @@ class TestPolynomialPredictor(unittest.TestCase):
     def test_cubic(self):
         # SETUP
         # Make it a cubic predictor
-        self.polynomial_predictor = PolynomialPredictor(num_states_to_track=5, poly_degree=3)
+        self.polynomial_predictor = PolynomialPredictor(num_states_to_track=5, poly_degree=3, clock=self.clock)
         # Feed in states that match a parabola going through (-1, 1), (0, 0), (1, 1), (2, 1), (3, 1)
         self.polynomial_predictor.add_person_state(PersonState(-1, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.polynomial_predictor.add_person_state(origin_person_state)
-        time.sleep(1)
+        self.clock.advance(1)
         self.polynomial_predictor.add_person_state(PersonState(1, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.polynomial_predictor.add_person_state(PersonState(2, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.polynomial_predictor.add_person_state(PersonState(3, 1))
 
         # EXECUTE
@@ -89,17 +92,18 @@ class TestPolynomialPredictor(unittest.TestCase):
     def test_weights(self):
         # SETUP
         # Override the weight factor for the weighted polynomial predictor (but keep self.pp unchanged)
-        weighted_polynomial_predictor = PolynomialPredictor(num_states_to_track=4, poly_degree=2, weight_decay_factor=4)
+        weighted_polynomial_predictor = PolynomialPredictor(num_states_to_track=4, poly_degree=2, weight_decay_factor=4,
+                                                            clock=self.clock)
         # Feed in states that match a parabola going through (-1, 1), (0, 0), (1, 1), (2, 0)
         self.polynomial_predictor.add_person_state(PersonState(-1, 1))
         weighted_polynomial_predictor.add_person_state(PersonState(-1, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.polynomial_predictor.add_person_state(origin_person_state)
         weighted_polynomial_predictor.add_person_state(origin_person_state)
-        time.sleep(1)
+        self.clock.advance(1)
         self.polynomial_predictor.add_person_state(PersonState(1, 1))
         weighted_polynomial_predictor.add_person_state(PersonState(1, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.polynomial_predictor.add_person_state(PersonState(2, 0))
         weighted_polynomial_predictor.add_person_state(PersonState(2, 0))
 
@@ -131,6 +135,47 @@ class TestPolynomialPredictor(unittest.TestCase):
         self.polynomial_predictor.plot_projections(predicted_states)
         weighted_polynomial_predictor.plot_projections(weighted_predicted_states)
 
+    # Test that the incrementally updated fit matches a weighted fit from scratch on the states in the window,
+    # including after old states have been pushed out and after the normal equations have been rebuilt.
+    def test_incremental_fit_matches_weighted_polyfit(self):
+        random_state = np.random.RandomState(0)
+        for refit_interval in [1000, 3]:
+            # SETUP
+            weighted_polynomial_predictor = PolynomialPredictor(num_states_to_track=5, poly_degree=2,
+                                                                weight_decay_factor=1.5, refit_interval=refit_interval,
+                                                                clock=self.clock)
+            x_data = random_state.uniform(-3, 3, 20)
+            y_data = random_state.uniform(-3, 3, 20)
+
+            # EXECUTE
+            for x, y in zip(x_data, y_data):
+                weighted_polynomial_predictor.add_person_state(PersonState(x, y))
+
+            # VERIFY
+            # polyfit weights multiply the residuals, so they're the square roots of the per-state weights.
+            expected_coeffs = np.polyfit(x_data[-5:], y_data[-5:], 2, w=np.sqrt(1.5 ** np.arange(5)))
+            np.testing.assert_allclose(weighted_polynomial_predictor.poly.coeffs, expected_coeffs, atol=1e-9)
+
+    # Test that the fit stays accurate for a person walking far from the origin, where raw powers of x are
+    # badly conditioned.
+    def test_far_from_origin_matches_polyfit(self):
+        random_state = np.random.RandomState(0)
+        for refit_interval in [1000, 1]:
+            # SETUP
+            polynomial_predictor = PolynomialPredictor(num_states_to_track=10, poly_degree=3,
+                                                       refit_interval=refit_interval, clock=self.clock)
+            x_data = 10 + 0.1 * np.arange(100) + random_state.uniform(-0.02, 0.02, 100)
+            y_data = 0.05 * (x_data - 12) ** 3 - (x_data - 12) + random_state.uniform(-0.05, 0.05, 100)
+
+            for i, (x, y) in enumerate(zip(x_data, y_data)):
+                # EXECUTE
+                polynomial_predictor.add_person_state(PersonState(x, y))
+
+                # VERIFY
+                if i >= 9:
+                    expected_poly = np.poly1d(np.polyfit(x_data[i - 9:i + 1], y_data[i - 9:i + 1], 3))
+                    assert abs(polynomial_predictor.poly(x + 1) - expected_poly(x + 1)) < 1e-6
+
 
 if __name__ == '__main__':
     unittest.main()
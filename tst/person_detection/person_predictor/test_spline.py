@@ -1,6 +1,6 @@
-import time
 import unittest
 from person_detection.person_predictor.spline_predictor import SplinePredictor
+from utils.clock import SimulatedClock
 from utils.person_state import PersonState
 
 # Define a few helpful variables common across a few tests
@@ -11,7 +11,9 @@ second_intervals = [1, 2, 3, 4, 5, 6]
 class TestSpline(unittest.TestCase):
     # Before every test, reset the SplinePredictor object that will be tested.
     def setUp(self):
-        self.spline_predictor = SplinePredictor(bc_type='natural', extrapolation_type=None)
+        # Timestamps come from a simulated clock, so the tests can "wait" without actually sleeping.
+        self.clock = SimulatedClock()
+        self.spline_predictor = SplinePredictor(bc_type='natural', extrapolation_type=None, clock=self.clock)
 
     def test_one_state_given(self):
         # SETUP
@@ -29,16 +31,16 @@ class TestSpline(unittest.TestCase):
     def test_cubic_standard(self):
         # SETUP
         # All default (not-a-knot and normal extrapolation based on last interval)
-        self.spline_predictor = SplinePredictor()
+        self.spline_predictor = SplinePredictor(clock=self.clock)
         # Feed in states going through (-1, 1), (0, 0), (1, 1), (2, 1), (3, 1)
         self.spline_predictor.add_person_state(PersonState(-1, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.spline_predictor.add_person_state(origin_person_state)
-        time.sleep(1)
+        self.clock.advance(1)
         self.spline_predictor.add_person_state(PersonState(1, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.spline_predictor.add_person_state(PersonState(2, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.spline_predictor.add_person_state(PersonState(3, 1))
 
         # EXECUTE
@@ -57,16 +59,16 @@ class TestSpline(unittest.TestCase):
 
     def test_cubic_natural_end_points(self):
         # SETUP
-        self.spline_predictor = SplinePredictor(bc_type='natural')
+        self.spline_predictor = SplinePredictor(bc_type='natural', clock=self.clock)
         # Feed in states going through (-1, 1), (0, 0), (1, 1), (2, 1), (3, 1)
         self.spline_predictor.add_person_state(PersonState(-1, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.spline_predictor.add_person_state(origin_person_state)
-        time.sleep(1)
+        self.clock.advance(1)
         self.spline_predictor.add_person_state(PersonState(1, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.spline_predictor.add_person_state(PersonState(2, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.spline_predictor.add_person_state(PersonState(3, 1))
 
         # EXECUTE
@@ -86,16 +88,16 @@ class TestSpline(unittest.TestCase):
     # Use periodic extrapolation. Almost certainly dumb.
     def test_cubic_periodic_extrapolation(self):
         # SETUP
-        self.spline_predictor = SplinePredictor(bc_type='natural', extrapolation_type='periodic')
+        self.spline_predictor = SplinePredictor(bc_type='natural', extrapolation_type='periodic', clock=self.clock)
         # Feed in states going through (-1, 1), (0, 0), (1, 1), (2, 1), (3, 1)
         self.spline_predictor.add_person_state(PersonState(-1, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.spline_predictor.add_person_state(origin_person_state)
-        time.sleep(1)
+        self.clock.advance(1)
         self.spline_predictor.add_person_state(PersonState(1, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.spline_predictor.add_person_state(PersonState(2, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.spline_predictor.add_person_state(PersonState(3, 1))
 
         # EXECUTE
@@ -114,20 +116,20 @@ class TestSpline(unittest.TestCase):
 
     def test_cubic_many_datapoints(self):
         # SETUP
-        self.spline_predictor = SplinePredictor(num_states_to_track=100, bc_type='natural')
+        self.spline_predictor = SplinePredictor(num_states_to_track=100, bc_type='natural', clock=self.clock)
         # Feed in tons of states.
         self.spline_predictor.add_person_state(PersonState(-1, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.spline_predictor.add_person_state(origin_person_state)
-        time.sleep(1)
+        self.clock.advance(1)
         self.spline_predictor.add_person_state(PersonState(1, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.spline_predictor.add_person_state(PersonState(2, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.spline_predictor.add_person_state(PersonState(3, 1))
-        time.sleep(1)
+        self.clock.advance(1)
         self.spline_predictor.add_person_state(PersonState(4, 2))
-        time.sleep(1)
+        self.clock.advance(1)
         self.spline_predictor.add_person_state(PersonState(5, 1))
 
         # EXECUTE
@@ -0,0 +1,59 @@
+import time
+import unittest
+from person_detection.person_predictor.time_polynomial_predictor import TimePolynomialPredictor
+from person_detection.person_predictor.time_spline_predictor import TimeSplinePredictor
+from utils.person_state import PersonState
+
+second_intervals = [1, 2, 3]
+
+
+class TestTimePredictors(unittest.TestCase):
+    def setUp(self):
+        self.predictors = [TimePolynomialPredictor(), TimeSplinePredictor()]
+
+    # Feeds every predictor the given (x, y) positions, one second apart, ending now.
+    def add_positions(self, positions):
+        start_time = time.time() - (len(positions) - 1)
+        for i, (x, y) in enumerate(positions):
+            for predictor in self.predictors:
+                predictor.add_person_state(PersonState(x, y), timestamp=start_time + i)
+
+    # Test that someone walking along the y axis, which a y(x) fit can't represent, is predicted correctly.
+    def test_walking_along_y_axis(self):
+        # SETUP
+        self.add_positions([(0, 0), (0, 1), (0, 2), (0, 3)])
+
+        for predictor in self.predictors:
+            # EXECUTE
+            predicted_states = predictor.predict_next_person_state(second_intervals)
+
+            # VERIFY
+            for time_delta, predicted_state in zip(second_intervals, predicted_states):
+                assert abs(predicted_state.x) < 0.05
+                assert abs(predicted_state.y - (3 + time_delta)) < 0.05
+
+    # Test that someone walking towards decreasing x is predicted correctly.
+    def test_walking_backwards(self):
+        # SETUP
+        self.add_positions([(3, 1), (2, 1), (1, 1), (0, 1)])
+
+        for predictor in self.predictors:
+            # EXECUTE
+            predicted_states = predictor.predict_next_person_state(second_intervals)
+
+            # VERIFY
+            for time_delta, predicted_state in zip(second_intervals, predicted_states):
+                assert abs(predicted_state.x + time_delta) < 0.05
+                assert abs(predicted_state.y - 1) < 0.05
+
+    # Test that a single state predicts staying in the same place.
+    def test_one_state_given(self):
+        # SETUP
+        self.add_positions([(1, 2)])
+
+        for predictor in self.predictors:
+            # EXECUTE
+            predicted_states = predictor.predict_next_person_state(second_intervals)
+
+            # VERIFY
+            assert predicted_states == [PersonState(1, 2)] * len(second_intervals)
@@ -0,0 +1,52 @@
+import numpy as np
+import unittest
+from person_detection.detection_annotator import DetectionAnnotator, DETECTION_COLOR, TARGET_COLOR
+from utils.bounding_box import BoundingBox
+
+
+# Stand-in for a VideoWriter that keeps the frames it's given.
+class FakeVideoWriter:
+    def __init__(self):
+        self.frames = []
+
+    def write(self, image):
+        self.frames.append(image)
+
+
+class TestDetectionAnnotator(unittest.TestCase):
+    # Test that detections and the target are drawn on a copy, leaving the caller's image untouched.
+    def test_annotates_copy(self):
+        # SETUP
+        video_writer = FakeVideoWriter()
+        annotator = DetectionAnnotator(video_writer=video_writer)
+        image = np.zeros((100, 100, 3), dtype=np.uint8)
+        detection = BoundingBox((20, 20), (30, 50), score=0.8)
+        target = BoundingBox((20, 20), (70, 50))
+        annotator.start()
+
+        # EXECUTE
+        annotator.submit(image, [detection], target_bb=target)
+        annotator.stop()
+
+        # VERIFY
+        assert not image.any()
+        assert len(video_writer.frames) == 1
+        annotated_image = video_writer.frames[0]
+        # Bottom edges of the boxes, away from the labels.
+        assert tuple(annotated_image[60, 30]) == DETECTION_COLOR
+        assert tuple(annotated_image[60, 70]) == TARGET_COLOR
+
+    # Test that a frame with no detections still makes it into the video.
+    def test_no_detections(self):
+        # SETUP
+        video_writer = FakeVideoWriter()
+        annotator = DetectionAnnotator(video_writer=video_writer)
+        annotator.start()
+
+        # EXECUTE
+        annotator.submit(np.zeros((10, 10, 3), dtype=np.uint8), None)
+        annotator.stop()
+
+        # VERIFY
+        assert len(video_writer.frames) == 1
+        assert not video_writer.frames[0].any()
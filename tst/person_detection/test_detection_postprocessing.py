@@ -0,0 +1,95 @@
+import unittest
+import numpy as np
+from person_detection.detection_postprocessing import create_bbs_from_detections, non_max_suppression, \
+    PERSON_CLASS_ID
+
+# Define a few helpful variables common across a few tests
+# Images from the mambo are 640 pixels across and 360 pixels high.
+image_shape = (360, 640, 3)
+dog_class_id = 18
+
+
+class TestDetectionPostprocessing(unittest.TestCase):
+    # Test that every person above the threshold is returned, in pixel coordinates, sorted by score.
+    def test_returns_all_people(self):
+        # SETUP
+        boxes = np.array([[0.0, 0.0, 0.5, 0.5],
+                          [0.5, 0.5, 1.0, 1.0],
+                          [0.0, 0.5, 0.5, 1.0]])
+        scores = np.array([0.6, 0.9, 0.3])
+        classes = np.array([PERSON_CLASS_ID, PERSON_CLASS_ID, PERSON_CLASS_ID])
+
+        # EXECUTE
+        bbs = create_bbs_from_detections(boxes, scores, classes, image_shape, detect_thresh=0.5)
+
+        # VERIFY
+        assert len(bbs) == 2
+        assert bbs[0].get_centroid() == (480, 270)
+        assert bbs[0].get_dimensions() == (320, 180)
+        assert abs(bbs[0].get_score() - 0.9) < 1e-6
+        assert bbs[1].get_centroid() == (160, 90)
+
+    # Test that detections of other classes are ignored even if they have high scores.
+    def test_ignores_other_classes(self):
+        # SETUP
+        boxes = np.array([[0.0, 0.0, 0.5, 0.5],
+                          [0.5, 0.5, 1.0, 1.0]])
+        scores = np.array([0.99, 0.6])
+        classes = np.array([dog_class_id, PERSON_CLASS_ID])
+
+        # EXECUTE
+        bbs = create_bbs_from_detections(boxes, scores, classes, image_shape)
+
+        # VERIFY
+        assert len(bbs) == 1
+        assert bbs[0].get_centroid() == (480, 270)
+
+    # Test that nothing is returned when nothing is above the threshold.
+    def test_no_detections(self):
+        # EXECUTE
+        bbs = create_bbs_from_detections(np.zeros((100, 4)), np.zeros(100), np.ones(100), image_shape)
+
+        # VERIFY
+        assert bbs == []
+
+    # Test that overlapping boxes are suppressed, and that the top-K cap is respected.
+    def test_nms_and_max_detections(self):
+        # SETUP
+        boxes = np.array([[0.0, 0.0, 0.5, 0.5],
+                          [0.01, 0.01, 0.51, 0.51],  # Almost the same as the first box
+                          [0.5, 0.5, 1.0, 1.0],
+                          [0.0, 0.5, 0.5, 1.0]])
+        scores = np.array([0.9, 0.8, 0.7, 0.6])
+        classes = np.full(4, PERSON_CLASS_ID)
+
+        # EXECUTE
+        suppressed_bbs = create_bbs_from_detections(boxes, scores, classes, image_shape, nms_thresh=0.5)
+        capped_bbs = create_bbs_from_detections(boxes, scores, classes, image_shape, nms_thresh=0.5,
+                                                max_detections=2)
+
+        # VERIFY
+        assert len(suppressed_bbs) == 3
+        assert [bb.get_score() for bb in suppressed_bbs] == sorted([bb.get_score() for bb in suppressed_bbs],
+                                                                    reverse=True)
+        assert len(capped_bbs) == 2
+        assert capped_bbs[0] == suppressed_bbs[0]
+        assert capped_bbs[1] == suppressed_bbs[1]
+
+    # Test that boxes of different classes don't suppress each other.
+    def test_nms_is_class_aware(self):
+        # SETUP
+        corners = np.array([[0, 0, 10, 10],
+                            [0, 0, 10, 10]])
+        scores = np.array([0.9, 0.8])
+
+        # EXECUTE
+        same_class_keep = non_max_suppression(corners, scores, 0.5, class_ids=np.array([1, 1]))
+        different_class_keep = non_max_suppression(corners, scores, 0.5, class_ids=np.array([1, 2]))
+
+        # VERIFY
+        assert list(same_class_keep) == [0]
+        assert list(different_class_keep) == [0, 1]
+
+
+if __name__ == '__main__':
+    unittest.main()
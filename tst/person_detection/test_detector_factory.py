@@ -0,0 +1,43 @@
+import numpy as np
+import unittest
+from person_detection.detector_abc import Detector
+from person_detection.detector_factory import create_detector
+from person_detection.opencv_dnn_detector import OpenCVDNNDetector
+
+
+class TestDetectorFactory(unittest.TestCase):
+    # Test that asking for a backend that doesn't exist fails clearly.
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_detector('not_a_backend')
+
+    # Test that detectors must implement detect.
+    def test_detector_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Detector()
+
+
+class TestOpenCVDNNDetector(unittest.TestCase):
+    # Test that DetectionOutput rows are turned into person BoundingBoxes in pixel coordinates.
+    def test_create_bbs_from_dnn_output(self):
+        # SETUP
+        # Skip loading a network, which this test doesn't need.
+        detector = OpenCVDNNDetector.__new__(OpenCVDNNDetector)
+        detector.detect_thresh = 0.5
+        detector.nms_thresh = None
+        detector.max_detections = None
+        # [batch index, class id, score, xmin, ymin, xmax, ymax]
+        detections = np.array([[[[0, 1, 0.6, 0.0, 0.0, 0.5, 0.5],
+                                 [0, 1, 0.9, 0.5, 0.5, 1.0, 1.0],
+                                 [0, 3, 0.9, 0.0, 0.0, 1.0, 1.0],
+                                 [0, 1, 0.2, 0.0, 0.0, 1.0, 1.0]]]])
+
+        # EXECUTE
+        bbs = detector.create_bbs_from_dnn_output(detections, (100, 200, 3))
+
+        # VERIFY
+        assert len(bbs) == 2
+        assert bbs[0].get_dimensions() == (100, 50)
+        assert bbs[0].get_centroid() == (150, 75)
+        assert abs(bbs[0].get_score() - 0.9) < 1e-9
+        assert bbs[1].get_centroid() == (50, 25)
@@ -0,0 +1,98 @@
+import threading
+import unittest
+import numpy as np
+from person_detection.frame_grabber import FrameGrabber
+
+
+# Stand-in for pyparrot's DroneVision that lets the test decide when frames arrive.
+class FakeDroneVision:
+    def __init__(self):
+        self.callback = None
+        self.picture = None
+        self.is_open = False
+
+    def set_user_callback_function(self, user_callback_function=None, user_callback_args=None):
+        self.callback = user_callback_function
+
+    def open_video(self):
+        self.is_open = True
+        return True
+
+    def close_video(self):
+        self.is_open = False
+
+    def get_latest_valid_picture(self):
+        return self.picture
+
+    # Pretend a new frame was buffered, which triggers the user callback.
+    def push_frame(self, picture):
+        self.picture = picture
+        self.callback(None)
+
+
+class TestFrameGrabber(unittest.TestCase):
+    # Before every test, reset the FrameGrabber object that will be tested.
+    def setUp(self):
+        self.drone_vision = FakeDroneVision()
+        self.frame_grabber = FrameGrabber(None, drone_vision=self.drone_vision)
+        self.frame_grabber.start()
+
+    def tearDown(self):
+        self.frame_grabber.stop()
+
+    # Test that only the newest frame is kept, and that sequence numbers count every frame.
+    def test_latest_keeps_newest_frame(self):
+        # SETUP
+        assert self.frame_grabber.latest() is None
+        first_image = np.zeros((2, 2, 3), dtype=np.uint8)
+        second_image = np.ones((2, 2, 3), dtype=np.uint8)
+
+        # EXECUTE
+        self.drone_vision.push_frame(first_image)
+        self.drone_vision.push_frame(second_image)
+
+        # VERIFY
+        latest_frame = self.frame_grabber.latest()
+        assert latest_frame.image is second_image
+        assert latest_frame.sequence_number == 2
+        assert latest_frame.timestamp > 0
+
+    # Test that next_frame waits for a frame newer than the one already in the slot.
+    def test_next_frame_waits_for_new_frame(self):
+        # SETUP
+        self.drone_vision.push_frame(np.zeros((2, 2, 3), dtype=np.uint8))
+        new_image = np.ones((2, 2, 3), dtype=np.uint8)
+        pusher = threading.Timer(0.05, self.drone_vision.push_frame, args=(new_image,))
+
+        # EXECUTE
+        pusher.start()
+        next_frame = self.frame_grabber.next_frame(timeout=5)
+        pusher.join()
+
+        # VERIFY
+        assert next_frame.image is new_image
+        assert next_frame.sequence_number == 2
+
+    # Test that next_frame gives up after the timeout if no frame arrives.
+    def test_next_frame_times_out(self):
+        # EXECUTE
+        next_frame = self.frame_grabber.next_frame(timeout=0.01)
+
+        # VERIFY
+        assert next_frame is None
+
+    # Test that a frame that already arrived is returned immediately when asked for by sequence number.
+    def test_next_frame_after_sequence_number(self):
+        # SETUP
+        image = np.zeros((2, 2, 3), dtype=np.uint8)
+        self.drone_vision.push_frame(image)
+
+        # EXECUTE
+        next_frame = self.frame_grabber.next_frame(timeout=0.01, after_sequence_number=0)
+
+        # VERIFY
+        assert next_frame.image is image
+
+
+if __name__ == '__main__':
+    unittest.main()
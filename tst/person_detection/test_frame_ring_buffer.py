@@ -0,0 +1,99 @@
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+import cv2
+from person_detection.frame_disk_sink import FrameDiskSink
+from person_detection.frame_ring_buffer import FrameRingBuffer
+
+
+class TestFrameRingBuffer(unittest.TestCase):
+    # Test that slots are reused rather than reallocated, and that overwritten frames can't be fetched.
+    def test_slots_are_reused(self):
+        # SETUP
+        ring_buffer = FrameRingBuffer(capacity=2)
+
+        # EXECUTE
+        first_slot = ring_buffer.put(np.full((2, 3, 3), 1, np.uint8), sequence_number=1)
+        ring_buffer.put(np.full((2, 3, 3), 2, np.uint8), sequence_number=2)
+        third_slot = ring_buffer.put(np.full((2, 3, 3), 3, np.uint8), sequence_number=3)
+
+        # VERIFY
+        assert ring_buffer.frames.shape == (2, 2, 3, 3)
+        assert np.shares_memory(first_slot, third_slot)
+        assert ring_buffer.get(1) is None
+        assert ring_buffer.get(2)[0, 0, 0] == 2
+        assert ring_buffer.get(3)[0, 0, 0] == 3
+
+    # Test that frames of a different shape are rejected.
+    def test_rejects_mismatched_shape(self):
+        # SETUP
+        ring_buffer = FrameRingBuffer(capacity=2, frame_shape=(2, 3, 3))
+
+        # EXECUTE & VERIFY
+        with self.assertRaises(ValueError):
+            ring_buffer.put(np.zeros((3, 3, 3), np.uint8), sequence_number=1)
+
+
+class TestFrameDiskSink(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.ring_buffer = FrameRingBuffer(capacity=8)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # Test that submitted frames end up on disk in every format.
+    def test_saves_frames(self):
+        for image_format, read in [(FrameDiskSink.PNG, cv2.imread), (FrameDiskSink.RAW, np.load)]:
+            # SETUP
+            sink = FrameDiskSink(self.ring_buffer, directory=self.directory, image_format=image_format,
+                                 drop_policy=FrameDiskSink.BLOCK)
+            sink.start()
+
+            # EXECUTE
+            for i in range(3):
+                self.ring_buffer.put(np.full((4, 4, 3), 10 * i, np.uint8), sequence_number=i)
+                sink.submit(i)
+            sink.stop()
+
+            # VERIFY
+            assert sink.num_saved == 3
+            assert read(sink.get_filepath(2))[0, 0, 0] == 20
+
+    # Test that when the disk falls behind, the oldest pending frames are dropped and the newest are kept.
+    def test_drop_oldest(self):
+        # SETUP
+        sink = FrameDiskSink(self.ring_buffer, directory=self.directory, max_pending=2)
+
+        # EXECUTE
+        # The worker isn't started yet, so nothing is written while frames are submitted.
+        for i in range(5):
+            self.ring_buffer.put(np.full((4, 4, 3), i, np.uint8), sequence_number=i)
+            sink.submit(i)
+        sink.start()
+        sink.stop()
+
+        # VERIFY
+        assert sink.num_dropped == 3
+        assert sink.num_saved == 2
+        assert cv2.imread(sink.get_filepath(0))[0, 0, 0] == 3
+        assert not os.path.exists(sink.get_filepath(2))
+
+    # Test that frames overwritten in the ring buffer before being saved are skipped.
+    def test_skips_overwritten_frames(self):
+        # SETUP
+        ring_buffer = FrameRingBuffer(capacity=1)
+        sink = FrameDiskSink(ring_buffer, directory=self.directory, max_pending=4)
+
+        # EXECUTE
+        for i in range(2):
+            ring_buffer.put(np.full((4, 4, 3), i, np.uint8), sequence_number=i)
+            sink.submit(i)
+        sink.start()
+        sink.stop()
+
+        # VERIFY
+        assert sink.num_lost == 1
+        assert sink.num_saved == 1
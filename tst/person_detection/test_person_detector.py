@@ -0,0 +1,59 @@
+import cv2
+import numpy as np
+import os
+import unittest
+from person_detection.person_detector import PersonDetector
+
+TEST_IMAGE_FILEPATH = os.path.join(os.path.dirname(__file__), '../../data/drone_camera_test1.png')
+# Has people in it that the HOG detector finds at full size.
+PEOPLE_IMAGE_FILEPATH = os.path.join(os.path.dirname(__file__), '../../data/sertac.jpg')
+
+
+class TestPersonDetector(unittest.TestCase):
+    # Test that the number of threads only changes how fast OpenCV searches, not what it finds.
+    @unittest.skipUnless(hasattr(cv2, 'HOGDescriptor'), "This OpenCV build has no HOG detector.")
+    def test_num_threads(self):
+        # SETUP
+        image = cv2.imread(PEOPLE_IMAGE_FILEPATH)
+        original_num_threads = cv2.getNumThreads()
+
+        try:
+            # EXECUTE
+            with PersonDetector(preset='balanced', max_width=image.shape[1], num_threads=1) as serial_detector:
+                serial_bbs = serial_detector.detect(image)
+                serial_num_threads = cv2.getNumThreads()
+            with PersonDetector(preset='balanced', max_width=image.shape[1], num_threads=4) as parallel_detector:
+                parallel_bbs = parallel_detector.detect(image)
+        finally:
+            cv2.setNumThreads(original_num_threads)
+
+        # VERIFY
+        assert serial_num_threads == 1
+        assert len(serial_bbs) > 0
+        assert len(parallel_bbs) == len(serial_bbs)
+        for serial_bb, parallel_bb in zip(serial_bbs, parallel_bbs):
+            assert parallel_bb.get_dimensions() == serial_bb.get_dimensions()
+            assert parallel_bb.get_centroid() == serial_bb.get_centroid()
+            assert abs(parallel_bb.get_score() - serial_bb.get_score()) < 1e-6
+
+    # Test that an unknown preset is rejected.
+    def test_unknown_preset(self):
+        with self.assertRaises(ValueError):
+            PersonDetector(preset='not_a_preset')
+
+    # Test that detection works in memory, with any number of threads, and leaves the image untouched.
+    @unittest.skipUnless(hasattr(cv2, 'HOGDescriptor'), "This OpenCV build has no HOG detector.")
+    def test_detect(self):
+        # SETUP
+        image = cv2.imread(TEST_IMAGE_FILEPATH)
+        original_image = image.copy()
+
+        for num_threads in [None, 2]:
+            # EXECUTE
+            with PersonDetector(preset='fast', num_threads=num_threads) as person_detector:
+                bbs = person_detector.detect(image)
+
+            # VERIFY
+            assert np.array_equal(image, original_image)
+            for bb in bbs:
+                assert 0 <= bb.get_score() <= 1
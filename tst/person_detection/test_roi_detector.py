@@ -0,0 +1,100 @@
+import numpy as np
+import unittest
+from person_detection.roi_detector import ROIDetector
+from utils.bounding_box import BoundingBox
+
+
+# Stand-in for a detector that remembers the images it was given and finds a person in the middle of each.
+class CenterDetector:
+    def __init__(self):
+        self.image_shapes = []
+        self.find_person = True
+
+    def detect(self, image):
+        self.image_shapes.append(image.shape)
+        if not self.find_person:
+            return []
+        return [BoundingBox((10, 20), (image.shape[1] / 2.0, image.shape[0] / 2.0), score=0.9)]
+
+
+class TestROIDetector(unittest.TestCase):
+    def setUp(self):
+        self.detector = CenterDetector()
+        self.roi_detector = ROIDetector(self.detector, padding=0.5, min_roi_size=(40, 40), full_frame_interval=3)
+        self.image = np.zeros((360, 640, 3), dtype=np.uint8)
+
+    # Test that with a tracked person, only the window around them is searched, and boxes come back in
+    # full-frame coordinates.
+    def test_searches_window_around_tracked_person(self):
+        # SETUP
+        self.roi_detector.update_tracked_bb(BoundingBox((40, 80), (100, 200)))
+
+        # EXECUTE
+        bbs = self.roi_detector.detect(self.image)
+
+        # VERIFY
+        assert self.detector.image_shapes == [(160, 80, 3)]
+        assert bbs[0].get_centroid() == (100, 200)
+        assert bbs[0].get_dimensions() == (10, 20)
+        assert bbs[0].get_score() == 0.9
+
+    # Test that the window is kept inside the image when the person is at the edge.
+    def test_window_clipped_to_image(self):
+        # SETUP
+        self.roi_detector.update_tracked_bb(BoundingBox((40, 80), (630, 350)))
+
+        # EXECUTE
+        xmin, ymin, xmax, ymax = self.roi_detector.get_roi(self.image.shape)
+
+        # VERIFY
+        assert (xmin, ymin, xmax, ymax) == (560, 200, 640, 360)
+
+    # Test that the full frame is searched periodically, and when nobody is tracked.
+    def test_full_frame_every_interval(self):
+        # EXECUTE
+        self.roi_detector.detect(self.image)
+        self.roi_detector.update_tracked_bb(BoundingBox((40, 80), (100, 200)))
+        for _ in range(3):
+            self.roi_detector.detect(self.image)
+
+        # VERIFY
+        assert [shape[:2] for shape in self.detector.image_shapes] == [(360, 640), (160, 80), (160, 80), (360, 640)]
+
+    # Test that losing the person in the window falls back to searching the full frame straight away.
+    def test_full_frame_when_track_lost(self):
+        # SETUP
+        self.roi_detector.update_tracked_bb(BoundingBox((40, 80), (100, 200)))
+        self.detector.find_person = False
+
+        # EXECUTE
+        self.roi_detector.detect(self.image)
+
+        # VERIFY
+        assert [shape[:2] for shape in self.detector.image_shapes] == [(160, 80), (360, 640)]
+
+    # Test that inputs wider than max_input_width are downscaled, and boxes scaled back up.
+    def test_downscales_input(self):
+        # SETUP
+        roi_detector = ROIDetector(self.detector, max_input_width=320)
+
+        # EXECUTE
+        bbs = roi_detector.detect(self.image)
+
+        # VERIFY
+        assert self.detector.image_shapes == [(180, 320, 3)]
+        assert bbs[0].get_centroid() == (320, 180)
+        assert bbs[0].get_dimensions() == (20, 40)
+
+    # Test that full frames wider than 640 pixels are downscaled by default, and can still be kept at full size.
+    def test_downscales_input_by_default(self):
+        # SETUP
+        image = np.zeros((720, 1280, 3), dtype=np.uint8)
+        full_size_detector = CenterDetector()
+
+        # EXECUTE
+        ROIDetector(self.detector).detect(image)
+        ROIDetector(full_size_detector, max_input_width=None).detect(image)
+
+        # VERIFY
+        assert self.detector.image_shapes == [(360, 640, 3)]
+        assert full_size_detector.image_shapes == [(720, 1280, 3)]
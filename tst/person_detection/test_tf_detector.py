@@ -9,6 +9,10 @@ class TestTFDetector(unittest.TestCase):
         self.tf_detector = TFDetector(model_filepath='../../src/person_detection/ssdlite_mobilenet_v2_coco_2018_05_09/frozen_inference_graph.pb',
                                       label_filepath='../../src/person_detection/mscoco_label_map.pbtxt')
 
+    # After every test, release the TF session owned by the detector.
+    def tearDown(self):
+        self.tf_detector.close()
+
     # Test that if there is one person in the image a non-None bounding box is returned.
     def test_one_person(self):
         # SETUP
@@ -22,6 +26,50 @@ class TestTFDetector(unittest.TestCase):
         print("YAY")
         assert bb is not None
 
+    # Test that the same session is reused across frames, and that it can't be used once closed.
+    def test_session_reused_until_closed(self):
+        # SETUP
+        image = cv2.imread('../../data/drone_camera_test1.png')
+        sess = self.tf_detector.sess
+
+        # EXECUTE
+        self.tf_detector.detect_bounding_box(image)
+        self.tf_detector.detect_bounding_box(image)
+
+        # VERIFY
+        assert self.tf_detector.sess is sess
+        self.tf_detector.close()
+        assert self.tf_detector.sess is None
+        with self.assertRaises(RuntimeError):
+            self.tf_detector.detect_bounding_box(image)
+
+    # Test that running a batch gives the same answer as running each frame on its own.
+    def test_batch_matches_single_frames(self):
+        # SETUP
+        image = cv2.imread('../../data/drone_camera_test1.png')
+        single_bbs = self.tf_detector.detect_bounding_box(image)
+
+        # EXECUTE
+        batch_bbs = self.tf_detector.detect_bounding_boxes_batch([image, image, image])
+
+        # VERIFY
+        assert len(batch_bbs) == 3
+        for frame_bbs in batch_bbs:
+            assert len(frame_bbs) == len(single_bbs)
+            for batch_bb, single_bb in zip(frame_bbs, single_bbs):
+                assert abs(batch_bb.get_centroid()[0] - single_bb.get_centroid()[0]) < 1
+                assert abs(batch_bb.get_centroid()[1] - single_bb.get_centroid()[1]) < 1
+
+    # Test that frames of different sizes can't be batched together.
+    def test_batch_rejects_mismatched_shapes(self):
+        # SETUP
+        image = cv2.imread('../../data/drone_camera_test1.png')
+        smaller_image = cv2.resize(image, (image.shape[1] // 2, image.shape[0] // 2))
+
+        # EXECUTE / VERIFY
+        with self.assertRaises(ValueError):
+            self.tf_detector.detect_bounding_boxes_batch([image, smaller_image])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,70 @@
+import numpy as np
+import unittest
+from person_detection.tracking_detector import TrackingDetector
+from utils.bounding_box import BoundingBox
+
+
+# Stand-in for a detector that always reports a person at the same place and counts how often it's run.
+class FixedDetector:
+    def __init__(self, bb):
+        self.bb = bb
+        self.num_calls = 0
+
+    def detect(self, image):
+        self.num_calls += 1
+        return [self.bb]
+
+
+# Returns a 120x160 image that's blank except for a random-textured 40x40 patch with its top-left at (x, y).
+def make_image(x, y):
+    random_state = np.random.RandomState(0)
+    image = np.zeros((120, 160, 3), dtype=np.uint8)
+    image[y:y + 40, x:x + 40] = random_state.randint(0, 255, (40, 40, 1)).repeat(3, axis=2)
+    return image
+
+
+class TestTrackingDetector(unittest.TestCase):
+    # Test that between detections the box follows the person, without running the detector.
+    def test_tracks_between_detections(self):
+        # SETUP
+        detector = FixedDetector(BoundingBox((40.0, 40.0), (60.0, 60.0), score=0.8))
+        tracking_detector = TrackingDetector(detector, detect_interval=5)
+        tracking_detector.detect(make_image(40, 40))
+
+        # EXECUTE
+        bbs = tracking_detector.detect(make_image(44, 43))
+
+        # VERIFY
+        assert detector.num_calls == 1
+        assert len(bbs) == 1
+        x, y = bbs[0].get_centroid()
+        assert abs(x - 64) < 1 and abs(y - 63) < 1
+        width, height = bbs[0].get_dimensions()
+        assert abs(width - 40) < 2 and abs(height - 40) < 2
+        assert 0 < bbs[0].get_score() <= 0.8
+
+    # Test that the detector is run again every detect_interval frames.
+    def test_detects_every_interval(self):
+        # SETUP
+        detector = FixedDetector(BoundingBox((40.0, 40.0), (60.0, 60.0), score=0.8))
+        tracking_detector = TrackingDetector(detector, detect_interval=3)
+
+        # EXECUTE
+        for _ in range(6):
+            tracking_detector.detect(make_image(40, 40))
+
+        # VERIFY
+        assert detector.num_calls == 2
+
+    # Test that the detector is run straight away when the tracked features disappear.
+    def test_detects_when_tracking_fails(self):
+        # SETUP
+        detector = FixedDetector(BoundingBox((40.0, 40.0), (60.0, 60.0), score=0.8))
+        tracking_detector = TrackingDetector(detector, detect_interval=5)
+        tracking_detector.detect(make_image(40, 40))
+
+        # EXECUTE
+        tracking_detector.detect(np.zeros((120, 160, 3), dtype=np.uint8))
+
+        # VERIFY
+        assert detector.num_calls == 2
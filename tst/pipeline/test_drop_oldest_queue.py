@@ -0,0 +1,54 @@
+import threading
+import unittest
+from pipeline.drop_oldest_queue import DropOldestQueue
+
+
+class TestDropOldestQueue(unittest.TestCase):
+    # Test that a full queue throws away its oldest item instead of blocking.
+    def test_drops_oldest_when_full(self):
+        # SETUP
+        queue = DropOldestQueue(maxsize=2)
+
+        # EXECUTE
+        queue.put(1)
+        queue.put(2)
+        queue.put(3)
+
+        # VERIFY
+        assert queue.num_dropped == 1
+        assert queue.get(timeout=0) == 2
+        assert queue.get(timeout=0) == 3
+        assert queue.get(timeout=0) is None
+
+    # Test that get_latest returns the newest item and empties the queue.
+    def test_get_latest(self):
+        # SETUP
+        queue = DropOldestQueue(maxsize=3)
+        for i in range(3):
+            queue.put(i)
+
+        # EXECUTE
+        latest = queue.get_latest()
+
+        # VERIFY
+        assert latest == 2
+        assert len(queue) == 0
+        assert queue.get_latest() is None
+
+    # Test that get blocks until another thread puts something in the queue.
+    def test_get_waits_for_item(self):
+        # SETUP
+        queue = DropOldestQueue()
+        putter = threading.Timer(0.05, queue.put, args=("item",))
+
+        # EXECUTE
+        putter.start()
+        item = queue.get(timeout=5)
+        putter.join()
+
+        # VERIFY
+        assert item == "item"
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import numpy as np
+import threading
+import time
+import unittest
+from cinematic_waypoints.cinematic_controller import CinematicController
+from cinematic_waypoints.waypoint_generator.fixed_bb_waypoint_generator import FixedBBWaypointGenerator
+from person_detection.frame_grabber import CapturedFrame
+from pipeline.pipeline_runner import PipelineRunner
+from replay.replay_timeline import ReplayTimeline
+from utils.bounding_box import BoundingBox
+from utils.clock import ReplayClock, SimulatedClock
+from utils.drone_state import DroneState
+
+
+# Stand-in for the FrameGrabber that produces a new frame every time it's asked.
+class FakeFrameGrabber:
+    def __init__(self):
+        self.sequence_number = 0
+
+    def next_frame(self, timeout=None, after_sequence_number=None):
+        time.sleep(0.001)
+        self.sequence_number += 1
+        return CapturedFrame("image", self.sequence_number, time.time())
+
+
+# Stand-in for a detector that takes a long time to find a single person.
+class SlowDetector:
+    def __init__(self, detection_time):
+        self.detection_time = detection_time
+
+    def detect(self, image):
+        time.sleep(self.detection_time)
+        return [BoundingBox((10, 10), (20, 20))]
+
+
+class FakeStateEstimator:
+    def get_current_drone_state(self):
+        return DroneState(), time.time()
+
+
+class TestPipelineRunner(unittest.TestCase):
+    # Test that the control stage keeps running at its own rate even when detection is much slower.
+    def test_control_runs_faster_than_detection(self):
+        # SETUP
+        commands = []
+        commands_lock = threading.Lock()
+
+        def command_function(waypoints, drone_state):
+            with commands_lock:
+                commands.append(waypoints)
+        cinematic_controller = CinematicController(waypoint_generator=FixedBBWaypointGenerator())
+        pipeline_runner = PipelineRunner(FakeFrameGrabber(), SlowDetector(0.2), FakeStateEstimator(),
+                                         cinematic_controller, command_function, control_rate=50, state_rate=50)
+
+        # EXECUTE
+        pipeline_runner.run(0.5)
+
+        # VERIFY
+        assert pipeline_runner.error is None
+        assert not pipeline_runner.is_running()
+        assert 1 <= pipeline_runner.num_frames_detected <= 3
+        # Control should have stepped many more times than detection ran.
+        assert pipeline_runner.num_control_steps > 3 * pipeline_runner.num_frames_detected
+        assert len(commands) == pipeline_runner.num_control_steps
+        # Frames that arrived while the detector was busy were dropped rather than queued up.
+        assert pipeline_runner.frame_queue.num_dropped > 0
+        assert cinematic_controller.latest_bounding_box == BoundingBox((10, 10), (20, 20))
+
+    # Test that an exception in one stage stops the whole pipeline and is reported.
+    def test_error_stops_pipeline(self):
+        # SETUP
+        def failing_command_function(waypoints, drone_state):
+            raise ValueError("Boom")
+        pipeline_runner = PipelineRunner(FakeFrameGrabber(), SlowDetector(0), FakeStateEstimator(),
+                                         CinematicController(), failing_command_function)
+
+        # EXECUTE
+        pipeline_runner.run(5)
+
+        # VERIFY
+        assert isinstance(pipeline_runner.error, ValueError)
+        assert not pipeline_runner.is_running()
+
+    # Test that a fixed rate stage is paced in replay time, so a replay running as fast as possible never waits
+    # on the wall clock.
+    def test_run_at_rate_with_replay_clock(self):
+        # SETUP
+        timeline = ReplayTimeline(speed=None)
+        clock = ReplayClock(timeline)
+        pipeline_runner = PipelineRunner(FakeFrameGrabber(), SlowDetector(0), FakeStateEstimator(),
+                                         CinematicController(), lambda waypoints, drone_state: None, clock=clock)
+        call_times = []
+
+        def function():
+            call_times.append(clock.time())
+            if len(call_times) == 10:
+                pipeline_runner.stop_event.set()
+
+        # EXECUTE
+        wall_start_time = time.time()
+        pipeline_runner.run_at_rate(function, rate=10)
+
+        # VERIFY
+        np.testing.assert_allclose(call_times, 0.1 * np.arange(10), atol=1e-9)
+        assert time.time() - wall_start_time < 0.5
+
+    # Test that a SimulatedClock is rejected, since the stages' threads can't share one.
+    def test_rejects_simulated_clock(self):
+        with self.assertRaises(ValueError):
+            PipelineRunner(FakeFrameGrabber(), SlowDetector(0), FakeStateEstimator(), CinematicController(),
+                           lambda waypoints, drone_state: None, clock=SimulatedClock())
+
+
+if __name__ == '__main__':
+    unittest.main()
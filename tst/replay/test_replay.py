@@ -0,0 +1,194 @@
+import os
+import shutil
+import tempfile
+import unittest
+import cv2
+import numpy as np
+from pyparrot.Minidrone import MinidroneSensors
+from person_detection.frame_grabber import FrameGrabber
+from replay.replay_drone_vision import ReplayDroneVision
+from replay.replay_mambo import ReplayMambo
+from replay.replay_timeline import ReplayTimeline
+from replay.sensor_log import SensorLog
+from replay.sensor_log_recorder import SensorLogRecorder
+from utils.clock import ReplayClock
+
+
+# Returns a sensor log row at the given time with the given speed_x and speed timestamp (in ms).
+def make_row(time, speed_x, speed_ts):
+    row = [time] + [0] * len(SensorLog.FIELDS)
+    row[SensorLog.COLUMNS.index("speed_x")] = speed_x
+    row[SensorLog.COLUMNS.index("speed_ts")] = speed_ts
+    row[SensorLog.COLUMNS.index("altitude")] = 1.0
+    row[SensorLog.COLUMNS.index("quaternion_w")] = 1.0
+    return row
+
+
+# Stand-in for a freshly connected live mambo: real pyparrot sensors, with no user callback set yet.
+class FakeMambo:
+    def __init__(self):
+        self.sensors = MinidroneSensors()
+
+    def set_user_sensor_callback(self, function, args):
+        self.sensors.set_user_callback_function(function, args)
+
+
+class TestReplay(unittest.TestCase):
+    # Before every test, make a fresh directory for recorded frames and logs.
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # Saves num_frames small images whose pixel values are their frame index.
+    def save_frames(self, num_frames):
+        for i in range(num_frames):
+            cv2.imwrite(os.path.join(self.directory, "test_image_%d.png" % i), np.full((4, 4, 3), i, dtype=np.uint8))
+        # Older recordings also have this one, which isn't part of the recording.
+        cv2.imwrite(os.path.join(self.directory, "latest_image.png"), np.zeros((4, 4, 3), dtype=np.uint8))
+
+    # Test that a sensor log survives a save and load.
+    def test_sensor_log_round_trip(self):
+        # SETUP
+        sensor_log = SensorLog([make_row(0, 0.5, 10), make_row(0.1, 0.6, 110)])
+        filepath = os.path.join(self.directory, "sensor_log.csv")
+
+        # EXECUTE
+        sensor_log.save(filepath)
+        loaded_log = SensorLog.load(filepath)
+
+        # VERIFY
+        assert loaded_log.rows == sensor_log.rows
+
+    # Test that sensor readings are applied as replay time reaches them, and that callbacks fire.
+    def test_mambo_plays_back_sensors(self):
+        # SETUP
+        timeline = ReplayTimeline(speed=None)
+        mambo = ReplayMambo(SensorLog([make_row(0, 0.5, 0), make_row(1, 0.7, 1000)]), timeline=timeline)
+        callback_count = [0]
+
+        def callback(args):
+            callback_count[0] += 1
+        mambo.set_user_sensor_callback(callback, None)
+
+        # EXECUTE / VERIFY
+        mambo.connect()
+        assert mambo.sensors.speed_x == 0.5
+        assert not mambo.is_finished()
+        mambo.smart_sleep(1)
+        assert mambo.sensors.speed_x == 0.7
+        assert mambo.sensors.speed_ts == 1000
+        assert mambo.is_finished()
+        assert callback_count[0] == 2 * len(SensorLog.FIELDS)
+
+    # Test that recording a flight's sensors gives back the log it was played from, without taking the sensor
+    # callback away from whoever had it.
+    def test_sensor_log_recorder(self):
+        # SETUP
+        timeline = ReplayTimeline(speed=None)
+        rows = [make_row(0, 0.5, 0), make_row(1, 0.7, 1000), make_row(2, 0.9, 2000)]
+        mambo = ReplayMambo(SensorLog(rows), timeline=timeline)
+        callback_count = [0]
+
+        def callback(args):
+            callback_count[0] += 1
+        mambo.set_user_sensor_callback(callback, None)
+        mambo.connect()
+        recorder = SensorLogRecorder(mambo, clock=ReplayClock(timeline))
+        filepath = os.path.join(self.directory, "flight", "sensor_log.csv")
+
+        # EXECUTE
+        recorder.start()
+        mambo.smart_sleep(1)
+        mambo.smart_sleep(1)
+        recorder.save(filepath)
+
+        # VERIFY
+        assert SensorLog.load(filepath).rows == rows
+        # The earlier callback still saw every update while recording, and got the callback back afterwards.
+        assert callback_count[0] == 3 * len(SensorLog.FIELDS)
+        assert mambo.replay_sensors.user_callback_function == callback
+
+    # Test that the recorder starts on a mambo that has never had a user callback, as in main_script.py.
+    def test_sensor_log_recorder_without_callback(self):
+        # SETUP
+        mambo = FakeMambo()
+        recorder = SensorLogRecorder(mambo)
+
+        # EXECUTE
+        recorder.start()
+        mambo.sensors.update("DroneSpeed_speed_x", 0.5, {})
+        mambo.sensors.update("DroneSpeed_ts", 100, {})
+        recorder.stop()
+
+        # VERIFY
+        assert len(recorder.sensor_log.rows) == 2
+        assert recorder.sensor_log.rows[1][SensorLog.COLUMNS.index("speed_x")] == 0.5
+        assert mambo.sensors.user_callback_function is None
+
+    # Test that timed commands are recorded and move replay time forward.
+    def test_mambo_records_commands(self):
+        # SETUP
+        timeline = ReplayTimeline(speed=None)
+        mambo = ReplayMambo(SensorLog(), timeline=timeline)
+        mambo.connect()
+
+        # EXECUTE
+        mambo.fly_direct(roll=10, pitch=0, yaw=0, vertical_movement=0, duration=2)
+        mambo.fly_direct(roll=0, pitch=10, yaw=0, vertical_movement=0)
+
+        # VERIFY
+        assert mambo.commands == [(0, 10, 0, 0, 0, 2), (2, 0, 10, 0, 0, None)]
+
+    # Test that frames are played back in numeric order, skipping unnumbered files.
+    def test_frames_in_numeric_order(self):
+        # SETUP
+        self.save_frames(12)  # Alphabetical order would put 10 and 11 before 2.
+        timeline = ReplayTimeline(speed=None)
+        drone_vision = ReplayDroneVision(self.directory, fps=10, timeline=timeline)
+
+        # EXECUTE
+        frame_values = [int(frame[0, 0, 0]) for frame in drone_vision.frames()]
+
+        # VERIFY
+        assert frame_values == list(range(12))
+        assert drone_vision.is_finished()
+        assert abs(timeline.now() - 1.1) < 1e-9
+
+    # Test that frames saved uncompressed as .npy files (FrameDiskSink.RAW) are played back too.
+    def test_raw_frames(self):
+        # SETUP
+        for i in range(3):
+            np.save(os.path.join(self.directory, "test_image_%06d.npy" % i), np.full((4, 4, 3), i, dtype=np.uint8))
+        SensorLog().save(os.path.join(self.directory, "sensor_log.csv"))  # Saved next to the frames.
+        drone_vision = ReplayDroneVision(self.directory, fps=10, timeline=ReplayTimeline(speed=None))
+
+        # EXECUTE
+        frame_values = [int(frame[0, 0, 0]) for frame in drone_vision.frames()]
+
+        # VERIFY
+        assert frame_values == [0, 1, 2]
+
+    # Test that the threaded playback feeds a FrameGrabber, like a real DroneVision would.
+    def test_threaded_playback_feeds_frame_grabber(self):
+        # SETUP
+        self.save_frames(3)
+        timeline = ReplayTimeline(speed=None)
+        drone_vision = ReplayDroneVision(self.directory, fps=10, timeline=timeline)
+        frame_grabber = FrameGrabber(None, drone_vision=drone_vision)
+
+        # EXECUTE
+        frame_grabber.start()
+        first_frame = frame_grabber.next_frame(timeout=5, after_sequence_number=0)
+        last_frame = frame_grabber.next_frame(timeout=5, after_sequence_number=2)
+        frame_grabber.stop()
+
+        # VERIFY
+        assert int(first_frame.image[0, 0, 0]) == 0
+        assert int(last_frame.image[0, 0, 0]) == 2
+        assert drone_vision.is_finished()
+
+
+if __name__ == '__main__':
+    unittest.main()
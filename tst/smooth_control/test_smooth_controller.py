@@ -0,0 +1,83 @@
+import unittest
+from smooth_control.smooth_controller import SmoothController
+from utils.drone_state import DroneState
+
+
+# Stand-in for the mambo that records the commands it's sent.
+class FakeMambo:
+    def __init__(self):
+        self.commands = []
+
+    def fly_direct(self, roll, pitch, yaw, vertical_movement, duration=None):
+        self.commands.append((roll, pitch, yaw, vertical_movement, duration))
+
+
+# Stand-in for the state estimator that always reports the drone state it's told to.
+class FakeStateEstimator:
+    def __init__(self, drone_state):
+        self.drone_state = drone_state
+
+    def get_current_drone_state(self):
+        return self.drone_state, 0
+
+
+class TestSmoothController(unittest.TestCase):
+    # Before every test, reset the SmoothController object that will be tested.
+    def setUp(self):
+        self.mambo = FakeMambo()
+        self.state_estimator = FakeStateEstimator(DroneState())
+        # Use a control rate whose period is exact in floating point, so timing checks are exact too.
+        self.controller = SmoothController(self.mambo, self.state_estimator, control_rate=16)
+
+    # Test that step does nothing without a goal.
+    def test_idle_without_goal(self):
+        # EXECUTE
+        status = self.controller.step(now=0)
+
+        # VERIFY
+        assert status == SmoothController.IDLE
+        assert len(self.mambo.commands) == 0
+
+    # Test that step sends a single non-blocking command towards the goal.
+    def test_step_sends_one_command(self):
+        # SETUP
+        self.controller.set_goal(DroneState(z=2))
+
+        # EXECUTE
+        status = self.controller.step(now=0)
+
+        # VERIFY
+        assert status == SmoothController.MOVING
+        assert len(self.mambo.commands) == 1
+        assert self.mambo.commands[0][4] is None  # Sent once, not for a duration.
+
+    # Test that step sends no more than control_rate commands per second.
+    def test_step_is_rate_limited(self):
+        # SETUP
+        self.controller.set_goal(DroneState(z=2))
+
+        # EXECUTE
+        for i in range(128):
+            self.controller.step(now=i / 128.0)  # Called at 128 Hz for 1 second.
+
+        # VERIFY
+        assert len(self.mambo.commands) == 16
+
+    # Test that step reports convergence instead of blocking, and can be retargeted afterwards.
+    def test_converges_and_retargets(self):
+        # SETUP
+        self.controller.set_goal(DroneState())
+
+        # EXECUTE
+        converged_status = self.controller.step(now=0)
+        self.controller.set_goal(DroneState(z=2))
+        retargeted_status = self.controller.step(now=1)
+
+        # VERIFY
+        assert converged_status == SmoothController.CONVERGED
+        assert retargeted_status == SmoothController.MOVING
+        assert len(self.mambo.commands) == 1
+
+
+if __name__ == '__main__':
+    unittest.main()
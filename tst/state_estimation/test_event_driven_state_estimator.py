@@ -0,0 +1,86 @@
+import math
+import unittest
+from pyparrot.Minidrone import MinidroneSensors
+
+from state_estimation.event_driven_state_estimator import EventDrivenStateEstimator
+
+
+# Stand-in for the mambo that just owns a set of real pyparrot sensors, so the test can push sensor
+# messages through them without a drone.
+class FakeMambo:
+    def __init__(self):
+        self.sensors = MinidroneSensors()
+
+    def set_user_sensor_callback(self, function, args):
+        self.sensors.set_user_callback_function(function, args)
+
+    # Sends a speed message, in the same field order pyparrot receives them.
+    def send_speed(self, speed_x, speed_y, speed_z, ts):
+        self.sensors.update("DroneSpeed_speed_x", speed_x, {})
+        self.sensors.update("DroneSpeed_speed_y", speed_y, {})
+        self.sensors.update("DroneSpeed_speed_z", speed_z, {})
+        self.sensors.update("DroneSpeed_ts", ts, {})
+
+    # Sends a quaternion message for a pure yaw rotation of yaw_degrees.
+    def send_yaw(self, yaw_degrees, ts):
+        half_angle = math.radians(yaw_degrees) / 2
+        self.sensors.update("DroneQuaternion_q_w", math.cos(half_angle), {})
+        self.sensors.update("DroneQuaternion_q_x", 0, {})
+        self.sensors.update("DroneQuaternion_q_y", 0, {})
+        self.sensors.update("DroneQuaternion_q_z", math.sin(half_angle), {})
+        self.sensors.update("DroneQuaternion_ts", ts, {})
+
+
+class TestEventDrivenStateEstimator(unittest.TestCase):
+    # Before every test, reset the estimator that will be tested.
+    def setUp(self):
+        self.mambo = FakeMambo()
+        self.state_estimator = EventDrivenStateEstimator(self.mambo, history_size=4)
+
+    # Test that speed messages are integrated into position as they arrive.
+    def test_integrates_speed(self):
+        # EXECUTE
+        self.mambo.send_speed(1, 2, 0, 1000)
+        self.mambo.send_speed(1, 2, 0, 2000)
+
+        # VERIFY
+        drone_state, time_of_estimate = self.state_estimator.get_current_drone_state()
+        assert time_of_estimate == 2000
+        assert abs(drone_state.x - 2) < 1e-9
+        assert abs(drone_state.y - 4) < 1e-9
+        assert drone_state.get_linear_velocities() == (1, 2, 0)
+
+    # Test that yaw rate is computed across the +-180 degree boundary without a spike.
+    def test_yaw_rate_wraps(self):
+        # EXECUTE
+        self.mambo.send_yaw(170, 0)
+        self.mambo.send_yaw(-170, 1000)
+
+        # VERIFY
+        drone_state, _ = self.state_estimator.get_current_drone_state()
+        assert abs(drone_state.yaw + 170) < 1e-6
+        assert abs(drone_state.yaw_dot - 20) < 1e-6
+
+    # Test that the history keeps only the newest states, oldest first.
+    def test_history_is_a_ring_buffer(self):
+        # EXECUTE
+        for i in range(1, 7):
+            self.mambo.send_speed(0, 0, 0, i * 1000)
+
+        # VERIFY
+        history = self.state_estimator.get_state_history()
+        assert list(history[:, EventDrivenStateEstimator.TIME]) == [3000, 4000, 5000, 6000]
+
+    # Test that updates stop once the estimator is stopped.
+    def test_stop(self):
+        # EXECUTE
+        self.state_estimator.stop()
+        self.mambo.send_speed(1, 1, 1, 1000)
+
+        # VERIFY
+        _, time_of_estimate = self.state_estimator.get_current_drone_state()
+        assert time_of_estimate == 0
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import numpy as np
+import unittest
+from pyparrot.Minidrone import MinidroneSensors
+
+from state_estimation.kalman_state_estimator import KalmanStateEstimator
+
+
+# Stand-in for the mambo that just owns a set of pyparrot sensors the test can write to directly.
+class FakeMambo:
+    def __init__(self):
+        self.sensors = MinidroneSensors()
+        self.sensors.altitude = 1.0
+        self.sensors.quaternion_w = 1.0
+
+
+class TestKalmanStateEstimator(unittest.TestCase):
+    # Before every test, reset the estimator that will be tested.
+    def setUp(self):
+        self.mambo = FakeMambo()
+        self.state_estimator = KalmanStateEstimator(self.mambo)
+
+    # Feeds in num_steps sensor readings for a drone moving at a constant velocity.
+    def fly_at_constant_velocity(self, speed_x, speed_y, num_steps, step_ms=100):
+        for _ in range(num_steps):
+            self.mambo.sensors.speed_x = speed_x
+            self.mambo.sensors.speed_y = speed_y
+            self.mambo.sensors.speed_ts += step_ms
+            drone_state, _ = self.state_estimator.get_current_drone_state()
+        return drone_state
+
+    # Test that the position tracks a drone flying at constant velocity.
+    def test_tracks_constant_velocity(self):
+        # EXECUTE
+        drone_state = self.fly_at_constant_velocity(1.0, -0.5, 50)  # 5 seconds.
+
+        # VERIFY
+        assert abs(drone_state.x_dot - 1.0) < 0.05
+        assert abs(drone_state.y_dot + 0.5) < 0.05
+        assert abs(drone_state.x - 5.0) < 0.5
+        assert abs(drone_state.y + 2.5) < 0.5
+        assert abs(drone_state.z - 1.0) < 0.05
+
+    # Test that the reported uncertainty grows while dead-reckoning on velocity alone.
+    def test_uncertainty_grows(self):
+        # EXECUTE
+        early_state = self.fly_at_constant_velocity(1.0, 0, 5)
+        late_state = self.fly_at_constant_velocity(1.0, 0, 50)
+
+        # VERIFY
+        assert late_state.uncertainty > early_state.uncertainty > 0
+
+    # Test that fetching again without new sensor data doesn't change the estimate.
+    def test_no_new_data(self):
+        # SETUP
+        first_state = self.fly_at_constant_velocity(1.0, 0, 5)
+
+        # EXECUTE
+        second_state, _ = self.state_estimator.get_current_drone_state()
+
+        # VERIFY
+        assert second_state.get_position() == first_state.get_position()
+
+    # Test that the altitude estimate follows a steady climb, which the mambo reports as a negative speed_z.
+    def test_tracks_climb(self):
+        # SETUP
+        sensors = self.mambo.sensors
+        sensors.speed_z = -0.5
+
+        # EXECUTE
+        for step in range(1, 51):  # 5 seconds.
+            sensors.altitude = 1.0 + 0.05 * step
+            sensors.speed_ts += 100
+            drone_state, _ = self.state_estimator.get_current_drone_state()
+
+        # VERIFY
+        assert abs(drone_state.z - 3.5) < 0.05
+        # Like NewStateEstimator, the reported z_dot keeps the mambo's sign for speed_z.
+        assert abs(drone_state.z_dot + 0.5) < 0.05
+
+    # Test that dropping a measurement gives the same result as fusing only the measurements that were received.
+    def test_dropped_measurement(self):
+        # SETUP
+        self.fly_at_constant_velocity(1.0, 0, 5)
+        self.state_estimator.predict(0.1)
+        measurement = np.array([1.2, 0.1, -0.1, 5.0, 3.0])
+        valid = np.array([True, True, True, False, True])
+        estimator = self.state_estimator
+        H = estimator.measurement_model[valid]
+        R = estimator.measurement_noise[np.ix_(valid, valid)]
+        innovation = (measurement - estimator.measurement_model.dot(estimator.state))[valid]
+        gain = np.linalg.solve(H.dot(estimator.covariance).dot(H.T) + R, H.dot(estimator.covariance)).T
+        expected_state = estimator.state + gain.dot(innovation)
+        expected_covariance = (np.eye(KalmanStateEstimator.NUM_STATES) - gain.dot(H)).dot(estimator.covariance)
+
+        # EXECUTE
+        estimator.update(measurement, valid)
+
+        # VERIFY
+        np.testing.assert_allclose(estimator.state, expected_state, atol=1e-12)
+        np.testing.assert_allclose(estimator.covariance, expected_covariance, atol=1e-12)
+
+    # Test that the filter updates its state and covariance in place rather than replacing them.
+    def test_reuses_buffers(self):
+        # SETUP
+        state = self.state_estimator.state
+        covariance = self.state_estimator.covariance
+
+        # EXECUTE
+        self.fly_at_constant_velocity(1.0, 0, 5)
+
+        # VERIFY
+        assert self.state_estimator.state is state
+        assert self.state_estimator.covariance is covariance
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import threading
+import time
+import unittest
+from replay.replay_timeline import ReplayTimeline
+from utils.clock import RealClock, ReplayClock, SimulatedClock
+
+
+class TestClock(unittest.TestCase):
+    # Test that a simulated clock only moves when told to, and never backwards.
+    def test_simulated_clock(self):
+        # SETUP
+        clock = SimulatedClock(start_time=5.0)
+
+        # EXECUTE
+        start_time = clock.time()
+        clock.advance(1.5)
+        clock.sleep(2)
+        clock.advance(-10)
+        clock.set_time(3.0)
+
+        # VERIFY
+        assert start_time == 5.0
+        assert clock.time() == 8.5
+
+    # Test that waiting on a simulated clock returns immediately, letting the requested time pass unless the
+    # event is already set.
+    def test_simulated_clock_wait(self):
+        # SETUP
+        clock = SimulatedClock()
+        event = threading.Event()
+
+        # EXECUTE
+        wall_start_time = time.time()
+        was_set_before = clock.wait(event, 100)
+        time_after_unset_wait = clock.time()
+        event.set()
+        was_set_after = clock.wait(event, 100)
+
+        # VERIFY
+        assert time.time() - wall_start_time < 1
+        assert not was_set_before
+        assert was_set_after
+        assert time_after_unset_wait == 100
+        assert clock.time() == 100
+
+    # Test that a replay clock follows a replay timeline running as fast as possible.
+    def test_replay_clock(self):
+        # SETUP
+        timeline = ReplayTimeline(speed=None)
+        clock = ReplayClock(timeline)
+
+        # EXECUTE
+        timeline.advance_to(2.0)
+        time_after_advance = clock.time()
+        clock.sleep(3.0)
+
+        # VERIFY
+        assert time_after_advance == 2.0
+        assert clock.time() == 5.0
+
+    def test_real_clock(self):
+        # SETUP
+        clock = RealClock()
+
+        # EXECUTE
+        clock_time = clock.time()
+
+        # VERIFY
+        assert abs(clock_time - time.time()) < 1
+
+
+if __name__ == '__main__':
+    unittest.main()
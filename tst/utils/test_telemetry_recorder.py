@@ -0,0 +1,86 @@
+import numpy as np
+import shutil
+import tempfile
+import unittest
+from utils.bounding_box import BoundingBox
+from utils.drone_state import DroneState
+from utils.telemetry_recorder import TelemetryRecorder, read_telemetry
+
+
+class TestTelemetryRecorder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # Test that every kind of record comes back from read_telemetry with the values that were recorded.
+    def test_round_trip(self):
+        # SETUP
+        recorder = TelemetryRecorder(self.directory)
+
+        # EXECUTE
+        recorder.record_drone_state(DroneState(x=1, y=2, z=3, yaw=90), timestamp=10.0)
+        recorder.record_drone_state(DroneState(x=4, y=5, z=6), timestamp=10.5)
+        recorder.record_bounding_boxes([BoundingBox((10, 20), (30, 40), score=0.9), BoundingBox((1, 2), (3, 4))],
+                                       timestamp=11.0)
+        recorder.record_bounding_boxes([], timestamp=12.0)
+        recorder.record_waypoints([DroneState(x=7), DroneState(y=8)], timestamp=13.0)
+        recorder.record_command(1.0, 0.0, 0.0, 10.0, 16.7, 0, 2.5, 0, None, timestamp=14.0)
+        recorder.close()
+        telemetry = read_telemetry(self.directory)
+
+        # VERIFY
+        drone_states = telemetry['drone_states']
+        assert isinstance(drone_states, np.memmap)
+        np.testing.assert_array_equal(drone_states['time'], [10.0, 10.5])
+        np.testing.assert_array_equal(drone_states['x'], [1, 4])
+        assert drone_states['yaw'][0] == 90
+
+        bounding_boxes = telemetry['bounding_boxes']
+        np.testing.assert_array_equal(bounding_boxes['list_index'], [0, 0, 1])
+        np.testing.assert_array_equal(bounding_boxes['count'], [2, 2, 0])
+        np.testing.assert_array_equal(bounding_boxes['element_index'], [0, 1, -1])
+        assert bounding_boxes['width'][0] == 10 and bounding_boxes['y'][0] == 40
+        assert bounding_boxes['score'][0] == 0.9
+        assert np.isnan(bounding_boxes['score'][1])
+
+        waypoints = telemetry['waypoints']
+        np.testing.assert_array_equal(waypoints['x'], [7, 0])
+        np.testing.assert_array_equal(waypoints['y'], [0, 8])
+
+        commands = telemetry['commands']
+        assert len(commands) == 1
+        assert commands['dyaw'][0] == 10.0 and commands['roll'][0] == 16.7
+        assert np.isnan(commands['duration'][0])
+
+    # Test that streams with nothing recorded read back as empty arrays.
+    def test_empty_streams(self):
+        # SETUP
+        recorder = TelemetryRecorder(self.directory)
+
+        # EXECUTE
+        recorder.close()
+        telemetry = read_telemetry(self.directory)
+
+        # VERIFY
+        for name in ['drone_states', 'bounding_boxes', 'waypoints', 'commands']:
+            assert len(telemetry[name]) == 0
+
+    # Test that recording into a directory again replaces the earlier run rather than appending to it.
+    def test_second_run_replaces_first(self):
+        # SETUP
+        first_recorder = TelemetryRecorder(self.directory)
+        first_recorder.record_bounding_boxes([BoundingBox((1, 2), (3, 4))], timestamp=1.0)
+        first_recorder.record_bounding_boxes([], timestamp=2.0)
+        first_recorder.close()
+
+        # EXECUTE
+        second_recorder = TelemetryRecorder(self.directory)
+        second_recorder.record_bounding_boxes([], timestamp=3.0)
+        second_recorder.close()
+        telemetry = read_telemetry(self.directory)
+
+        # VERIFY
+        np.testing.assert_array_equal(telemetry['bounding_boxes']['time'], [3.0])
+        np.testing.assert_array_equal(telemetry['bounding_boxes']['list_index'], [0])
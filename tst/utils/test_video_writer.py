@@ -0,0 +1,94 @@
+import cv2
+import numpy as np
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from utils.video_writer import convert_frames_to_video, list_numbered_frames, read_frames_prefetched
+
+
+class TestVideoWriter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        # Frame i is a solid image with brightness 20 * i, so we can tell the frames apart.
+        for i in [1, 2, 10]:
+            cv2.imwrite(os.path.join(self.directory, "test_image_%d.png" % i), np.full((24, 32, 3), 20 * i, np.uint8))
+        cv2.imwrite(os.path.join(self.directory, "latest_image.png"), np.zeros((24, 32, 3), np.uint8))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # Test that frames are ordered by number rather than alphabetically, and unnumbered files are skipped.
+    def test_list_numbered_frames(self):
+        # EXECUTE
+        filepaths = list_numbered_frames(self.directory)
+
+        # VERIFY
+        assert [os.path.basename(f) for f in filepaths] == ["test_image_1.png", "test_image_2.png",
+                                                             "test_image_10.png"]
+
+    # Test that prefetched frames come back in order, even with a prefetch buffer smaller than the recording.
+    def test_read_frames_prefetched(self):
+        # EXECUTE
+        images = list(read_frames_prefetched(list_numbered_frames(self.directory), prefetch_size=1))
+
+        # VERIFY
+        assert [image[0, 0, 0] for image in images] == [20, 40, 200]
+
+    # Test that stopping early doesn't leave the prefetch thread stuck.
+    def test_read_frames_prefetched_stops_early(self):
+        # EXECUTE
+        for image in read_frames_prefetched(list_numbered_frames(self.directory), prefetch_size=1):
+            break
+
+        # VERIFY
+        assert image[0, 0, 0] == 20
+
+    # Test that stopping early doesn't hang when the decoder has already filled the queue and is waiting to
+    # signal the end of the frames.
+    def test_read_frames_prefetched_stops_early_on_full_queue(self):
+        # SETUP
+        first_images = []
+
+        def read_first_frame():
+            for image in read_frames_prefetched(list_numbered_frames(self.directory), prefetch_size=2):
+                first_images.append(image)
+                # Give the decoder time to fill the queue with the other two frames and block on the end marker.
+                time.sleep(0.5)
+                break
+
+        # EXECUTE
+        reader_thread = threading.Thread(target=read_first_frame, daemon=True)
+        reader_thread.start()
+        reader_thread.join(5)
+
+        # VERIFY
+        assert not reader_thread.is_alive()
+        assert len(first_images) == 1
+
+    # Test that frames saved as .npy arrays are listed and read along with image files.
+    def test_raw_frames(self):
+        # SETUP
+        np.save(os.path.join(self.directory, "test_image_5.npy"), np.full((24, 32, 3), 100, np.uint8))
+
+        # EXECUTE
+        images = list(read_frames_prefetched(list_numbered_frames(self.directory)))
+
+        # VERIFY
+        assert [image[0, 0, 0] for image in images] == [20, 40, 100, 200]
+
+    # Test that every numbered frame ends up in the video.
+    def test_convert_frames_to_video(self):
+        # SETUP
+        path_out = os.path.join(self.directory, "video.avi")
+
+        # EXECUTE
+        num_frames = convert_frames_to_video(self.directory, path_out, fps=10, fourcc='MJPG')
+
+        # VERIFY
+        assert num_frames == 3
+        capture = cv2.VideoCapture(path_out)
+        assert int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) == 3
+        capture.release()